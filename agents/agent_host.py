@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Multi-Agent Host for NANDA Agents
+
+Runs every agent of a group config in one process on a shared asyncio event
+loop instead of one nanda_agent.py process per agent. All agents share one
+AsyncAnthropic client (and its HTTP connection pool) and one HTTP client for
+agent-to-agent fan-out; each keeps its own port, and with --port every agent
+is also reachable on a single shared port under /<agent_id>/a2a.
+
+Endpoints per agent:
+    POST /a2a       A2A message in, A2A message out
+    GET  /a2a       agent card (doubles as a readiness probe)
+    GET  /health    liveness and LLM cache/executor statistics
+
+Process-wide, on every agent port and the shared port:
+    GET  /metrics   Prometheus metrics for all hosted agents
+    GET  /traces    recent traces as JSON (?id=<trace_id>, ?slow=1)
+
+A trace id arriving in an A2A message ("trace_id" or X-Trace-Id) is joined,
+otherwise one is started, and it is returned in the reply.
+
+Registry registration and @agent mention routing are handled by the NANDA
+adapter and are not available in host mode; use nanda_agent.py for agents
+that must appear in the registry.
+
+Usage:
+    python agent_host.py config/group-crisis-flood-response.json
+    python agent_host.py config/group-crisis-flood-response.json --only mission-control,resource-mapper
+    python agent_host.py config/group-crisis-flood-response.json --port 6100
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from intent_router import create_async_router_logic
+from mcp_client import MCP_AVAILABLE, MCPToolClient
+from nanda_agent import (AGENT_CONFIG, ANTHROPIC_AVAILABLE, create_async_llm_agent_logic)
+from priority_scheduler import clamp_priority, create_async_priority_logic, request_priority
+from report_dedup import create_async_dedup_logic
+from scatter_gather import create_async_orchestrator_logic
+from stream_server import parse_stream_request
+from telemetry import CONTENT_TYPE, REGISTRY, TRACE_FIELD, TRACE_HEADER, TRACES, span
+
+if ANTHROPIC_AVAILABLE:
+    from anthropic import AsyncAnthropic
+
+# Largest request body accepted, in bytes
+MAX_BODY = 1 << 20
+
+HTTP_STATUS = {200: "OK", 204: "No Content", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+def group_agent_config(entry: Dict[str, Any], base: Dict[str, Any] = AGENT_CONFIG) -> Dict[str, Any]:
+    """Agent config for one group entry, inheriting LLM and cache settings from the environment"""
+    config = dict(base)
+    expertise = [cap.strip() for cap in entry.get("capabilities", "").split(",") if cap.strip()]
+    config.update({
+        "agent_id": entry["agent_id"],
+        "agent_name": entry.get("agent_name", entry["agent_id"]),
+        "domain": entry.get("domain", base["domain"]),
+        "specialization": entry.get("specialization", base["specialization"]),
+        "description": entry.get("description", base["description"]),
+        "expertise": expertise or base["expertise"],
+        "system_prompt": entry.get("system_prompt", base["system_prompt"]),
+        "port": entry.get("port"),
+        "orchestrate_tiers": [t.strip() for t in entry.get("orchestrate_tiers", "").split(",") if t.strip()],
+        "conversation_token_budget": int(entry.get("conversation_token_budget",
+                                                   base["conversation_token_budget"])),
+        "dedup_window": float(entry.get("dedup_window", base["dedup_window"])),
+        "fast_path": bool(entry.get("fast_path", base["fast_path"])),
+        "priority_scheduling": bool(entry.get("priority_scheduling", base["priority_scheduling"])),
+    })
+    return config
+
+
+class HostedAgent:
+    """One agent served by the host"""
+
+    def __init__(self, config: Dict[str, Any], logic):
+        self.config = config
+        self.logic = logic
+        self.requests = 0
+        self.errors = 0
+        self.started = time.time()
+
+    @property
+    def agent_id(self) -> str:
+        return self.config["agent_id"]
+
+    def card(self) -> Dict[str, Any]:
+        return {
+            "agent_id": self.agent_id,
+            "name": self.config["agent_name"],
+            "description": self.config["description"],
+            "domain": self.config["domain"],
+            "capabilities": self.config["expertise"],
+        }
+
+    def health(self) -> Dict[str, Any]:
+        health = {"status": "healthy", "agent_id": self.agent_id,
+                  "uptime": round(time.time() - self.started, 1),
+                  "requests": self.requests, "errors": self.errors}
+        for name in ("cache", "memory", "scheduler", "dedup", "router", "tools"):
+            component = getattr(self.logic, name, None)
+            if component is not None:
+                health[name] = component.stats()
+        executor = getattr(self.logic, "executor", None)
+        if executor is not None:
+            health["llm"] = executor.stats()
+        return health
+
+    async def handle_message(self, body: Dict[str, Any], headers: Dict[str, str] = None) -> Dict[str, Any]:
+        message, conversation_id = parse_stream_request(body)
+        self.requests += 1
+        incoming = body.get(TRACE_FIELD) or (headers or {}).get(TRACE_HEADER.lower())
+        # Senders may mark severity explicitly; otherwise the scheduler reads the text
+        request_priority.set(clamp_priority(body.get("priority")))
+        with span("request", agent=self.agent_id, trace_id=incoming,
+                  conversation_id=conversation_id) as trace_id:
+            text = await self.logic(message, conversation_id)
+        return {
+            "content": {"text": text, "type": "text"},
+            "role": "agent",
+            "message_id": uuid.uuid4().hex,
+            "parent_message_id": body.get("message_id"),
+            "conversation_id": conversation_id,
+            TRACE_FIELD: trace_id,
+        }
+
+
+class AgentHost:
+    """Serves a group of agents from one event loop"""
+
+    def __init__(self, entries: List[Dict[str, Any]], host: str = "0.0.0.0",
+                 shared_port: Optional[int] = None):
+        self.entries = entries
+        self.host = host
+        self.shared_port = shared_port
+        self.agents: Dict[str, HostedAgent] = {}
+        self.servers = []
+        self.http_client: Optional[httpx.AsyncClient] = None
+        self.llm_client = None
+        self.tools: Optional[MCPToolClient] = None
+
+    def _build_agents(self):
+        self.http_client = httpx.AsyncClient(limits=httpx.Limits(max_connections=200,
+                                                                 max_keepalive_connections=50))
+        if ANTHROPIC_AVAILABLE and AGENT_CONFIG.get("anthropic_api_key"):
+            self.llm_client = AsyncAnthropic(api_key=AGENT_CONFIG["anthropic_api_key"],
+                                             base_url=AGENT_CONFIG.get("anthropic_base_url"))
+        for entry in self.entries:
+            config = group_agent_config(entry)
+            logic = create_async_llm_agent_logic(config, async_client=self.llm_client)
+            if config["priority_scheduling"]:
+                logic = create_async_priority_logic(config, logic)
+            if config["dedup_window"] > 0:
+                logic = create_async_dedup_logic(config, logic)
+            if config["fast_path"] and MCP_AVAILABLE:
+                if self.tools is None:
+                    self.tools = MCPToolClient(AGENT_CONFIG["crisis_mcp_command"], AGENT_CONFIG["mcp_timeout"])
+                logic = create_async_router_logic(config, logic, self.tools)
+            if config["orchestrate_tiers"]:
+                logic = create_async_orchestrator_logic(config, logic, self.entries, client=self.http_client)
+            self.agents[config["agent_id"]] = HostedAgent(config, logic)
+
+    async def start(self):
+        self._build_agents()
+        for agent in self.agents.values():
+            if agent.config.get("port"):
+                server = await asyncio.start_server(
+                    lambda r, w, a=agent: self._serve(r, w, a), self.host, agent.config["port"])
+                self.servers.append(server)
+                print(f"🚀 {agent.config['agent_name']}: http://localhost:{agent.config['port']}/a2a")
+        if self.shared_port:
+            server = await asyncio.start_server(lambda r, w: self._serve(r, w, None),
+                                                self.host, self.shared_port)
+            self.servers.append(server)
+            print(f"🚀 All agents: http://localhost:{self.shared_port}/<agent_id>/a2a")
+
+    async def serve_forever(self):
+        start = time.perf_counter()
+        await self.start()
+        print(f"✅ {len(self.agents)} agents ready in {time.perf_counter() - start:.2f}s")
+        try:
+            await asyncio.gather(*(server.serve_forever() for server in self.servers))
+        finally:
+            await self.close()
+
+    async def close(self):
+        for server in self.servers:
+            server.close()
+        if self.http_client is not None:
+            await self.http_client.aclose()
+        if self.llm_client is not None:
+            await self.llm_client.close()
+        if self.tools is not None:
+            self.tools.close()
+
+    def _route(self, path: str, agent: Optional[HostedAgent]):
+        """(agent, endpoint) for a request path"""
+        path = urlsplit(path).path.rstrip("/") or "/"
+        if agent is None:
+            agent_id, _, rest = path.lstrip("/").partition("/")
+            agent = self.agents.get(agent_id)
+            path = "/" + rest
+        return agent, path
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                     agent: Optional[HostedAgent]):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    break
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0) or 0)
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {"error": "request too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+                keep_alive = headers.get("connection", "").lower() != "close"
+                status, payload = await self._dispatch(method, path, body, agent, headers)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, body: bytes, agent: Optional[HostedAgent],
+                        headers: Dict[str, str] = None):
+        url = urlsplit(path)
+        if method == "GET" and url.path.rstrip("/") == "/metrics":
+            return 200, REGISTRY.render()
+        if method == "GET" and url.path.rstrip("/") == "/traces":
+            return 200, TRACES.payload(url.query)
+        agent, endpoint = self._route(path, agent)
+        if agent is None:
+            return 404, {"error": "unknown agent"}
+        if method == "OPTIONS":
+            return 204, None
+        if endpoint == "/health" and method == "GET":
+            return 200, agent.health()
+        if endpoint != "/a2a":
+            return 404, {"error": f"no route for {endpoint}"}
+        if method == "GET":
+            return 200, agent.card()
+        if method != "POST":
+            return 405, {"error": "method not allowed"}
+        try:
+            request = json.loads(body or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as e:
+            return 400, {"error": f"invalid JSON body: {e}"}
+        try:
+            return 200, await agent.handle_message(request, headers)
+        except Exception as e:
+            agent.errors += 1
+            print(f"❌ {agent.agent_id} failed: {e}")
+            return 500, {"error": str(e)}
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool = True):
+        if isinstance(payload, str):
+            data, content_type = payload.encode("utf-8"), CONTENT_TYPE
+        else:
+            data, content_type = b"" if payload is None else json.dumps(payload).encode("utf-8"), "application/json"
+        head = [f"HTTP/1.1 {status} {HTTP_STATUS.get(status, '')}",
+                "Access-Control-Allow-Origin: *",
+                f"Access-Control-Allow-Headers: Content-Type, {TRACE_HEADER}",
+                "Access-Control-Allow-Methods: GET, POST, OPTIONS",
+                f"Content-Length: {len(data)}",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        if payload is not None:
+            head.append(f"Content-Type: {content_type}")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+        await writer.drain()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a group of NANDA agents in one process")
+    parser.add_argument("group_config", help="group config JSON (e.g. config/group-crisis-flood-response.json)")
+    parser.add_argument("--only", help="comma-separated agent ids to host (default: all)")
+    parser.add_argument("--host", default="0.0.0.0", help="interface to listen on")
+    parser.add_argument("--port", type=int, help="also serve every agent on this port under /<agent_id>/a2a")
+    args = parser.parse_args()
+
+    with open(args.group_config) as f:
+        entries = json.load(f)
+    if args.only:
+        wanted = {agent_id.strip() for agent_id in args.only.split(",")}
+        entries = [entry for entry in entries if entry["agent_id"] in wanted]
+
+    host = AgentHost(entries, host=args.host, shared_port=args.port)
+    print(f"🤖 Hosting {len(entries)} agents from {args.group_config}")
+    try:
+        asyncio.run(host.serve_forever())
+    except KeyboardInterrupt:
+        print("\n🛑 Host stopped")
+
+
+if __name__ == "__main__":
+    main()
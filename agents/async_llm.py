@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Async LLM Executor for NANDA Agents
+
+Runs Claude requests on an asyncio event loop instead of blocking a worker per
+message. Upstream calls are capped by a semaphore sized to the account's rate
+limit, identical in-flight requests share a single upstream call, and every
+caller gets its own deadline. A shared call is cancelled once every caller
+waiting on it has given up, so abandoned requests do not hold upstream slots.
+"""
+import asyncio
+import time
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from telemetry import Counter, Gauge, Histogram, span
+
+LLM_SECONDS = Histogram("agent_llm_seconds", "Upstream LLM call latency", ["agent", "path"])
+LLM_TOKENS = Counter("agent_llm_tokens_total", "LLM tokens used", ["agent", "kind"])
+LLM_QUEUE_DEPTH = Gauge("agent_llm_queue_depth", "Requests waiting for an upstream LLM slot", ["agent"])
+LLM_IN_FLIGHT = Gauge("agent_llm_in_flight", "Upstream LLM calls running", ["agent"])
+
+# Seconds the current request's synchronous LLM call may take (None: the client
+# default); set by callers with an overall budget, e.g. the orchestrator
+llm_deadline: ContextVar[Optional[float]] = ContextVar("llm_deadline", default=None)
+
+
+def record_usage(agent: str, usage):
+    """Count a response's input/output tokens (usage may be missing on stub clients)"""
+    if usage is None:
+        return
+    LLM_TOKENS.labels(agent=agent, kind="input").inc(getattr(usage, "input_tokens", 0) or 0)
+    LLM_TOKENS.labels(agent=agent, kind="output").inc(getattr(usage, "output_tokens", 0) or 0)
+
+
+class LLMDeadlineExceeded(Exception):
+    """Raised when a request does not complete before its deadline"""
+
+
+class AsyncLLMExecutor:
+    """Bounded-concurrency, coalescing front end for an AsyncAnthropic client"""
+
+    def __init__(self, client, model: str, max_concurrency: int = 8,
+                 timeout: float = 30.0, max_tokens: int = 500, name: str = ""):
+        self.client = client
+        # Agent id used as the metrics label
+        self.name = name
+        self.model = model
+        self.timeout = timeout
+        self.max_tokens = max_tokens
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+        self._inflight: Dict[Tuple, asyncio.Task] = {}
+        # Callers still waiting on each in-flight task
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.requests = 0
+        self.upstream_calls = 0
+        self.coalesced = 0
+        self.deadline_exceeded = 0
+        self.abandoned = 0
+        self.waiting = 0
+        self.active = 0
+        LLM_QUEUE_DEPTH.labels(agent=name).set_function(lambda: self.waiting)
+        LLM_IN_FLIGHT.labels(agent=name).set_function(lambda: self.active)
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so the executor can be built before the loop starts
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._inflight)
+
+    async def _call(self, system: str, messages: Tuple[Tuple[str, str], ...]) -> str:
+        self.waiting += 1
+        try:
+            await self._get_semaphore().acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            self.upstream_calls += 1
+            start = time.perf_counter()
+            with span("llm", agent=self.name, model=self.model):
+                response = await self.client.messages.create(
+                    model=self.model,
+                    max_tokens=self.max_tokens,
+                    system=system,
+                    messages=[{"role": role, "content": content} for role, content in messages]
+                )
+            LLM_SECONDS.labels(agent=self.name, path="async").observe(time.perf_counter() - start)
+        finally:
+            self.active -= 1
+            self._get_semaphore().release()
+        record_usage(self.name, getattr(response, "usage", None))
+        return response.content[0].text.strip()
+
+    async def complete(self, system: str, messages: List[Dict[str, str]],
+                       timeout: Optional[float] = None) -> str:
+        """Run one completion, sharing the upstream call with identical in-flight requests.
+
+        The deadline applies to this caller only: a caller that gives up does
+        not cancel the shared call for the others, but the last one to leave does.
+        """
+        self.requests += 1
+        key = (system, tuple((m["role"], m["content"]) for m in messages))
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._call(system, key[1]))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t, k=key: self._finished(k, t))
+        else:
+            self.coalesced += 1
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout or self.timeout)
+        except asyncio.TimeoutError:
+            self.deadline_exceeded += 1
+            raise LLMDeadlineExceeded(f"LLM request exceeded {timeout or self.timeout:g}s deadline")
+        finally:
+            self._leave(key, task)
+
+    def _leave(self, key: Tuple, task: asyncio.Task):
+        """Drop one waiter; cancel the shared call if nobody is left waiting for it"""
+        remaining = self._waiters[task] - 1
+        if remaining:
+            self._waiters[task] = remaining
+            return
+        del self._waiters[task]
+        if not task.done():
+            # Forget it first so a new identical request starts a fresh call
+            if self._inflight.get(key) is task:
+                del self._inflight[key]
+            task.cancel()
+            self.abandoned += 1
+
+    def _finished(self, key: Tuple, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every caller timed out
+            task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "upstream_calls": self.upstream_calls,
+            "coalesced": self.coalesced,
+            "deadline_exceeded": self.deadline_exceeded,
+            "abandoned": self.abandoned,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+        }
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Conversation Memory for NANDA Agents
+
+Keeps recent turns per conversation_id so follow-up messages carry their
+context. Each conversation holds at most `token_budget` (estimated) tokens:
+when a new turn pushes it over, the oldest turns are folded into a short
+rolling summary. All conversations together are capped at `max_total_tokens`
+and `max_conversations`; least recently used conversations are evicted first,
+and conversations idle for longer than `idle_ttl` are dropped.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+_SPACE_RE = re.compile(r"\s+")
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s")
+
+# Characters kept from each turn when it is folded into the summary
+SUMMARY_TURN_CHARS = 160
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token for English text)"""
+    return len(text) // 4 + 1
+
+
+def _compact(text: str) -> str:
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def summarize_turns(turns: List[Tuple[str, str]]) -> str:
+    """Extractive summary: the first sentence of each turn, clipped"""
+    lines = []
+    for user_text, assistant_text in turns:
+        for role, text in (("User", user_text), ("Agent", assistant_text)):
+            first = _SENTENCE_RE.split(text, 1)[0]
+            if len(first) > SUMMARY_TURN_CHARS:
+                first = first[:SUMMARY_TURN_CHARS - 3] + "..."
+            lines.append(f"{role}: {first}")
+    return "\n".join(lines)
+
+
+class _Conversation:
+    __slots__ = ("turns", "summary", "tokens", "last_used")
+
+    def __init__(self):
+        self.turns: List[Tuple[str, str, int]] = []  # (user, assistant, tokens)
+        self.summary = ""
+        self.tokens = 0
+        self.last_used = time.monotonic()
+
+
+class ConversationMemory:
+    """Thread-safe, bounded store of conversation turns keyed by conversation_id"""
+
+    def __init__(self, token_budget: int = 2000, max_conversations: int = 10000,
+                 max_total_tokens: int = 2_000_000, idle_ttl: float = 3600.0,
+                 summarize: Optional[Callable[[List[Tuple[str, str]]], str]] = None):
+        self.token_budget = token_budget
+        self.max_conversations = max_conversations
+        self.max_total_tokens = max_total_tokens
+        self.idle_ttl = idle_ttl
+        self.summarize = summarize or summarize_turns
+        # Summary gets at most a quarter of the budget; the rest holds verbatim turns
+        self.summary_budget = max(token_budget // 4, 1)
+        self._conversations: "OrderedDict[str, _Conversation]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_tokens = 0
+        self.evictions = 0
+        self.expired = 0
+        self.summarized_turns = 0
+
+    def context(self, conversation_id: str) -> Tuple[str, List[Dict[str, str]]]:
+        """Rolling summary and prior turns as Anthropic messages (oldest first)"""
+        with self._lock:
+            self._expire(time.monotonic())
+            conversation = self._conversations.get(conversation_id)
+            if conversation is None:
+                return "", []
+            self._conversations.move_to_end(conversation_id)
+            conversation.last_used = time.monotonic()
+            messages = []
+            for user_text, assistant_text, _ in conversation.turns:
+                messages.append({"role": "user", "content": user_text})
+                messages.append({"role": "assistant", "content": assistant_text})
+            return conversation.summary, messages
+
+    def record(self, conversation_id: str, message: str, response: str):
+        """Append one user/agent exchange and enforce the budgets"""
+        if self.token_budget <= 0 or not conversation_id:
+            return
+        user_text, assistant_text = _compact(message), _compact(response)
+        # Each side of a turn is capped at half the budget
+        limit = self.token_budget * 2
+        user_text, assistant_text = user_text[:limit], assistant_text[:limit]
+        tokens = estimate_tokens(user_text) + estimate_tokens(assistant_text)
+        now = time.monotonic()
+        with self._lock:
+            conversation = self._conversations.get(conversation_id)
+            if conversation is None:
+                conversation = self._conversations[conversation_id] = _Conversation()
+            self._conversations.move_to_end(conversation_id)
+            conversation.turns.append((user_text, assistant_text, tokens))
+            conversation.last_used = now
+            self._adjust(conversation, tokens)
+            if conversation.tokens > self.token_budget:
+                self._fold(conversation)
+            self._expire(now)
+            self._evict()
+
+    def _adjust(self, conversation: _Conversation, delta: int):
+        conversation.tokens += delta
+        self.total_tokens += delta
+
+    def _fold(self, conversation: _Conversation):
+        """Move the oldest turns into the summary until the budget holds"""
+        folded = []
+        before = conversation.tokens
+        turn_tokens = sum(t for _, _, t in conversation.turns)
+        while conversation.turns and turn_tokens > self.token_budget - self.summary_budget:
+            user_text, assistant_text, tokens = conversation.turns.pop(0)
+            folded.append((user_text, assistant_text))
+            turn_tokens -= tokens
+        if not folded:
+            return
+        self.summarized_turns += len(folded)
+        summary = self.summarize(folded)
+        if conversation.summary:
+            summary = conversation.summary + "\n" + summary
+        # Keep the newest part of the summary within its budget
+        max_chars = self.summary_budget * 4
+        if len(summary) > max_chars:
+            summary = summary[-max_chars:]
+            summary = summary[summary.find("\n") + 1:] if "\n" in summary else summary
+        conversation.summary = summary
+        conversation.tokens = turn_tokens + estimate_tokens(summary)
+        self.total_tokens += conversation.tokens - before
+
+    def _expire(self, now: float):
+        # Oldest-used conversations sit at the front
+        while self._conversations:
+            conversation_id, conversation = next(iter(self._conversations.items()))
+            if now - conversation.last_used < self.idle_ttl:
+                break
+            self._drop(conversation_id)
+            self.expired += 1
+
+    def _evict(self):
+        while self._conversations and (len(self._conversations) > self.max_conversations
+                                       or self.total_tokens > self.max_total_tokens):
+            self._drop(next(iter(self._conversations)))
+            self.evictions += 1
+
+    def _drop(self, conversation_id: str):
+        conversation = self._conversations.pop(conversation_id)
+        self.total_tokens -= conversation.tokens
+
+    def forget(self, conversation_id: str):
+        with self._lock:
+            if conversation_id in self._conversations:
+                self._drop(conversation_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "conversations": len(self._conversations),
+                "total_tokens": self.total_tokens,
+                "evictions": self.evictions,
+                "expired": self.expired,
+                "summarized_turns": self.summarized_turns,
+            }
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Intent Router for NANDA Agents
+
+Answers plain data lookups ("water levels in Boston", "shelter capacity near
+Seaport District") straight from the crisis MCP tools instead of the LLM, and
+lets everything else fall through to the model.
+
+A message is routed when it is short, has no open-ended cue (why, should,
+recommend, plan, ...), reads as a lookup (a question, a lookup verb, or a
+short noun phrase with no verb or status word) rather than a report (urgency
+words such as trapped or help, a first-person statement, or a status such as
+"lost power" or "at capacity"), and either matches an intent's keyword pattern
+or is classified as a lookup by a small naive Bayes model over the examples
+below with enough confidence. Several matching intents are answered together. The
+city is the first known city named in the message, else the default city
+(unless the message names some other place).
+
+Routing is purely local and deterministic; a tool failure falls through to
+the LLM as well, so the router can only make answers faster.
+"""
+import asyncio
+import math
+import re
+import threading
+from collections import Counter as TermCounter
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from mcp_client import MCPToolError
+from telemetry import Counter
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# Longer messages are treated as open-ended (reports, orchestration prompts)
+MAX_ROUTED_WORDS = 20
+
+# Phrasing that asks for judgement rather than data
+OPEN_ENDED = re.compile(
+    r"\b(why|should|explain|recommend\w*|advi[cs]e|plan|compare|predict\w*|what if|"
+    r"synthesi[sz]e|coordinate|prioriti[sz]e|decide|assess\w*|summari[sz]e|draft|write)\b")
+
+# Reports and calls for help always go to the LLM, even when they mention
+# rain, shelters or beds
+REPORT_CUES = re.compile(
+    r"\b(trapped|stuck|stranded|help|injur\w*|hurt|bleeding|rescue\w*|drown\w*|dying|sos|mayday|"
+    r"send|overwhelmed|missing|swept|collaps\w*|urgent\w*|emergency now|no \w+ left)\b")
+FIRST_PERSON = re.compile(r"\b(i|i'm|im|i've|we|we're|we've|my|our|us|me)\b")
+
+# Lookup phrasing: a question, a lookup verb up front, or a short noun phrase
+LOOKUP_START = re.compile(
+    r"^\W*(what|what's|whats|where|how|which|when|is|are|any|can|could|do|does|will|"
+    r"show|list|get|find|check|give|tell me|current|latest)\b")
+MAX_PHRASE_WORDS = 6
+
+# Verbs and status words that turn a phrase into a field report ("Boston
+# General lost power", "Rain stopped", "gauge offline at fort point"), plus
+# any past-tense verb ("Heavy rain reported on Storrow Drive")
+STATUS_WORDS = re.compile(
+    r"\b(is|are|was|were|has|have|had|been|lost|losing|lose|stopped|stopping|started|starting|"
+    r"offline|online|down|out|closed|closing|reopened|full|empty|overflowing|overflowed|"
+    r"flooding|rising|rose|falling|fell|dropping|dropped|blocked|damaged|failed|failing|"
+    r"broken|broke|cut off|underwater|submerged|(at|over|near) capacity|no power|without)\b|"
+    r"\b\w+[^e\W]ed\b")
+
+ROUTER_REQUESTS = Counter("agent_router_requests_total", "Messages by router outcome (intent or llm)",
+                          ["agent", "route"])
+
+
+class Intent(NamedTuple):
+    tool: str
+    pattern: "re.Pattern"
+    # Tool arguments for (city, location)
+    arguments: Any
+
+
+INTENTS = {
+    "water_levels": Intent(
+        "monitor_risk_zones",
+        re.compile(r"\b(water|river|gauge|stream|tide)\s+(levels?|heights?|readings?|gauges?)\b|"
+                   r"\bgauges?\b|\bflood stage\b|\brisk zones?\b|\bhigh[- ]risk (zones?|areas?)\b"),
+        lambda city, location: {"city": city}),
+    "flood_risk": Intent(
+        "get_flood_risk",
+        re.compile(r"\bflood(ing)?\s+risk\b|\brisk\s+level\b|\b(rain|rainfall|weather)\b|"
+                   r"\bchance of flood(ing)?\b"),
+        lambda city, location: {"location": city}),
+    "resources": Intent(
+        "find_emergency_resources",
+        re.compile(r"\bshelters?\b|\bhospitals?\b|\b(beds?|capacity|capacities)\b|"
+                   r"\bemergency (resources|services)\b"),
+        lambda city, location: {"city": city, **({"location": location} if location else {})}),
+}
+
+# A capitalized place after in/for/at; when it is not a known city the
+# message is not about the default city either
+_PLACE_RE = re.compile(r"\b(?:in|for|at)\s+([A-Z][\w.'-]*(?:\s+[A-Z][\w.'-]*)*)")
+
+# Reference point for resource lookups: "near X", "around X", "close to X"
+_LOCATION_RE = re.compile(r"\b(?:near|around|close to)\s+(.+?)(?=\s+in\s+|[?.!,;]|$)", re.IGNORECASE)
+
+# Labelled examples for the classifier; "llm" marks open-ended requests
+TRAINING_EXAMPLES = {
+    "water_levels": [
+        "water levels in boston", "how high is the charles river", "current river levels",
+        "what is the gauge reading", "is the river above flood stage", "fort point channel level",
+        "which zones are high risk", "how high is the water", "river height now",
+        "are any gauges critical", "monitor risk zones", "water level report",
+    ],
+    "flood_risk": [
+        "flood risk in boston", "what is the flood risk", "how much rain fell",
+        "current weather conditions", "is flooding likely", "rainfall in the last hour",
+        "flood risk level", "will it flood today", "how heavy is the rain", "weather report",
+    ],
+    "resources": [
+        "shelter capacity", "where are the shelters", "which shelters have space",
+        "how many hospital beds are available", "nearest shelter", "open shelters near seaport",
+        "emergency resources in boston", "where can people stay tonight", "hospital capacity",
+        "find a shelter", "available beds", "where can evacuees go",
+    ],
+    "llm": [
+        "hello there", "tell me about yourself", "what should we do next",
+        "why is the water rising so fast", "draft a public alert for residents",
+        "recommend an evacuation plan", "coordinate with the dispatcher", "thank you",
+        "summarize the situation", "what do you think about the reports", "who are you",
+        "can you help me", "explain your role", "is this report credible", "how are you",
+        "prioritize the rescue requests", "what time is it",
+    ],
+}
+
+
+def tokens(text: str) -> List[str]:
+    return _WORD_RE.findall(text.lower())
+
+
+def is_lookup(text: str) -> bool:
+    """Whether lowercased text asks for data rather than reporting a situation"""
+    if REPORT_CUES.search(text):
+        return False
+    if "?" in text or LOOKUP_START.search(text):
+        return True
+    # Anything else must be a bare noun phrase ("shelter capacity near seaport")
+    return (len(tokens(text)) <= MAX_PHRASE_WORDS and not FIRST_PERSON.search(text)
+            and not STATUS_WORDS.search(text))
+
+
+class IntentClassifier:
+    """Multinomial naive Bayes over word tokens with add-one smoothing"""
+
+    def __init__(self, examples: Dict[str, List[str]] = TRAINING_EXAMPLES):
+        self.labels = list(examples)
+        counts = {label: TermCounter(t for text in texts for t in tokens(text))
+                  for label, texts in examples.items()}
+        vocabulary = set().union(*counts.values())
+        total = sum(len(texts) for texts in examples.values())
+        self._prior = {label: math.log(len(texts) / total) for label, texts in examples.items()}
+        self._loglik = {}
+        self._unseen = {}
+        for label, counter in counts.items():
+            denominator = sum(counter.values()) + len(vocabulary)
+            self._loglik[label] = {t: math.log((n + 1) / denominator) for t, n in counter.items()}
+            self._unseen[label] = math.log(1 / denominator)
+        self._vocabulary = vocabulary
+
+    def classify(self, text: str) -> tuple:
+        """(label, probability); words never seen in training are ignored"""
+        words = [t for t in tokens(text) if t in self._vocabulary]
+        scores = {label: self._prior[label] + sum(self._loglik[label].get(t, self._unseen[label])
+                                                  for t in words)
+                  for label in self.labels}
+        best = max(scores, key=scores.get)
+        norm = sum(math.exp(score - scores[best]) for score in scores.values())
+        return best, 1.0 / norm
+
+
+class Route(NamedTuple):
+    intents: List[str]
+    city: str
+    location: Optional[str]
+    # "pattern" or "classifier"
+    matched_by: str
+
+
+class IntentRouter:
+    """Decides whether a message is a data lookup, and for which tools"""
+
+    def __init__(self, default_city: str = "Boston", min_confidence: float = 0.85,
+                 classifier: Optional[IntentClassifier] = None):
+        self.default_city = default_city
+        self.min_confidence = min_confidence
+        self.classifier = classifier or IntentClassifier()
+        self._lock = threading.Lock()
+        self.routed: Dict[str, int] = {}
+        self.fallthrough = 0
+
+    def route(self, message: str, cities: List[str]) -> Optional[Route]:
+        """The lookup to answer the message with, or None for the LLM"""
+        text = message.lower()
+        if len(tokens(text)) > MAX_ROUTED_WORDS or OPEN_ENDED.search(text) or not is_lookup(text):
+            return None
+        city = next((c for c in cities if re.search(rf"\b{re.escape(c.lower())}\b", text)), None)
+        if city is None:
+            if self.default_city not in cities or _PLACE_RE.search(message):
+                return None
+            city = self.default_city
+        intents = [name for name, intent in INTENTS.items() if intent.pattern.search(text)]
+        matched_by = "pattern"
+        if not intents:
+            label, probability = self.classifier.classify(text)
+            if label not in INTENTS or probability < self.min_confidence:
+                return None
+            intents, matched_by = [label], "classifier"
+        location = None
+        if "resources" in intents:
+            found = _LOCATION_RE.search(message)
+            if found and found.group(1).strip().lower() != city.lower():
+                location = found.group(1).strip()
+        return Route(intents, city, location, matched_by)
+
+    def calls(self, route: Route) -> List[tuple]:
+        """(tool, arguments) per intent, asking for the readable report"""
+        return [(INTENTS[name].tool, {**INTENTS[name].arguments(route.city, route.location),
+                                      "format": "text"})
+                for name in route.intents]
+
+    def record(self, route: Optional[Route]):
+        with self._lock:
+            if route is None:
+                self.fallthrough += 1
+            else:
+                key = "+".join(route.intents)
+                self.routed[key] = self.routed.get(key, 0) + 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            routed = sum(self.routed.values())
+            total = routed + self.fallthrough
+            return {
+                "routed": routed,
+                "fallthrough": self.fallthrough,
+                "hit_rate": routed / total if total else 0.0,
+                "by_intent": dict(self.routed),
+            }
+
+
+def _passthrough(wrapper, agent_logic):
+    for name in ("cache", "memory", "executor", "scheduler", "dedup"):
+        setattr(wrapper, name, getattr(agent_logic, name, None))
+
+
+def create_router_logic(config: Dict[str, Any], agent_logic, tools):
+    """
+    Wrap an agent logic so data lookups are answered by the crisis MCP tools
+    (tools is an MCPToolClient) and only open-ended requests reach the LLM.
+    """
+    router = IntentRouter(config.get("default_city", "Boston"), config.get("router_min_confidence", 0.85))
+    agent_id = config["agent_id"]
+
+    def answer(message: str) -> Optional[str]:
+        try:
+            route = router.route(message, tools.cities())
+            if route is not None:
+                text = "\n\n".join(tools.call(tool, arguments) for tool, arguments in router.calls(route))
+        except MCPToolError as e:
+            print(f"⚠️ Fast path unavailable, using LLM: {e}")
+            route = None
+        router.record(route)
+        ROUTER_REQUESTS.labels(agent=agent_id, route="+".join(route.intents) if route else "llm").inc()
+        return text if route is not None else None
+
+    def router_logic(message: str, conversation_id: str) -> str:
+        text = answer(message)
+        return text if text is not None else agent_logic(message, conversation_id)
+
+    def stream_router_logic(message: str, conversation_id: str):
+        text = answer(message)
+        if text is not None:
+            yield text
+        else:
+            yield from agent_logic.stream(message, conversation_id)
+
+    _passthrough(router_logic, agent_logic)
+    router_logic.router = router
+    router_logic.tools = tools
+    if hasattr(agent_logic, "stream"):
+        router_logic.stream = stream_router_logic
+    return router_logic
+
+
+def create_async_router_logic(config: Dict[str, Any], agent_logic, tools):
+    """Async counterpart of create_router_logic for event-loop hosts"""
+    router = IntentRouter(config.get("default_city", "Boston"), config.get("router_min_confidence", 0.85))
+    agent_id = config["agent_id"]
+
+    async def async_router_logic(message: str, conversation_id: str, timeout: float = None) -> str:
+        try:
+            route = router.route(message, await tools.acities())
+            if route is not None:
+                texts = await asyncio.gather(*(tools.acall(tool, arguments)
+                                               for tool, arguments in router.calls(route)))
+        except MCPToolError as e:
+            print(f"⚠️ Fast path unavailable, using LLM: {e}")
+            route = None
+        router.record(route)
+        ROUTER_REQUESTS.labels(agent=agent_id, route="+".join(route.intents) if route else "llm").inc()
+        if route is not None:
+            return "\n\n".join(texts)
+        return await agent_logic(message, conversation_id, timeout=timeout)
+
+    _passthrough(async_router_logic, agent_logic)
+    async_router_logic.router = router
+    async_router_logic.tools = tools
+    return async_router_logic
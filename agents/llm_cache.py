@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+LLM Response Cache for NANDA Agents
+
+Bounded LRU cache of Claude responses keyed on (system prompt, model,
+normalized message); normalization only folds case and whitespace, so
+"5 + 3" and "5 - 3" never share an entry. Entries expire after a per-entry
+TTL. An optional similarity lookup serves near-identical messages (same
+words and symbols, different sentence punctuation/order) from the closest
+cached entry above a Jaccard threshold.
+"""
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+# Similarity tokens: words, numbers (with any sign) and every symbol other
+# than sentence punctuation, so "level > 10" and "level < 10" differ
+_TOKEN_RE = re.compile(r"[-+]?[a-z0-9@#']+(?:[.:][a-z0-9]+)*|[^\sa-z0-9@#'.,!?;:\"]")
+
+# Recent entries compared during a similarity lookup
+SIMILARITY_SCAN_LIMIT = 256
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase and collapse whitespace; every other character is kept"""
+    return " ".join(message.lower().split())
+
+
+def message_tokens(normalized: str) -> frozenset:
+    """Token set of a normalized message for similarity lookups"""
+    return frozenset(_TOKEN_RE.findall(normalized))
+
+
+class ResponseCache:
+    """Thread-safe LRU + TTL cache for LLM responses"""
+
+    def __init__(self, max_entries: int = 512, ttl: float = 120.0,
+                 similarity_threshold: float = 0.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        # (namespace, normalized message) -> (expires_at, response, word set)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, str, frozenset]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _namespace(system_prompt: str, model: str) -> str:
+        return hashlib.sha1(f"{model}\x00{system_prompt}".encode("utf-8")).hexdigest()
+
+    def get(self, system_prompt: str, model: str, message: str) -> Optional[str]:
+        """Cached response for the message, or None on a miss"""
+        namespace = self._namespace(system_prompt, model)
+        normalized = normalize_message(message)
+        now = time.monotonic()
+        with self._lock:
+            key = (namespace, normalized)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+                self.expired += 1
+            if self.similarity_threshold > 0:
+                response = self._similar(namespace, message_tokens(normalized), now)
+                if response is not None:
+                    self.similar_hits += 1
+                    return response
+            self.misses += 1
+            return None
+
+    def _similar(self, namespace: str, words: frozenset, now: float) -> Optional[str]:
+        """Best Jaccard match among the most recently used live entries"""
+        if not words:
+            return None
+        best_score, best_key = 0.0, None
+        for i, (key, (expires_at, _, entry_words)) in enumerate(reversed(self._entries.items())):
+            if i >= SIMILARITY_SCAN_LIMIT:
+                break
+            if key[0] != namespace or expires_at <= now:
+                continue
+            score = len(words & entry_words) / len(words | entry_words)
+            if score > best_score:
+                best_score, best_key = score, key
+        if best_key is None or best_score < self.similarity_threshold:
+            return None
+        self._entries.move_to_end(best_key)
+        return self._entries[best_key][1]
+
+    def put(self, system_prompt: str, model: str, message: str, response: str,
+            ttl: Optional[float] = None):
+        """Store a response; ttl overrides the default (<= 0 means don't cache)"""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        normalized = normalize_message(message)
+        key = (self._namespace(system_prompt, model), normalized)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, response, message_tokens(normalized))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits + self.similar_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "hit_rate": (self.hits + self.similar_hits) / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Crisis MCP Client for NANDA Agents
+
+Keeps one stdio session to the crisis MCP server (mcp-servers/
+crisis_mcp_server.py) open on a background event loop, so agents can call
+its tools directly instead of asking the LLM. The server is started on first
+use with the agent's environment, so CRISIS_* settings (data directory,
+sensor feed, weather grids) apply to it as usual.
+
+Both threaded and event-loop callers share the session: call() and cities()
+block, acall() and acities() await. If the server cannot be started or stops responding, calls
+raise MCPToolError and the caller falls back to its slow path.
+"""
+import asyncio
+import os
+import shlex
+import sys
+import threading
+from contextlib import AsyncExitStack
+from typing import Any, Dict, List, Optional
+from urllib.parse import unquote
+
+try:
+    from mcp import ClientSession, StdioServerParameters
+    from mcp.client.stdio import stdio_client
+    MCP_AVAILABLE = True
+except ImportError:
+    MCP_AVAILABLE = False
+
+# Default server: the unified crisis MCP server next to this repo's agents
+CRISIS_MCP_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "mcp-servers",
+                                 "crisis_mcp_server.py")
+
+
+class MCPToolError(Exception):
+    """Raised when a tool call could not be completed"""
+
+
+class MCPToolClient:
+    """Shared stdio session to an MCP server, usable from threads and coroutines"""
+
+    def __init__(self, command: Optional[str] = None, timeout: float = 5.0):
+        self.argv = shlex.split(command) if command else [sys.executable, CRISIS_MCP_SERVER]
+        self.timeout = timeout
+        self._loop = None
+        self._session = None
+        self._stack = None
+        self._cities = None
+        self._start_lock = threading.Lock()
+        self._connect_lock = None
+        self.calls = 0
+        self.errors = 0
+
+    def _get_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="mcp-client", daemon=True).start()
+                self._loop = loop
+        return self._loop
+
+    async def _get_session(self):
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._session is None:
+                stack = AsyncExitStack()
+                try:
+                    params = StdioServerParameters(command=self.argv[0], args=self.argv[1:],
+                                                   env=dict(os.environ))
+                    read, write = await stack.enter_async_context(stdio_client(params))
+                    session = await stack.enter_async_context(ClientSession(read, write))
+                    await session.initialize()
+                    resources = await session.list_resources()
+                except BaseException:
+                    await stack.aclose()
+                    raise
+                # Each city the server has data for publishes crisis://{city}/alerts
+                self._cities = sorted({unquote(str(r.uri)[len("crisis://"):].split("/")[0])
+                                       for r in resources.resources if str(r.uri).startswith("crisis://")})
+                self._stack, self._session = stack, session
+            return self._session
+
+    async def _list_cities(self) -> List[str]:
+        await self._get_session()
+        return self._cities
+
+    async def _call(self, name: str, arguments: Dict[str, Any]) -> str:
+        session = await self._get_session()
+        try:
+            result = await session.call_tool(name, arguments)
+        except Exception:
+            # Drop the session so the next call reconnects
+            await self._reset()
+            raise
+        if getattr(result, "isError", False):
+            raise MCPToolError(f"{name} failed: {_text(result.content)}")
+        return _text(result.content)
+
+    async def _reset(self):
+        stack, self._stack, self._session = self._stack, None, None
+        if stack is not None:
+            try:
+                await stack.aclose()
+            except Exception:
+                pass
+
+    def _run(self, what: str, coro):
+        """Blocking run of a coroutine on the client loop"""
+        if not MCP_AVAILABLE:
+            coro.close()
+            raise MCPToolError("mcp package not installed")
+        future = asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+        try:
+            return future.result(self.timeout)
+        except MCPToolError:
+            self.errors += 1
+            raise
+        except Exception as e:
+            future.cancel()
+            self.errors += 1
+            raise MCPToolError(f"{what} failed: {str(e) or type(e).__name__}") from e
+
+    async def _arun(self, what: str, coro):
+        if not MCP_AVAILABLE:
+            coro.close()
+            raise MCPToolError("mcp package not installed")
+        future = asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._get_loop()))
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except MCPToolError:
+            self.errors += 1
+            raise
+        except Exception as e:
+            self.errors += 1
+            raise MCPToolError(f"{what} failed: {str(e) or type(e).__name__}") from e
+
+    def call(self, name: str, arguments: Dict[str, Any]) -> str:
+        """Run a tool and return its text content (blocking)"""
+        self.calls += 1
+        return self._run(name, self._call(name, arguments))
+
+    async def acall(self, name: str, arguments: Dict[str, Any]) -> str:
+        """Run a tool and return its text content"""
+        self.calls += 1
+        return await self._arun(name, self._call(name, arguments))
+
+    def cities(self) -> List[str]:
+        """Cities the server has data for (blocking; connects on first use)"""
+        if self._cities is not None:
+            return self._cities
+        return self._run("list_resources", self._list_cities())
+
+    async def acities(self) -> List[str]:
+        if self._cities is not None:
+            return self._cities
+        return await self._arun("list_resources", self._list_cities())
+
+    def stats(self) -> Dict[str, int]:
+        return {"calls": self.calls, "errors": self.errors, "connected": self._session is not None}
+
+    def close(self):
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self._reset(), self._loop).result(self.timeout)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop = None
+
+
+def _text(content: List[Any]) -> str:
+    return "".join(getattr(block, "text", "") for block in content)
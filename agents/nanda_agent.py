@@ -10,16 +10,26 @@ import sys
 import time
 import uuid
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterator
 
 # Add the parent directory to the path to allow importing streamlined_adapter
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from nanda_core.core.adapter import NANDA
+from async_llm import LLM_SECONDS, AsyncLLMExecutor, LLMDeadlineExceeded, llm_deadline, record_usage
+from conversation_memory import ConversationMemory
+from intent_router import create_router_logic
+from llm_cache import ResponseCache
+from mcp_client import MCP_AVAILABLE, MCPToolClient
+from priority_scheduler import create_priority_logic
+from report_dedup import create_dedup_logic
+from scatter_gather import create_orchestrator_logic, load_group
+from stream_server import StreamServer
+from telemetry import Counter, Gauge, MetricsServer, span
 
 # Try to import Anthropic - will fail gracefully if not available
 try:
-    from anthropic import Anthropic
+    from anthropic import Anthropic, AsyncAnthropic
     ANTHROPIC_AVAILABLE = True
 except ImportError:
     ANTHROPIC_AVAILABLE = False
@@ -84,7 +94,57 @@ When someone asks about yourself, mention that you're part of the NANDA agent ne
         "public_url": public_url,
         "system_prompt": system_prompt,
         "anthropic_api_key": os.getenv("ANTHROPIC_API_KEY"),
-        "model": "claude-3-haiku-20240307"  # Fast and cost-effective model
+        # Override to point agents at a local stub server for testing
+        "anthropic_base_url": os.getenv("ANTHROPIC_BASE_URL"),
+        "model": "claude-3-haiku-20240307",  # Fast and cost-effective model
+        # Async path: concurrent upstream calls (size to the rate limit) and
+        # per-request deadline in seconds
+        "llm_max_concurrency": int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+        "llm_timeout": float(os.getenv("LLM_TIMEOUT", "30")),
+        # Port for the SSE streaming endpoint (POST /a2a/stream); 0 = disabled
+        "stream_port": int(os.getenv("STREAM_PORT", "0")),
+        # Port for GET /metrics and /traces; 0 = disabled
+        "metrics_port": int(os.getenv("METRICS_PORT", "0")),
+        # Response cache: entries, TTL seconds, TTL for time-stamped answers
+        # (0 = never cache) and Jaccard threshold for near-duplicates (0 = exact only)
+        "response_cache_size": int(os.getenv("LLM_CACHE_SIZE", "512")),
+        "response_cache_ttl": float(os.getenv("LLM_CACHE_TTL", "120")),
+        "response_cache_time_ttl": float(os.getenv("LLM_CACHE_TIME_TTL", "0")),
+        "response_cache_similarity": float(os.getenv("LLM_CACHE_SIMILARITY", "0")),
+        # Conversation memory: tokens of history per conversation (0 = stateless),
+        # total tokens and conversations kept, and idle seconds before eviction
+        "conversation_token_budget": int(os.getenv("CONVERSATION_TOKEN_BUDGET", "0")),
+        "conversation_memory_tokens": int(os.getenv("CONVERSATION_MEMORY_TOKENS", "2000000")),
+        "conversation_max": int(os.getenv("CONVERSATION_MAX", "10000")),
+        "conversation_idle_ttl": float(os.getenv("CONVERSATION_IDLE_TTL", "3600")),
+        # Near-duplicate report filter: seconds a cluster shares one assessment
+        # (0 = off), Jaccard similarity to join a cluster, clusters kept
+        "dedup_window": float(os.getenv("REPORT_DEDUP_WINDOW", "0")),
+        "dedup_similarity": float(os.getenv("REPORT_DEDUP_SIMILARITY", "0.7")),
+        "dedup_max_clusters": int(os.getenv("REPORT_DEDUP_MAX_CLUSTERS", "5000")),
+        # Severity-priority scheduling of the llm_max_concurrency LLM slots: waiting
+        # requests beyond which the lowest priority is shed, seconds of waiting
+        # worth one priority level, and slots kept for critical (priority 5) requests
+        "priority_scheduling": os.getenv("PRIORITY_SCHEDULING", "false").lower() == "true",
+        "priority_queue_limit": int(os.getenv("PRIORITY_QUEUE_LIMIT", "64")),
+        "priority_aging": float(os.getenv("PRIORITY_AGING", "15")),
+        "priority_reserved_slots": int(os.getenv("PRIORITY_RESERVED_SLOTS", "1")),
+        # Fast path: answer data lookups from the crisis MCP tools without the LLM,
+        # for the default city unless another is named; the server command (default:
+        # mcp-servers/crisis_mcp_server.py) and per-call timeout in seconds
+        "fast_path": os.getenv("FAST_PATH_ROUTER", "false").lower() == "true",
+        "default_city": os.getenv("DEFAULT_CITY", "Boston"),
+        "router_min_confidence": float(os.getenv("ROUTER_MIN_CONFIDENCE", "0.85")),
+        "crisis_mcp_command": os.getenv("CRISIS_MCP_COMMAND"),
+        "mcp_timeout": float(os.getenv("MCP_TOOL_TIMEOUT", "5")),
+        # Orchestration (mission-control): tiers queried in parallel per request,
+        # group config listing their endpoints, per-call timeout, overall
+        # deadline and delay before hedging a slow agent (0 = no hedging)
+        "orchestrate_tiers": [t.strip() for t in os.getenv("ORCHESTRATE_TIERS", "").split(",") if t.strip()],
+        "agent_group_config": os.getenv("AGENT_GROUP_CONFIG"),
+        "scatter_timeout": float(os.getenv("SCATTER_TIMEOUT", "10")),
+        "orchestration_deadline": float(os.getenv("ORCHESTRATION_DEADLINE", "30")),
+        "hedge_after": float(os.getenv("HEDGE_AFTER", "0"))
     }
 
 # Load configuration
@@ -93,6 +153,10 @@ AGENT_CONFIG = get_agent_config()
 # Port configuration - use environment variable or default to 6000
 PORT = int(os.getenv("PORT", "6000"))
 
+# Responses by outcome: llm, cache, fallback, error or deadline
+AGENT_RESPONSES = Counter("agent_responses_total", "Agent responses by outcome", ["agent", "outcome"])
+AGENT_IN_PROGRESS = Gauge("agent_requests_in_progress", "Requests being answered", ["agent"])
+
 # =============================================================================
 # LLM-POWERED AGENT LOGIC - Uses Anthropic Claude for intelligent responses
 # =============================================================================
@@ -107,7 +171,8 @@ def create_llm_agent_logic(config: Dict[str, Any]):
     anthropic_client = None
     if ANTHROPIC_AVAILABLE and config.get("anthropic_api_key"):
         try:
-            anthropic_client = Anthropic(api_key=config["anthropic_api_key"])
+            anthropic_client = Anthropic(api_key=config["anthropic_api_key"],
+                                         base_url=config.get("anthropic_base_url"))
             print(f"✅ Anthropic Claude initialized for {config['agent_name']}")
         except Exception as e:
             print(f"❌ Failed to initialize Anthropic: {e}")
@@ -116,42 +181,251 @@ def create_llm_agent_logic(config: Dict[str, Any]):
     # Prepare system prompt (already formatted in get_agent_config)
     system_prompt = config["system_prompt"]
     
+    # Cache repeated queries; answers that carry the current time expire fast
+    cache = _create_response_cache(config)
+    time_sensitive_ttl = config.get("response_cache_time_ttl", 0.0)
+    memory = _create_conversation_memory(config)
+    agent_id = config["agent_id"]
+    in_progress = AGENT_IN_PROGRESS.labels(agent=agent_id)
+    
     def llm_agent_logic(message: str, conversation_id: str) -> str:
         """LLM-powered agent logic with fallback to basic responses"""
-        
+        in_progress.inc()
+        try:
+            with span("respond", agent=agent_id, conversation_id=conversation_id):
+                return _respond(message, conversation_id)
+        finally:
+            in_progress.dec()
+    
+    def _respond(message: str, conversation_id: str) -> str:
         # If LLM is available, use it for intelligent responses
         if anthropic_client:
             try:
                 # Add current time context if time-related query
-                context_info = ""
-                if any(time_word in message.lower() for time_word in ['time', 'date', 'when']):
-                    context_info = f"\n\nCurrent time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+                context_info = _time_context(message)
+                system, messages = _build_request(system_prompt + context_info, message,
+                                                  conversation_id, memory)
+                
+                # Time-stamped answers bypass the cache unless a short TTL is configured;
+                # follow-ups depend on their history, so only opening turns are cached
+                use_cache = (cache is not None and len(messages) == 1
+                             and (not context_info or time_sensitive_ttl > 0))
+                if use_cache:
+                    cached = cache.get(system_prompt, config["model"], message)
+                    if cached is not None:
+                        _remember(memory, conversation_id, message, cached)
+                        AGENT_RESPONSES.labels(agent=agent_id, outcome="cache").inc()
+                        return cached
                 
-                response = anthropic_client.messages.create(
-                    model=config["model"],
-                    max_tokens=500,
-                    system=system_prompt + context_info,
-                    messages=[
-                        {
-                            "role": "user", 
-                            "content": message
-                        }
-                    ]
-                )
+                start = time.perf_counter()
+                with span("llm", agent=agent_id, model=config["model"]):
+                    response = anthropic_client.messages.create(
+                        model=config["model"],
+                        max_tokens=500,
+                        system=system,
+                        messages=messages,
+                        **_deadline_kwargs()
+                    )
+                LLM_SECONDS.labels(agent=agent_id, path="sync").observe(time.perf_counter() - start)
+                record_usage(agent_id, getattr(response, "usage", None))
                 
-                return response.content[0].text.strip()
+                text = response.content[0].text.strip()
+                if use_cache:
+                    cache.put(system_prompt, config["model"], message, text,
+                              ttl=time_sensitive_ttl if context_info else None)
+                _remember(memory, conversation_id, message, text)
+                AGENT_RESPONSES.labels(agent=agent_id, outcome="llm").inc()
+                return text
                 
             except Exception as e:
                 print(f"❌ LLM Error: {e}")
+                AGENT_RESPONSES.labels(agent=agent_id, outcome="error").inc()
                 # Fall back to basic response
                 return f"Sorry, I'm having trouble processing that right now. Error: {str(e)}"
         
         # Fallback to basic responses if LLM not available
         else:
+            AGENT_RESPONSES.labels(agent=agent_id, outcome="fallback").inc()
             return _basic_fallback_response(message, config)
     
+    def stream_llm_agent_logic(message: str, conversation_id: str) -> Iterator[str]:
+        """Streaming variant: yields text chunks as Claude produces them"""
+        if not anthropic_client:
+            AGENT_RESPONSES.labels(agent=agent_id, outcome="fallback").inc()
+            yield _basic_fallback_response(message, config)
+            return
+        
+        context_info = _time_context(message)
+        system, messages = _build_request(system_prompt + context_info, message,
+                                          conversation_id, memory)
+        use_cache = (cache is not None and len(messages) == 1
+                     and (not context_info or time_sensitive_ttl > 0))
+        if use_cache:
+            cached = cache.get(system_prompt, config["model"], message)
+            if cached is not None:
+                _remember(memory, conversation_id, message, cached)
+                AGENT_RESPONSES.labels(agent=agent_id, outcome="cache").inc()
+                yield cached
+                return
+        
+        chunks = []
+        start = time.perf_counter()
+        try:
+            with anthropic_client.messages.stream(
+                model=config["model"],
+                max_tokens=500,
+                system=system,
+                messages=messages,
+                **_deadline_kwargs()
+            ) as stream:
+                for text in stream.text_stream:
+                    if not chunks:
+                        text = text.lstrip()
+                    if text:
+                        chunks.append(text)
+                        yield text
+        except Exception as e:
+            print(f"❌ LLM Error: {e}")
+            AGENT_RESPONSES.labels(agent=agent_id, outcome="error").inc()
+            yield f"Sorry, I'm having trouble processing that right now. Error: {str(e)}"
+            return
+        LLM_SECONDS.labels(agent=agent_id, path="stream").observe(time.perf_counter() - start)
+        AGENT_RESPONSES.labels(agent=agent_id, outcome="llm").inc()
+        
+        text = "".join(chunks).strip()
+        if use_cache:
+            cache.put(system_prompt, config["model"], message, text,
+                      ttl=time_sensitive_ttl if context_info else None)
+        _remember(memory, conversation_id, message, text)
+    
+    # Expose the cache and memory so hosts can report statistics, and the
+    # streaming variant for hosts that forward partial text
+    llm_agent_logic.cache = cache
+    llm_agent_logic.memory = memory
+    llm_agent_logic.stream = stream_llm_agent_logic
     return llm_agent_logic
 
+def create_async_llm_agent_logic(config: Dict[str, Any], async_client=None):
+    """
+    Async counterpart of create_llm_agent_logic for event-loop hosts.
+    Requests share a concurrency limit, identical in-flight requests share one
+    upstream call, and each request gets a deadline (config["llm_timeout"]).
+    Pass async_client to share one AsyncAnthropic connection pool across agents.
+    """
+    if async_client is None and ANTHROPIC_AVAILABLE and config.get("anthropic_api_key"):
+        try:
+            async_client = AsyncAnthropic(api_key=config["anthropic_api_key"],
+                                          base_url=config.get("anthropic_base_url"))
+            print(f"✅ Async Anthropic Claude initialized for {config['agent_name']}")
+        except Exception as e:
+            print(f"❌ Failed to initialize Anthropic: {e}")
+            async_client = None
+    
+    executor = None
+    if async_client is not None:
+        executor = AsyncLLMExecutor(
+            async_client,
+            model=config["model"],
+            max_concurrency=config.get("llm_max_concurrency", 8),
+            timeout=config.get("llm_timeout", 30.0),
+            name=config["agent_id"]
+        )
+    system_prompt = config["system_prompt"]
+    cache = _create_response_cache(config)
+    time_sensitive_ttl = config.get("response_cache_time_ttl", 0.0)
+    memory = _create_conversation_memory(config)
+    agent_id = config["agent_id"]
+    
+    async def async_llm_agent_logic(message: str, conversation_id: str, timeout: float = None) -> str:
+        """Async LLM-powered agent logic with fallback to basic responses"""
+        with span("respond", agent=agent_id, conversation_id=conversation_id):
+            return await _respond(message, conversation_id, timeout)
+    
+    async def _respond(message: str, conversation_id: str, timeout: float = None) -> str:
+        if executor is None:
+            AGENT_RESPONSES.labels(agent=agent_id, outcome="fallback").inc()
+            return _basic_fallback_response(message, config)
+        
+        context_info = _time_context(message)
+        system, messages = _build_request(system_prompt + context_info, message,
+                                          conversation_id, memory)
+        use_cache = (cache is not None and len(messages) == 1
+                     and (not context_info or time_sensitive_ttl > 0))
+        if use_cache:
+            cached = cache.get(system_prompt, config["model"], message)
+            if cached is not None:
+                _remember(memory, conversation_id, message, cached)
+                AGENT_RESPONSES.labels(agent=agent_id, outcome="cache").inc()
+                return cached
+        
+        try:
+            text = await executor.complete(system, messages, timeout=timeout)
+        except LLMDeadlineExceeded as e:
+            print(f"⏱️ LLM deadline exceeded: {e}")
+            AGENT_RESPONSES.labels(agent=agent_id, outcome="deadline").inc()
+            return f"Sorry, I couldn't respond in time. Error: {str(e)}"
+        except Exception as e:
+            print(f"❌ LLM Error: {e}")
+            AGENT_RESPONSES.labels(agent=agent_id, outcome="error").inc()
+            return f"Sorry, I'm having trouble processing that right now. Error: {str(e)}"
+        AGENT_RESPONSES.labels(agent=agent_id, outcome="llm").inc()
+        
+        if use_cache:
+            cache.put(system_prompt, config["model"], message, text,
+                      ttl=time_sensitive_ttl if context_info else None)
+        _remember(memory, conversation_id, message, text)
+        return text
+    
+    async_llm_agent_logic.cache = cache
+    async_llm_agent_logic.memory = memory
+    async_llm_agent_logic.executor = executor
+    return async_llm_agent_logic
+
+def _deadline_kwargs() -> Dict[str, Any]:
+    """Per-request timeout for a synchronous Claude call, when the caller set one"""
+    timeout = llm_deadline.get()
+    return {} if timeout is None else {"timeout": timeout}
+
+def _create_response_cache(config: Dict[str, Any]):
+    """Response cache sized from config, or None when disabled"""
+    if config.get("response_cache_size", 0) <= 0:
+        return None
+    return ResponseCache(
+        max_entries=config["response_cache_size"],
+        ttl=config.get("response_cache_ttl", 120.0),
+        similarity_threshold=config.get("response_cache_similarity", 0.0)
+    )
+
+def _create_conversation_memory(config: Dict[str, Any]):
+    """Conversation memory sized from config, or None for stateless agents"""
+    if config.get("conversation_token_budget", 0) <= 0:
+        return None
+    return ConversationMemory(
+        token_budget=config["conversation_token_budget"],
+        max_conversations=config.get("conversation_max", 10000),
+        max_total_tokens=config.get("conversation_memory_tokens", 2_000_000),
+        idle_ttl=config.get("conversation_idle_ttl", 3600.0)
+    )
+
+def _build_request(system: str, message: str, conversation_id: str, memory) -> tuple:
+    """System prompt and message list carrying the conversation's earlier turns"""
+    if memory is None:
+        return system, [{"role": "user", "content": message}]
+    summary, history = memory.context(conversation_id)
+    if summary:
+        system += f"\n\nEarlier in this conversation:\n{summary}"
+    return system, history + [{"role": "user", "content": message}]
+
+def _remember(memory, conversation_id: str, message: str, response: str):
+    if memory is not None:
+        memory.record(conversation_id, message, response)
+
+def _time_context(message: str) -> str:
+    """Current-time context appended to the system prompt for time-related queries"""
+    if any(time_word in message.lower() for time_word in ['time', 'date', 'when']):
+        return f"\n\nCurrent time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+    return ""
+
 def _basic_fallback_response(message: str, config: Dict[str, Any]) -> str:
     """Basic fallback responses when LLM is not available"""
     msg = message.lower().strip()
@@ -202,6 +476,42 @@ def main():
     # Create the LLM-powered agent logic based on configuration
     agent_logic = create_llm_agent_logic(AGENT_CONFIG)
     
+    # Urgent reports take LLM slots ahead of chatter; overflow is shed
+    if AGENT_CONFIG["priority_scheduling"]:
+        agent_logic = create_priority_logic(AGENT_CONFIG, agent_logic)
+        print(f"🚦 Priority scheduling: {AGENT_CONFIG['llm_max_concurrency']} LLM slots, "
+              f"queue limit {AGENT_CONFIG['priority_queue_limit']}")
+    
+    # Surges of near-identical reports share one LLM assessment per cluster
+    if AGENT_CONFIG["dedup_window"] > 0:
+        agent_logic = create_dedup_logic(AGENT_CONFIG, agent_logic)
+        print(f"🧹 Deduplicating near-identical reports for {AGENT_CONFIG['dedup_window']:g}s")
+    
+    # Data lookups go straight to the crisis MCP tools
+    if AGENT_CONFIG["fast_path"]:
+        if MCP_AVAILABLE:
+            tools = MCPToolClient(AGENT_CONFIG["crisis_mcp_command"], AGENT_CONFIG["mcp_timeout"])
+            agent_logic = create_router_logic(AGENT_CONFIG, agent_logic, tools)
+            print(f"⚡ Fast path: data lookups answered by MCP tools (default city {AGENT_CONFIG['default_city']})")
+        else:
+            print("⚠️ FAST_PATH_ROUTER is set but the mcp library is not available. Install with: pip install mcp")
+    
+    # Mission control gathers reports from whole tiers in parallel before answering
+    if AGENT_CONFIG["orchestrate_tiers"] and AGENT_CONFIG["agent_group_config"]:
+        group = load_group(AGENT_CONFIG["agent_group_config"])
+        agent_logic = create_orchestrator_logic(AGENT_CONFIG, agent_logic, group)
+        print(f"🛰️ Orchestrating tiers: {', '.join(AGENT_CONFIG['orchestrate_tiers'])}")
+    
+    # Stream partial responses to callers that can consume them
+    if AGENT_CONFIG["stream_port"]:
+        StreamServer(agent_logic.stream, AGENT_CONFIG["stream_port"]).start()
+        print(f"📡 Streaming URL: http://localhost:{AGENT_CONFIG['stream_port']}/a2a/stream")
+    
+    # Prometheus metrics and recent traces
+    if AGENT_CONFIG["metrics_port"]:
+        MetricsServer(AGENT_CONFIG["metrics_port"]).start()
+        print(f"📈 Metrics URL: http://localhost:{AGENT_CONFIG['metrics_port']}/metrics")
+    
     # Create and start the NANDA agent
     nanda = NANDA(
         agent_id=AGENT_CONFIG["agent_id"],
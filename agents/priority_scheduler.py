@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Severity-Priority Scheduler for NANDA Agents
+
+Sits in front of the LLM agent logic and hands out its call slots by
+priority instead of arrival order, so an urgency-5 report from
+situation-assessor does not wait behind a backlog of low-value chatter.
+
+Each request gets a priority from 1 (chatter) to 5 (life safety): from the
+A2A "priority" field when the host passes one (see request_priority), else an
+inline "urgency: 5" / "severity 4/5" / "priority=high" marker in the message,
+else a keyword classifier. Waiting requests are ordered by priority minus
+their waiting time divided by the aging interval, so a low-priority request
+gains one level for every aging interval it waits and is never starved.
+
+Priorities at or above CRITICAL_PRIORITY are critical: they may use the
+reserved slots that other work cannot, and they are never shed. When more
+than queue_limit other requests are waiting, the one with the lowest aged
+priority (possibly the newcomer) is shed with a "Sorry, ..." reply.
+
+Usage:
+    logic = create_priority_logic(config, create_llm_agent_logic(config))
+"""
+import asyncio
+import contextvars
+import heapq
+import itertools
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from telemetry import Counter, Gauge, Histogram
+
+# Priorities run from LOWEST_PRIORITY to CRITICAL_PRIORITY
+LOWEST_PRIORITY = 1
+DEFAULT_PRIORITY = 2
+CRITICAL_PRIORITY = 5
+
+# Reply for shed requests; starts with the agent logic's error prefix so it is
+# never cached or shared by the dedup filter
+SHED_REPLY = "Sorry, I'm overloaded and dropped this lower-priority request. Please retry shortly."
+
+# Priority of the current request when the transport carries one (A2A "priority")
+request_priority: "contextvars.ContextVar[Optional[int]]" = contextvars.ContextVar(
+    "request_priority", default=None)
+
+_LEVELS = {"critical": 5, "urgent": 5, "extreme": 5, "high": 4, "medium": 3, "moderate": 3, "low": 1}
+
+# Inline metadata: "urgency: 5", "severity 4/5", "[PRIORITY high]"
+_MARKER_RE = re.compile(r"\b(?:urgency|severity|priority)\b\s*(?:level\s*)?[:=(]?\s*"
+                        r"([1-5]|critical|urgent|extreme|high|medium|moderate|low)\b", re.IGNORECASE)
+
+# Keyword classifier for messages without metadata, most severe first
+_KEYWORDS = [
+    (5, re.compile(r"\b(trapped|stranded|drowning|unconscious|not breathing|life[- ]threatening|"
+                   r"mayday|sos|need (help|rescue) now|swept away|on (the|our|my) roof)\b")),
+    (4, re.compile(r"\b(injur\w*|rescue|evacuat\w*|rising fast|water rising|levee|breach\w*|"
+                   r"collaps\w*|emergency|critical)\b")),
+    (3, re.compile(r"\b(flood\w*|overflow\w*|road closed|closure|power out(age)?|warning)\b")),
+    (1, re.compile(r"^\W*(hello|hi|hey|thanks|thank you|ok|okay|good (morning|afternoon|evening)|"
+                   r"how are you|who are you)\W*$")),
+]
+
+SCHEDULER_REQUESTS = Counter("agent_scheduler_requests_total",
+                             "Requests by priority and outcome (immediate, queued, shed or timeout)",
+                             ["agent", "priority", "outcome"])
+SCHEDULER_WAIT = Histogram("agent_scheduler_wait_seconds", "Time waiting for an LLM slot",
+                           ["agent", "priority"])
+SCHEDULER_QUEUE_DEPTH = Gauge("agent_scheduler_queue_depth", "Requests waiting for an LLM slot", ["agent"])
+
+
+def message_priority(message: str) -> int:
+    """Priority of a message from its inline metadata, else from its keywords"""
+    marker = _MARKER_RE.search(message)
+    if marker:
+        value = marker.group(1).lower()
+        return int(value) if value.isdigit() else _LEVELS[value]
+    text = message.lower()
+    for priority, pattern in _KEYWORDS:
+        if pattern.search(text):
+            return priority
+    return DEFAULT_PRIORITY
+
+
+def clamp_priority(value: Any) -> Optional[int]:
+    """Transport priority as 1-5 (numbers or level names), or None if unusable"""
+    if isinstance(value, str) and value.strip().lower() in _LEVELS:
+        return _LEVELS[value.strip().lower()]
+    try:
+        return min(max(int(value), LOWEST_PRIORITY), CRITICAL_PRIORITY)
+    except (TypeError, ValueError):
+        return None
+
+
+class Ticket:
+    """A request's place in the scheduler"""
+
+    __slots__ = ("priority", "key", "seq", "enqueued", "state", "waiter")
+
+    # States: waiting in the queue, holding a slot, shed, or cancelled
+    WAITING, RUNNING, SHED, CANCELLED = range(4)
+
+    def __init__(self, priority: int, key: float, seq: int, waiter):
+        self.priority = priority
+        self.key = key
+        self.seq = seq
+        self.enqueued = time.monotonic()
+        self.state = Ticket.WAITING
+        # threading.Event or asyncio.Future, set when the ticket leaves the queue
+        self.waiter = waiter
+
+    @property
+    def critical(self) -> bool:
+        return self.priority >= CRITICAL_PRIORITY
+
+
+def _wake(ticket: Ticket):
+    waiter = ticket.waiter
+    if isinstance(waiter, threading.Event):
+        waiter.set()
+    elif not waiter.done():
+        waiter.set_result(None)
+
+
+class PriorityScheduler:
+    """Bounded priority queue with aging and load shedding in front of a fixed number of slots"""
+
+    def __init__(self, slots: int = 8, queue_limit: int = 64, aging: float = 15.0, reserved: int = 1):
+        self.slots = max(slots, 1)
+        self.queue_limit = queue_limit
+        # Seconds of waiting worth one priority level
+        self.aging = aging
+        # Slots only critical requests may take
+        self.reserved = min(max(reserved, 0), self.slots - 1)
+        self._critical: List[Tuple[float, int, Ticket]] = []
+        self._normal: List[Tuple[float, int, Ticket]] = []
+        # Max-heap over _normal for finding the request to shed; both are
+        # cleaned lazily, tickets that left the queue are skipped
+        self._shed_order: List[Tuple[float, int, Ticket]] = []
+        self._normal_waiting = 0
+        self._critical_waiting = 0
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self.running = 0
+        self.started = 0
+        self.queued = 0
+        self.shed = 0
+        self.timeouts = 0
+
+    @property
+    def waiting(self) -> int:
+        return self._critical_waiting + self._normal_waiting
+
+    def _key(self, priority: int, now: float) -> float:
+        # Aged priority is priority + waited / aging; ordering by enqueue-time
+        # key keeps it fixed, so the heaps never need re-sorting
+        return now / self.aging - priority if self.aging > 0 else -priority
+
+    def acquire(self, priority: int, waiter) -> Tuple[Ticket, List[Ticket]]:
+        """Admit a request. Returns its ticket and any tickets shed to make room.
+
+        A RUNNING ticket holds a slot now; a WAITING one has its waiter set
+        once it is granted a slot or shed.
+        """
+        with self._lock:
+            ticket = Ticket(priority, self._key(priority, time.monotonic()), next(self._seq), waiter)
+            shed = []
+            if self._can_start(ticket) and not self._queued_ahead(ticket):
+                ticket.state = Ticket.RUNNING
+                self.running += 1
+                self.started += 1
+                return ticket, shed
+            if not ticket.critical and self._normal_waiting >= self.queue_limit:
+                victim = self._lowest_normal()
+                if victim is None or (victim.key, victim.seq) <= (ticket.key, ticket.seq):
+                    ticket.state = Ticket.SHED
+                    self.shed += 1
+                    return ticket, shed
+                self._leave(victim, Ticket.SHED)
+                self.shed += 1
+                shed.append(victim)
+            entry = (ticket.key, ticket.seq, ticket)
+            if ticket.critical:
+                heapq.heappush(self._critical, entry)
+                self._critical_waiting += 1
+            else:
+                heapq.heappush(self._normal, entry)
+                heapq.heappush(self._shed_order, (-ticket.key, -ticket.seq, ticket))
+                self._normal_waiting += 1
+            self.queued += 1
+        for victim in shed:
+            _wake(victim)
+        return ticket, shed
+
+    def release(self, ticket: Ticket):
+        """Give back a RUNNING ticket's slot, or withdraw a WAITING one (on timeout)"""
+        granted = []
+        with self._lock:
+            if ticket.state == Ticket.RUNNING:
+                ticket.state = Ticket.CANCELLED
+                self.running -= 1
+            elif ticket.state == Ticket.WAITING:
+                self._leave(ticket, Ticket.CANCELLED)
+                self.timeouts += 1
+            granted = self._dispatch()
+        for t in granted:
+            _wake(t)
+
+    def _can_start(self, ticket: Ticket) -> bool:
+        limit = self.slots if ticket.critical else self.slots - self.reserved
+        return self.running < limit
+
+    def _queued_ahead(self, ticket: Ticket) -> bool:
+        """Whether a waiting request that could take the free slot outranks the ticket"""
+        head = self._head(self._critical)
+        if head is not None and (head.key, head.seq) < (ticket.key, ticket.seq):
+            return True
+        head = self._head(self._normal)
+        return head is not None and self._can_start(head) and (head.key, head.seq) < (ticket.key, ticket.seq)
+
+    def _dispatch(self) -> List[Ticket]:
+        """Start the best waiting requests while slots are free"""
+        granted = []
+        while True:
+            candidates = [t for t in (self._head(self._critical), self._head(self._normal))
+                          if t is not None and self._can_start(t)]
+            if not candidates:
+                return granted
+            ticket = min(candidates, key=lambda t: (t.key, t.seq))
+            heapq.heappop(self._critical if ticket.critical else self._normal)
+            self._count_out(ticket)
+            ticket.state = Ticket.RUNNING
+            self.running += 1
+            self.started += 1
+            granted.append(ticket)
+
+    @staticmethod
+    def _head(heap: List[Tuple[float, int, Ticket]]) -> Optional[Ticket]:
+        while heap and heap[0][2].state != Ticket.WAITING:
+            heapq.heappop(heap)
+        return heap[0][2] if heap else None
+
+    def _lowest_normal(self) -> Optional[Ticket]:
+        while self._shed_order and self._shed_order[0][2].state != Ticket.WAITING:
+            heapq.heappop(self._shed_order)
+        return self._shed_order[0][2] if self._shed_order else None
+
+    def _leave(self, ticket: Ticket, state: int):
+        """Take a waiting ticket out of the queue; its heap entries are dropped lazily"""
+        ticket.state = state
+        self._count_out(ticket)
+        # Keep the heaps from filling with dead entries under sustained shedding
+        if len(self._shed_order) + len(self._critical) > 2 * self.waiting + 64:
+            for name in ("_critical", "_normal", "_shed_order"):
+                heap = [e for e in getattr(self, name) if e[2].state == Ticket.WAITING]
+                heapq.heapify(heap)
+                setattr(self, name, heap)
+
+    def _count_out(self, ticket: Ticket):
+        if ticket.critical:
+            self._critical_waiting -= 1
+        else:
+            self._normal_waiting -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self.running,
+                "waiting": self.waiting,
+                "slots": self.slots,
+                "reserved": self.reserved,
+                "started": self.started,
+                "queued": self.queued,
+                "shed": self.shed,
+                "timeouts": self.timeouts,
+            }
+
+
+def _create_scheduler(config: Dict[str, Any]) -> PriorityScheduler:
+    scheduler = PriorityScheduler(config.get("llm_max_concurrency", 8),
+                                  config.get("priority_queue_limit", 64),
+                                  config.get("priority_aging", 15.0),
+                                  config.get("priority_reserved_slots", 1))
+    SCHEDULER_QUEUE_DEPTH.labels(agent=config["agent_id"]).set_function(lambda: scheduler.waiting)
+    return scheduler
+
+
+def _passthrough(wrapper, agent_logic):
+    for name in ("cache", "memory", "executor"):
+        setattr(wrapper, name, getattr(agent_logic, name, None))
+
+
+def create_priority_logic(config: Dict[str, Any], agent_logic):
+    """
+    Wrap an agent logic so requests take its config["llm_max_concurrency"]
+    slots in priority order. A request that waits longer than llm_timeout
+    for a slot, or is shed, gets SHED_REPLY.
+    """
+    scheduler = _create_scheduler(config)
+    agent_id = config["agent_id"]
+    wait = config.get("llm_timeout", 30.0)
+
+    def acquire(message: str) -> Optional[Ticket]:
+        """A RUNNING ticket, or None when the request was shed or timed out"""
+        priority = request_priority.get() or message_priority(message)
+        ticket, _ = scheduler.acquire(priority, threading.Event())
+        outcome = "immediate"
+        if ticket.state == Ticket.WAITING:
+            ticket.waiter.wait(wait)
+            outcome = "queued"
+            if ticket.state == Ticket.WAITING:
+                scheduler.release(ticket)
+            if ticket.state != Ticket.RUNNING:
+                outcome = "timeout" if ticket.state == Ticket.CANCELLED else "shed"
+        elif ticket.state == Ticket.SHED:
+            outcome = "shed"
+        SCHEDULER_REQUESTS.labels(agent=agent_id, priority=str(priority), outcome=outcome).inc()
+        SCHEDULER_WAIT.labels(agent=agent_id, priority=str(priority)).observe(
+            time.monotonic() - ticket.enqueued)
+        return ticket if ticket.state == Ticket.RUNNING else None
+
+    def priority_logic(message: str, conversation_id: str) -> str:
+        ticket = acquire(message)
+        if ticket is None:
+            return SHED_REPLY
+        try:
+            return agent_logic(message, conversation_id)
+        finally:
+            scheduler.release(ticket)
+
+    def stream_priority_logic(message: str, conversation_id: str):
+        ticket = acquire(message)
+        if ticket is None:
+            yield SHED_REPLY
+            return
+        try:
+            yield from agent_logic.stream(message, conversation_id)
+        finally:
+            scheduler.release(ticket)
+
+    _passthrough(priority_logic, agent_logic)
+    priority_logic.scheduler = scheduler
+    if hasattr(agent_logic, "stream"):
+        priority_logic.stream = stream_priority_logic
+    return priority_logic
+
+
+def create_async_priority_logic(config: Dict[str, Any], agent_logic):
+    """Async counterpart of create_priority_logic for event-loop hosts"""
+    scheduler = _create_scheduler(config)
+    agent_id = config["agent_id"]
+
+    async def async_priority_logic(message: str, conversation_id: str, timeout: float = None) -> str:
+        priority = request_priority.get() or message_priority(message)
+        ticket, _ = scheduler.acquire(priority, asyncio.get_running_loop().create_future())
+        outcome = "immediate"
+        if ticket.state == Ticket.WAITING:
+            outcome = "queued"
+            try:
+                await asyncio.wait_for(asyncio.shield(ticket.waiter),
+                                       timeout or config.get("llm_timeout", 30.0))
+            except asyncio.TimeoutError:
+                pass
+            except BaseException:
+                # Cancelled while queued or just after being granted a slot
+                scheduler.release(ticket)
+                raise
+            if ticket.state == Ticket.WAITING:
+                scheduler.release(ticket)
+            if ticket.state != Ticket.RUNNING:
+                outcome = "timeout" if ticket.state == Ticket.CANCELLED else "shed"
+        elif ticket.state == Ticket.SHED:
+            outcome = "shed"
+        SCHEDULER_REQUESTS.labels(agent=agent_id, priority=str(priority), outcome=outcome).inc()
+        SCHEDULER_WAIT.labels(agent=agent_id, priority=str(priority)).observe(
+            time.monotonic() - ticket.enqueued)
+        if ticket.state != Ticket.RUNNING:
+            return SHED_REPLY
+        try:
+            return await agent_logic(message, conversation_id, timeout=timeout)
+        finally:
+            scheduler.release(ticket)
+
+    _passthrough(async_priority_logic, agent_logic)
+    async_priority_logic.scheduler = scheduler
+    return async_priority_logic
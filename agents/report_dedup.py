@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Report Filter for NANDA Agents
+
+Flood events produce waves of near-identical posts: retweets, quote posts and
+the same sighting reworded. This filter sits in front of an agent logic and
+clusters incoming reports so only the first report of each cluster (the
+representative) reaches the LLM; later members get the representative's
+assessment back, with the cluster's report count attached.
+
+Reports are fingerprinted with a 64-bit SimHash over word unigrams and
+bigrams (URLs, @mentions and the RT marker dropped). Fingerprints are split
+into bands; reports sharing a band value with a live cluster are candidates,
+and a candidate joins the cluster when the Jaccard similarity of their word
+features reaches the threshold. Identifying details - numbers (house
+numbers, head counts) and capitalized names past the start of a sentence
+(streets, neighbourhoods) - are left out of those features and must match
+exactly, so two calls for help from different addresses never merge.
+Reports the priority scheduler rates critical (someone trapped, a rescue
+needed) are always forwarded on their own. Clusters live for a fixed window after their
+representative arrived, so assessments are refreshed as a situation evolves,
+and the index holds at most max_clusters clusters.
+
+Usage:
+    logic = create_dedup_logic(config, create_llm_agent_logic(config))
+"""
+import asyncio
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from priority_scheduler import CRITICAL_PRIORITY, message_priority, request_priority
+from telemetry import Counter
+
+_URL_RE = re.compile(r"https?://\S+|www\.\S+")
+_MENTION_RE = re.compile(r"@\w+")
+_RT_RE = re.compile(r"^\W*rt\b\W*", re.IGNORECASE)
+_WORD_RE = re.compile(r"[A-Za-z0-9]+(?:['.][A-Za-z0-9]+)*")
+# Punctuation ending a sentence (or a "RT:" / "UPDATE:" prefix) before a word
+_SENTENCE_END = ".!?:;\n"
+
+# Fingerprint bits, split into bands of BAND_BITS for candidate lookup
+SIMHASH_BITS = 64
+BAND_BITS = 8
+
+# The agent logic's error replies start with this; they are never shared
+ERROR_PREFIX = "Sorry,"
+
+DEDUP_REPORTS = Counter("agent_dedup_reports_total", "Reports by dedup outcome (forwarded or duplicate)",
+                        ["agent", "result"])
+
+
+def _is_detail(text: str, match) -> bool:
+    """A number, or a capitalized word that does not start a sentence"""
+    word = match.group()
+    if any(c.isdigit() for c in word):
+        return True
+    if not word[0].isupper() or word == "I":
+        return False
+    before = text[:match.start()].rstrip()
+    return bool(before) and before[-1] not in _SENTENCE_END
+
+
+def report_words(text: str) -> Tuple[frozenset, frozenset]:
+    """(features, details) of a report, ignoring URLs, mentions and RT markers.
+
+    features are word unigrams and bigrams shared for similarity; details are
+    the identifying words (numbers and names) that have to match exactly.
+    """
+    text = _RT_RE.sub("", _MENTION_RE.sub(" ", _URL_RE.sub(" ", text)))
+    words = [(m.group().lower(), _is_detail(text, m)) for m in _WORD_RE.finditer(text)]
+    details = frozenset(word for word, detail in words if detail)
+    unigrams = frozenset(word for word, detail in words if not detail)
+    bigrams = frozenset(f"{a} {b}" for (a, da), (b, db) in zip(words, words[1:]) if not (da or db))
+    return unigrams | bigrams, details
+
+
+def simhash(features: frozenset) -> int:
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def _bands(fingerprint: int) -> List[Tuple[int, int]]:
+    mask = (1 << BAND_BITS) - 1
+    return [(i, fingerprint >> (i * BAND_BITS) & mask) for i in range(SIMHASH_BITS // BAND_BITS)]
+
+
+class ReportCluster:
+    """A representative report and the duplicates matched to it"""
+
+    __slots__ = ("id", "created", "features", "details", "bands", "count", "result", "waiter")
+
+    def __init__(self, cluster_id: int, features: frozenset, details: frozenset,
+                 bands: List[Tuple[int, int]]):
+        self.id = cluster_id
+        self.created = time.monotonic()
+        self.features = features
+        self.details = details
+        self.bands = bands
+        self.count = 1
+        # Representative's reply once it arrives; waiter is the wrapper's
+        # threading.Event or asyncio.Future for members arriving before that
+        self.result: Optional[str] = None
+        self.waiter = None
+
+
+class ReportDeduplicator:
+    """Time-windowed SimHash index of report clusters"""
+
+    def __init__(self, window: float = 300.0, similarity: float = 0.7, max_clusters: int = 5000):
+        self.window = window
+        self.similarity = similarity
+        self.max_clusters = max_clusters
+        self._clusters: "OrderedDict[int, ReportCluster]" = OrderedDict()
+        self._index: Dict[Tuple[int, int], List[int]] = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self.forwarded = 0
+        self.duplicates = 0
+
+    def match(self, message: str, waiter=None) -> Tuple[Optional[ReportCluster], bool]:
+        """(cluster, is_new) for a report; (None, True) for critical reports and
+        reports with no words, which are never clustered.
+
+        A new cluster gets waiter() as its waiter before any member can see it.
+        """
+        if (request_priority.get() or message_priority(message)) >= CRITICAL_PRIORITY:
+            return None, True
+        features, details = report_words(message)
+        if not features:
+            return None, True
+        bands = _bands(simhash(features))
+        with self._lock:
+            self._expire(time.monotonic())
+            best, best_score = None, self.similarity
+            for cluster_id in {cid for band in bands for cid in self._index.get(band, ())}:
+                cluster = self._clusters[cluster_id]
+                if cluster.details != details:
+                    continue
+                score = len(features & cluster.features) / len(features | cluster.features)
+                if score >= best_score:
+                    best, best_score = cluster, score
+            if best is not None:
+                best.count += 1
+                self.duplicates += 1
+                return best, False
+            cluster = ReportCluster(self._next_id, features, details, bands)
+            cluster.waiter = waiter() if waiter is not None else None
+            self._next_id += 1
+            self._clusters[cluster.id] = cluster
+            for band in bands:
+                self._index.setdefault(band, []).append(cluster.id)
+            while len(self._clusters) > self.max_clusters:
+                self._remove(next(iter(self._clusters)))
+            self.forwarded += 1
+            return cluster, True
+
+    def discard(self, cluster: ReportCluster):
+        """Drop a cluster whose representative failed, so the next member is forwarded"""
+        with self._lock:
+            if cluster.id in self._clusters:
+                self._remove(cluster.id)
+
+    def _expire(self, now: float):
+        while self._clusters:
+            cluster = next(iter(self._clusters.values()))
+            if now - cluster.created < self.window:
+                break
+            self._remove(cluster.id)
+
+    def _remove(self, cluster_id: int):
+        cluster = self._clusters.pop(cluster_id)
+        for band in cluster.bands:
+            members = self._index.get(band)
+            if members is not None:
+                members.remove(cluster_id)
+                if not members:
+                    del self._index[band]
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            reports = self.forwarded + self.duplicates
+            return {
+                "clusters": len(self._clusters),
+                "forwarded": self.forwarded,
+                "duplicates": self.duplicates,
+                "dedup_rate": self.duplicates / reports if reports else 0.0,
+            }
+
+
+def with_count(text: str, cluster: Optional[ReportCluster]) -> str:
+    """Reply with its cluster's report count attached"""
+    if cluster is None or cluster.count <= 1:
+        return text
+    return f"{text}\n\n[Cluster #{cluster.id}: {cluster.count} matching reports]"
+
+
+def _passthrough(wrapper, agent_logic):
+    for name in ("cache", "memory", "executor", "scheduler", "router", "tools"):
+        setattr(wrapper, name, getattr(agent_logic, name, None))
+
+
+def create_dedup_logic(config: Dict[str, Any], agent_logic):
+    """
+    Wrap an agent logic so near-duplicate reports within config["dedup_window"]
+    seconds share one LLM assessment. A member that arrives while the
+    representative is still being assessed waits for it (up to llm_timeout).
+    """
+    dedup = ReportDeduplicator(config["dedup_window"], config.get("dedup_similarity", 0.7),
+                               config.get("dedup_max_clusters", 5000))
+    agent_id = config["agent_id"]
+    wait = config.get("llm_timeout", 30.0)
+
+    def claim(message: str):
+        cluster, new = dedup.match(message, threading.Event)
+        DEDUP_REPORTS.labels(agent=agent_id, result="forwarded" if new else "duplicate").inc()
+        return cluster, new
+
+    def settle(cluster: Optional[ReportCluster], text: Optional[str]):
+        if cluster is None:
+            return
+        if text is None or text.startswith(ERROR_PREFIX):
+            dedup.discard(cluster)
+        else:
+            cluster.result = text
+        cluster.waiter.set()
+
+    def shared(cluster: ReportCluster) -> Optional[str]:
+        if cluster.waiter.wait(wait) and cluster.result is not None:
+            return with_count(cluster.result, cluster)
+        return None
+
+    def dedup_logic(message: str, conversation_id: str) -> str:
+        cluster, new = claim(message)
+        if not new:
+            text = shared(cluster)
+            if text is not None:
+                return text
+            return agent_logic(message, conversation_id)
+        text = None
+        try:
+            text = agent_logic(message, conversation_id)
+        finally:
+            settle(cluster, text)
+        return with_count(text, cluster)
+
+    def stream_dedup_logic(message: str, conversation_id: str):
+        cluster, new = claim(message)
+        if not new:
+            text = shared(cluster)
+            if text is not None:
+                yield text
+                return
+            yield from agent_logic.stream(message, conversation_id)
+            return
+        chunks = []
+        try:
+            for chunk in agent_logic.stream(message, conversation_id):
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            settle(cluster, "".join(chunks) if chunks else None)
+
+    _passthrough(dedup_logic, agent_logic)
+    dedup_logic.dedup = dedup
+    if hasattr(agent_logic, "stream"):
+        dedup_logic.stream = stream_dedup_logic
+    return dedup_logic
+
+
+def create_async_dedup_logic(config: Dict[str, Any], agent_logic):
+    """Async counterpart of create_dedup_logic for event-loop hosts"""
+    dedup = ReportDeduplicator(config["dedup_window"], config.get("dedup_similarity", 0.7),
+                               config.get("dedup_max_clusters", 5000))
+    agent_id = config["agent_id"]
+
+    async def async_dedup_logic(message: str, conversation_id: str, timeout: float = None) -> str:
+        cluster, new = dedup.match(message, asyncio.get_running_loop().create_future)
+        DEDUP_REPORTS.labels(agent=agent_id, result="forwarded" if new else "duplicate").inc()
+        if not new:
+            try:
+                await asyncio.wait_for(asyncio.shield(cluster.waiter),
+                                       timeout or config.get("llm_timeout", 30.0))
+            except asyncio.TimeoutError:
+                pass
+            if cluster.result is not None:
+                return with_count(cluster.result, cluster)
+            return await agent_logic(message, conversation_id, timeout=timeout)
+        if cluster is None:
+            return await agent_logic(message, conversation_id, timeout=timeout)
+        text = None
+        try:
+            text = await agent_logic(message, conversation_id, timeout=timeout)
+        finally:
+            if text is None or text.startswith(ERROR_PREFIX):
+                dedup.discard(cluster)
+            else:
+                cluster.result = text
+            cluster.waiter.set_result(None)
+        return with_count(text, cluster)
+
+    _passthrough(async_dedup_logic, agent_logic)
+    async_dedup_logic.dedup = dedup
+    return async_dedup_logic
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Scatter-Gather Orchestration for NANDA Agents
+
+Fans one request out to every agent in a tier (or an explicit list of agents)
+at the same time over A2A, gives each call its own timeout, optionally hedges
+slow agents with a duplicate request, and returns whatever arrived before the
+deadline so the orchestrator can synthesize from partial results instead of
+waiting on the slowest hop.
+
+Agents come from the group config (config/group-crisis-flood-response.json);
+each entry needs "agent_id", "tier" and either "url" or "port".
+
+Every call carries the active trace id (the "trace_id" body field and the
+X-Trace-Id header) and shows up as an a2a:<agent_id> span in it.
+"""
+import asyncio
+import json
+import os
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from async_llm import llm_deadline
+from telemetry import TRACE_FIELD, Counter, Histogram, current_trace_id, span, trace_headers
+
+# Host used for agents that only list a port in the group config
+AGENT_HOST = os.getenv("AGENT_HOST", "localhost")
+
+A2A_SECONDS = Histogram("a2a_call_seconds", "A2A call latency including hedging", ["target"])
+A2A_FAILURES = Counter("a2a_call_failures_total", "A2A calls without a usable reply", ["target"])
+A2A_HEDGES = Counter("a2a_hedges_total", "Hedged duplicate A2A requests", ["target"])
+
+
+@dataclass
+class AgentReply:
+    """Outcome of one scattered call"""
+    agent_id: str
+    text: str = ""
+    ok: bool = False
+    error: str = ""
+    seconds: float = 0.0
+    hedged: bool = False
+
+
+def load_group(path: str) -> List[Dict[str, Any]]:
+    """Agent entries from a group config file"""
+    with open(path) as f:
+        return json.load(f)
+
+
+def agent_url(agent: Dict[str, Any]) -> str:
+    if agent.get("url"):
+        return agent["url"]
+    return f"http://{AGENT_HOST}:{agent['port']}/a2a"
+
+
+def _reply_text(data: Any) -> str:
+    """Text of an A2A response message"""
+    if isinstance(data, dict):
+        content = data.get("content")
+        if isinstance(content, dict):
+            return str(content.get("text", ""))
+        if isinstance(content, str):
+            return content
+        parts = data.get("parts")
+        if isinstance(parts, list):
+            return "".join(str(p.get("text", "")) for p in parts if isinstance(p, dict))
+    return str(data)
+
+
+class ScatterGather:
+    """Parallel fan-out to groups of A2A agents with deadlines and hedging"""
+
+    def __init__(self, agents: List[Dict[str, Any]], timeout: float = 10.0,
+                 hedge_after: float = 0.0, client: Optional[httpx.AsyncClient] = None):
+        self.agents = {agent["agent_id"]: agent for agent in agents}
+        self.timeout = timeout
+        # Seconds before a duplicate request is sent to a slow agent (0 = never)
+        self.hedge_after = hedge_after
+        self._client = client
+        self.calls = 0
+        self.hedges = 0
+        self.timeouts = 0
+
+    def tier(self, name: str) -> List[str]:
+        return [agent_id for agent_id, agent in self.agents.items() if agent.get("tier") == name]
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient()
+        return self._client
+
+    async def _send(self, url: str, message: str, conversation_id: str, timeout: float) -> str:
+        response = await self._get_client().post(url, timeout=timeout, headers=trace_headers(), json={
+            "content": {"text": message, "type": "text"},
+            "role": "user",
+            "conversation_id": conversation_id,
+            TRACE_FIELD: current_trace_id()
+        })
+        response.raise_for_status()
+        return _reply_text(response.json())
+
+    async def call(self, agent_id: str, message: str, conversation_id: str,
+                   timeout: Optional[float] = None, hedge_after: Optional[float] = None) -> AgentReply:
+        """Call one agent; a hedged duplicate races the original and the first answer wins"""
+        with span(f"a2a:{agent_id}", agent=agent_id) as trace_id:
+            reply = await self._call(agent_id, message, conversation_id, timeout, hedge_after)
+        A2A_SECONDS.labels(target=agent_id).observe(reply.seconds)
+        if not reply.ok:
+            A2A_FAILURES.labels(target=agent_id).inc()
+            print(f"⚠️ A2A call to {agent_id} failed after {reply.seconds:.1f}s "
+                  f"(trace {trace_id}): {reply.error}")
+        return reply
+
+    async def _call(self, agent_id: str, message: str, conversation_id: str,
+                    timeout: Optional[float], hedge_after: Optional[float]) -> AgentReply:
+        timeout = self.timeout if timeout is None else timeout
+        hedge_after = self.hedge_after if hedge_after is None else hedge_after
+        agent = self.agents[agent_id]
+        # A hedge goes to a replica when one is configured, otherwise the same agent
+        urls = [agent_url(agent)] + list(agent.get("replicas", []))
+        reply = AgentReply(agent_id)
+        start = time.monotonic()
+        self.calls += 1
+
+        attempts = [asyncio.ensure_future(self._send(urls[0], message, conversation_id, timeout))]
+        try:
+            done = set()
+            if 0 < hedge_after < timeout:
+                done, _ = await asyncio.wait(attempts, timeout=hedge_after)
+                if not done:
+                    self.hedges += 1
+                    A2A_HEDGES.labels(target=agent_id).inc()
+                    reply.hedged = True
+                    attempts.append(asyncio.ensure_future(
+                        self._send(urls[1 % len(urls)], message, conversation_id, timeout - hedge_after)))
+            pending = set(attempts) - done
+            while not done or all(t.exception() is not None for t in done):
+                remaining = timeout - (time.monotonic() - start)
+                if not pending or remaining <= 0:
+                    break
+                finished, pending = await asyncio.wait(pending, timeout=remaining,
+                                                       return_when=asyncio.FIRST_COMPLETED)
+                if not finished:
+                    break
+                done |= finished
+            winner = next((t for t in done if t.exception() is None), None)
+            if winner is not None:
+                reply.text, reply.ok = winner.result(), True
+            elif done:
+                reply.error = str(next(iter(done)).exception()) or "request failed"
+            else:
+                self.timeouts += 1
+                reply.error = f"no reply within {timeout:g}s"
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+        reply.seconds = time.monotonic() - start
+        return reply
+
+    async def scatter(self, targets: List[str], message: str, conversation_id: Optional[str] = None,
+                      timeout: Optional[float] = None, hedge_after: Optional[float] = None) -> List[AgentReply]:
+        """Send the message to every target at once; targets are agent ids or tier names"""
+        agent_ids = []
+        for target in targets:
+            for agent_id in (self.tier(target) or [target]):
+                if agent_id in self.agents and agent_id not in agent_ids:
+                    agent_ids.append(agent_id)
+        conversation_id = conversation_id or uuid.uuid4().hex
+        return await asyncio.gather(*(self.call(agent_id, message, conversation_id, timeout, hedge_after)
+                                      for agent_id in agent_ids))
+
+    def stats(self) -> Dict[str, int]:
+        return {"calls": self.calls, "hedges": self.hedges, "timeouts": self.timeouts}
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def format_reports(replies: List[AgentReply]) -> str:
+    """Agent reports as a prompt section, noting which agents did not answer"""
+    answered = [r for r in replies if r.ok]
+    missing = [r for r in replies if not r.ok]
+    lines = [f"Agent reports ({len(answered)} of {len(replies)} responded):"]
+    for reply in answered:
+        lines.append(f"[{reply.agent_id}] ({reply.seconds:.1f}s) {reply.text}")
+    if missing:
+        lines.append("No report from: " + ", ".join(f"{r.agent_id} ({r.error})" for r in missing))
+    return "\n".join(lines)
+
+
+def synthesis_prompt(message: str, replies: List[AgentReply]) -> str:
+    """The request plus the collected reports, for the orchestrator's LLM"""
+    return f"{message}\n\n{format_reports(replies)}\n\nSynthesize these reports into a decision."
+
+
+def create_orchestrator_logic(config: Dict[str, Any], agent_logic, agents: List[Dict[str, Any]]):
+    """
+    Wrap an agent logic so each request is first scattered to the configured
+    tiers in parallel and the collected (possibly partial) reports are handed
+    to the LLM for synthesis.
+
+    orchestration_deadline bounds the whole request: the synthesis call gets
+    whatever time the fan-out left, and when none is left the reports are
+    returned without synthesis.
+    """
+    tiers = config["orchestrate_tiers"]
+    deadline = config.get("orchestration_deadline", 30.0)
+    per_call = config.get("scatter_timeout", 10.0)
+    hedge_after = config.get("hedge_after", 0.0)
+
+    def gather_reports(message: str, conversation_id: str):
+        """Whatever the tiers reported before the deadline, and the seconds left after"""
+        start = time.monotonic()
+
+        async def gather() -> List[AgentReply]:
+            # One client per request: the adapter may call us from any thread
+            async with httpx.AsyncClient() as client:
+                scatter = ScatterGather(agents, timeout=per_call, hedge_after=hedge_after, client=client)
+                return await scatter.scatter(tiers, message, conversation_id,
+                                             timeout=min(per_call, deadline))
+
+        replies = asyncio.run(gather())
+        elapsed = time.monotonic() - start
+        if replies:
+            print(f"📨 Scatter-gather: {sum(r.ok for r in replies)}/{len(replies)} replies in {elapsed:.1f}s")
+        return replies, deadline - elapsed
+
+    def orchestrator_logic(message: str, conversation_id: str) -> str:
+        with span("orchestrate", agent=config["agent_id"], conversation_id=conversation_id):
+            replies, remaining = gather_reports(message, conversation_id)
+            if replies and remaining <= 0:
+                return format_reports(replies)
+            token = llm_deadline.set(remaining)
+            try:
+                return agent_logic(synthesis_prompt(message, replies) if replies else message, conversation_id)
+            finally:
+                llm_deadline.reset(token)
+
+    def stream_orchestrator_logic(message: str, conversation_id: str):
+        replies, remaining = gather_reports(message, conversation_id)
+        if replies and remaining <= 0:
+            yield format_reports(replies)
+            return
+        token = llm_deadline.set(remaining)
+        try:
+            yield from agent_logic.stream(synthesis_prompt(message, replies) if replies else message,
+                                          conversation_id)
+        finally:
+            llm_deadline.reset(token)
+
+    orchestrator_logic.cache = getattr(agent_logic, "cache", None)
+    orchestrator_logic.memory = getattr(agent_logic, "memory", None)
+    if hasattr(agent_logic, "stream"):
+        orchestrator_logic.stream = stream_orchestrator_logic
+    return orchestrator_logic
+
+
+def create_async_orchestrator_logic(config: Dict[str, Any], agent_logic, agents: List[Dict[str, Any]],
+                                    client: Optional[httpx.AsyncClient] = None):
+    """Async counterpart of create_orchestrator_logic; reuses one HTTP client for every fan-out"""
+    tiers = config["orchestrate_tiers"]
+    deadline = config.get("orchestration_deadline", 30.0)
+    scatter = ScatterGather(agents, timeout=config.get("scatter_timeout", 10.0),
+                            hedge_after=config.get("hedge_after", 0.0), client=client)
+
+    async def async_orchestrator_logic(message: str, conversation_id: str, timeout: float = None) -> str:
+        with span("orchestrate", agent=config["agent_id"], conversation_id=conversation_id):
+            start = time.monotonic()
+            replies = await scatter.scatter(tiers, message, conversation_id,
+                                            timeout=min(scatter.timeout, deadline))
+            elapsed = time.monotonic() - start
+            remaining = deadline - elapsed
+            if timeout is not None:
+                remaining = min(remaining, timeout)
+            if replies:
+                print(f"📨 Scatter-gather: {sum(r.ok for r in replies)}/{len(replies)} replies in {elapsed:.1f}s")
+                if remaining <= 0:
+                    return format_reports(replies)
+                message = synthesis_prompt(message, replies)
+            return await agent_logic(message, conversation_id, timeout=remaining)
+
+    async_orchestrator_logic.cache = getattr(agent_logic, "cache", None)
+    async_orchestrator_logic.memory = getattr(agent_logic, "memory", None)
+    async_orchestrator_logic.executor = getattr(agent_logic, "executor", None)
+    async_orchestrator_logic.scatter = scatter
+    return async_orchestrator_logic
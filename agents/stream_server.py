@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+SSE Streaming Endpoint for NANDA Agents
+
+Serves `POST /a2a/stream` next to the agent's regular A2A endpoint and
+forwards response text to the caller as Server-Sent Events while the LLM is
+still generating, so downstream agents and the dashboard can act on the first
+tokens instead of waiting for the full completion.
+
+Request body (A2A message or a plain message):
+    {"content": {"text": "...", "type": "text"}, "role": "user", "conversation_id": "..."}
+    {"message": "...", "conversation_id": "..."}
+
+Events:
+    event: delta   data: {"text": "<chunk>"}
+    event: done    data: {"text": "<full response>", "conversation_id": "..."}
+    event: error   data: {"error": "..."}
+"""
+import json
+import threading
+import urllib.request
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+STREAM_PATH = "/a2a/stream"
+
+
+def parse_stream_request(body: Dict[str, Any]) -> Tuple[str, str]:
+    """Extract (message text, conversation_id) from an A2A or plain request"""
+    content = body.get("content")
+    if isinstance(content, dict):
+        message = content.get("text", "")
+    elif isinstance(content, str):
+        message = content
+    else:
+        message = body.get("message", "")
+    conversation_id = body.get("conversation_id") or uuid.uuid4().hex
+    return message, conversation_id
+
+
+def format_event(event: str, data: Dict[str, Any]) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+
+
+class StreamServer:
+    """Threaded HTTP server relaying a streaming agent logic as SSE"""
+
+    def __init__(self, stream_logic, port: int, host: str = "0.0.0.0"):
+        self.stream_logic = stream_logic
+        self.port = port
+        self.host = host
+        self._server = None
+
+    def _handler(self):
+        stream_logic = self.stream_logic
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _cors(self):
+                self.send_header("Access-Control-Allow-Origin", "*")
+                self.send_header("Access-Control-Allow-Headers", "Content-Type")
+
+            def do_OPTIONS(self):
+                self.send_response(204)
+                self._cors()
+                self.send_header("Access-Control-Allow-Methods", "POST, OPTIONS")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self):
+                if self.path.rstrip("/") != STREAM_PATH:
+                    self.send_error(404)
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                    message, conversation_id = parse_stream_request(body)
+                except (ValueError, AttributeError):
+                    self.send_error(400, "Invalid JSON body")
+                    return
+
+                self.send_response(200)
+                self._cors()
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                self.close_connection = True
+
+                chunks = []
+                try:
+                    for chunk in stream_logic(message, conversation_id):
+                        chunks.append(chunk)
+                        self.wfile.write(format_event("delta", {"text": chunk}))
+                        self.wfile.flush()
+                    self.wfile.write(format_event("done", {"text": "".join(chunks),
+                                                           "conversation_id": conversation_id}))
+                except (BrokenPipeError, ConnectionResetError):
+                    # Caller went away; closing the generator stops the upstream stream
+                    return
+                except Exception as e:
+                    print(f"❌ Stream Error: {e}")
+                    self.wfile.write(format_event("error", {"error": str(e)}))
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "StreamServer":
+        """Serve in a daemon thread alongside the agent's A2A server"""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True,
+                         name=f"stream-server-{self.port}").start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+
+def stream_from_agent(url: str, message: str, conversation_id: Optional[str] = None,
+                      timeout: float = 30.0) -> Iterator[str]:
+    """Yield response chunks from another agent's streaming endpoint as they arrive"""
+    body = json.dumps({
+        "content": {"text": message, "type": "text"},
+        "role": "user",
+        "conversation_id": conversation_id or uuid.uuid4().hex
+    }).encode("utf-8")
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        event = None
+        for raw in response:
+            line = raw.decode("utf-8").rstrip("\r\n")
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                data = json.loads(line[len("data:"):].strip())
+                if event == "delta":
+                    yield data["text"]
+                elif event == "error":
+                    raise RuntimeError(data.get("error", "stream error"))
+                elif event == "done":
+                    return
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Metrics and Tracing for NANDA Agents and the Crisis MCP Server
+
+Prometheus-style metrics and lightweight request tracing, with no external
+dependencies.
+
+Metrics are declared once at module level (Counter, Gauge, Histogram, each
+with label names) and registered in REGISTRY. MetricsServer serves them in
+the Prometheus text format on GET /metrics, next to recent traces as JSON
+on GET /traces. The agent host serves the same two endpoints on its agent
+ports.
+
+Tracing: a trace id follows one request across A2A hops in the "trace_id"
+field of the A2A message body (and the X-Trace-Id header). Within a process
+the active trace lives in a context variable, so spans opened in coroutines
+and the asyncio tasks they start join it. When a trace's root span outlasts
+the response budget (RESPONSE_TIMEOUT, 40 s), its spans are logged slowest
+first and kept for GET /traces?slow=1 - the a2a:<agent> and tool:<name>
+spans show where the time went.
+
+Usage:
+    from telemetry import Counter, span
+
+    REQUESTS = Counter("agent_requests_total", "Requests handled", ["agent"])
+    with span("request", agent="mission-control", trace_id=incoming_trace_id):
+        REQUESTS.labels(agent="mission-control").inc()
+"""
+from bisect import bisect_left
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlsplit
+
+logger = logging.getLogger(__name__)
+
+TRACE_FIELD = "trace_id"
+TRACE_HEADER = "X-Trace-Id"
+
+# Seconds a request may take end to end before its trace is reported as slow
+RESPONSE_BUDGET = float(os.getenv("RESPONSE_TIMEOUT", "40"))
+
+# Latency buckets in seconds, up to past the response budget
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 40, 60)
+
+# Traces kept in memory, and over-budget traces kept for /traces?slow=1
+MAX_TRACES = 256
+MAX_SLOW_TRACES = 32
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# =============================================================================
+# METRICS
+# =============================================================================
+
+class Registry:
+    """Collection of metrics rendered together"""
+
+    def __init__(self):
+        self._metrics = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, metric: "_Metric"):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames=(), registry: Registry = None):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+        (registry or REGISTRY).register(self)
+
+    def labels(self, **labels):
+        """The child series for these label values"""
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._child())
+        return child
+
+    def _child(self):
+        raise NotImplementedError
+
+    def _series(self):
+        for key, child in list(self._children.items()):
+            yield dict(zip(self.labelnames, key)), child
+
+
+class _Value:
+    def __init__(self):
+        self._value = 0.0
+        self._fn = None
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0):
+        self.inc(-amount)
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = float(value)
+
+    def set_function(self, fn):
+        """Read the value from fn() at render time (e.g. a queue length)"""
+        self._fn = fn
+
+    @property
+    def value(self) -> float:
+        return float(self._fn()) if self._fn is not None else self._value
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+    kind = "counter"
+
+    def _child(self):
+        return _Value()
+
+    def samples(self):
+        for labels, child in self._series():
+            yield "", labels, child.value
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, set directly or read from a function"""
+    kind = "gauge"
+
+    def _child(self):
+        return _Value()
+
+    def samples(self):
+        for labels, child in self._series():
+            yield "", labels, child.value
+
+
+class _HistogramValue:
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(_Metric):
+    """Distribution of observations in cumulative buckets"""
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames=(), buckets=DEFAULT_BUCKETS,
+                 registry: Registry = None):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labelnames, registry)
+
+    def _child(self):
+        return _HistogramValue(self.buckets)
+
+    def samples(self):
+        for labels, child in self._series():
+            with child._lock:
+                counts, total = list(child.counts), child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield "_bucket", {**labels, "le": _format_value(float(bound))}, cumulative
+            yield "_sum", labels, total
+            yield "_count", labels, cumulative
+
+
+# =============================================================================
+# TRACING
+# =============================================================================
+
+_current_trace: ContextVar[Optional[str]] = ContextVar("trace_id", default=None)
+
+
+def new_trace_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def current_trace_id() -> Optional[str]:
+    """Trace id of the request being handled in this context, if any"""
+    return _current_trace.get()
+
+
+class TraceLog:
+    """Recent spans per trace, plus traces whose root span overran the budget"""
+
+    def __init__(self, budget: float = RESPONSE_BUDGET, max_traces: int = MAX_TRACES,
+                 max_slow: int = MAX_SLOW_TRACES):
+        self.budget = budget
+        self.max_traces = max_traces
+        self._traces = OrderedDict()
+        self.slow = deque(maxlen=max_slow)
+        self._lock = threading.Lock()
+
+    def record(self, span: Dict[str, Any], root: bool = False):
+        with self._lock:
+            spans = self._traces.get(span["trace_id"])
+            if spans is None:
+                spans = self._traces[span["trace_id"]] = []
+                while len(self._traces) > self.max_traces:
+                    self._traces.popitem(last=False)
+            spans.append(span)
+            if not root or span["seconds"] <= self.budget:
+                return
+            summary = {"trace_id": span["trace_id"], "agent": span["agent"], "name": span["name"],
+                       "seconds": span["seconds"], "budget": self.budget,
+                       "spans": sorted(spans, key=lambda s: -s["seconds"])}
+            self.slow.append(summary)
+        breakdown = ", ".join(f"{s['name']} {s['seconds']:.1f}s" for s in summary["spans"][1:6])
+        logger.warning("Trace %s (%s %s) took %.1fs, over the %.0fs budget: %s",
+                       span["trace_id"], span["agent"], span["name"], span["seconds"],
+                       self.budget, breakdown or "no child spans")
+
+    def trace(self, trace_id: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._traces.get(trace_id, ()))
+
+    def payload(self, query: str = "") -> Dict[str, Any]:
+        """/traces response: ?id=<trace_id>, ?slow=1, or the most recent traces"""
+        params = parse_qs(query)
+        if params.get("id"):
+            return {"trace_id": params["id"][0], "spans": self.trace(params["id"][0])}
+        if params.get("slow"):
+            return {"budget": self.budget, "slow": list(self.slow)}
+        with self._lock:
+            recent = list(self._traces.items())[-20:]
+        return {"budget": self.budget, "slow_count": len(self.slow),
+                "recent": [{"trace_id": tid, "spans": spans} for tid, spans in reversed(recent)]}
+
+
+TRACES = TraceLog()
+
+
+@contextmanager
+def span(name: str, agent: str = "", trace_id: Optional[str] = None, **attrs):
+    """Time a unit of work under the active trace.
+
+    With no trace active this span is the root: it joins trace_id (e.g. from
+    an incoming A2A message) or starts a new trace. Yields the trace id.
+    """
+    parent = _current_trace.get()
+    root = parent is None
+    trace = parent or trace_id or new_trace_id()
+    token = _current_trace.set(trace) if root else None
+    started = time.time()
+    start = time.perf_counter()
+    error = None
+    try:
+        yield trace
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        record = {"trace_id": trace, "name": name, "agent": agent, "start": round(started, 3),
+                  "seconds": round(time.perf_counter() - start, 4), **attrs}
+        if error:
+            record["error"] = error
+        if token is not None:
+            _current_trace.reset(token)
+        TRACES.record(record, root=root)
+
+
+def trace_headers() -> Dict[str, str]:
+    """Headers carrying the active trace id to the next hop"""
+    trace = _current_trace.get()
+    return {TRACE_HEADER: trace} if trace else {}
+
+
+# =============================================================================
+# HTTP ENDPOINT
+# =============================================================================
+
+class MetricsServer:
+    """Threaded HTTP server for GET /metrics and GET /traces"""
+
+    def __init__(self, port: int, host: str = "0.0.0.0", registry: Registry = REGISTRY,
+                 traces: TraceLog = TRACES):
+        self.port = port
+        self.host = host
+        self.registry = registry
+        self.traces = traces
+        self._server = None
+
+    def _handler(self):
+        registry, traces = self.registry, self.traces
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                if url.path.rstrip("/") == "/metrics":
+                    self._send(200, registry.render().encode("utf-8"), CONTENT_TYPE)
+                elif url.path.rstrip("/") == "/traces":
+                    self._send(200, json.dumps(traces.payload(url.query)).encode("utf-8"),
+                               "application/json")
+                else:
+                    self.send_error(404)
+
+            def _send(self, status: int, data: bytes, content_type: str):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "MetricsServer":
+        """Serve on a daemon thread"""
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Agent Logic Benchmark - Crisis Response Benchmarks
+
+Times nanda_agent's llm_agent_logic (threaded) and async_llm_agent_logic
+against the local stub Anthropic endpoint (stub_anthropic.py), so the cost
+of the agent's own work - caching, conversation memory, request building,
+concurrency limits - can be measured at a fixed, configurable upstream
+latency.
+
+--repeat sets the share of messages drawn from a small pool of recurring
+reports (cache hits once seen); the rest are unique. Replies that come back
+as the agent's "Sorry, ..." error text count as errors.
+
+Usage:
+    python bench_agent_logic.py
+    python bench_agent_logic.py --latency 0.5 --jitter 0.3 --requests 400 --concurrency 32
+    python bench_agent_logic.py --modes async --repeat 0.8 --json-out agent.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "agents"))
+
+from harness import print_table, run_async, run_sync, write_json  # noqa: E402
+from stub_anthropic import StubAnthropic  # noqa: E402
+
+MODES = ("sync", "async")
+
+# Recurring reports; repeated messages are drawn from these
+REPORTS = [
+    "Water rising fast on Storrow Drive near the Back Bay exit, cars stalled",
+    "Charles River gauge at 8.5 ft and rising, flood stage is 10 ft",
+    "Seaport District basement flooding reported on Congress Street",
+    "Is the I-93 South tunnel closed due to flooding?",
+    "Which shelters near Downtown Waterfront still have space?",
+    "Power out and water entering ground floors in Charlestown Lowlands",
+    "Need evacuation help for elderly residents in Back Bay Lower Areas",
+    "Heavy rain warning issued for Boston until 9pm",
+]
+
+
+def make_messages(requests: int, repeat: float, rng: random.Random) -> list:
+    """(message, conversation_id) pairs; each opens a new conversation"""
+    calls = []
+    for i in range(requests):
+        report = rng.choice(REPORTS)
+        if rng.random() >= repeat:
+            report = f"{report} (report #{i})"
+        calls.append((report, f"bench-{i}"))
+    return calls
+
+
+def agent_config(args, base_url: str) -> dict:
+    import nanda_agent
+
+    config = dict(nanda_agent.AGENT_CONFIG)
+    config.update({
+        "anthropic_api_key": "stub",
+        "anthropic_base_url": base_url,
+        "response_cache_size": args.cache_size,
+        "llm_max_concurrency": args.llm_concurrency,
+        "llm_timeout": args.timeout,
+    })
+    return config
+
+
+def checked(text: str) -> str:
+    if text.startswith("Sorry,"):
+        raise RuntimeError(text)
+    return text
+
+
+def bench_sync(args, config: dict, calls: list) -> dict:
+    import nanda_agent
+
+    logic = nanda_agent.create_llm_agent_logic(config)
+    return run_sync("sync/llm_agent_logic", lambda m, c: checked(logic(m, c)), calls, args.concurrency)
+
+
+def bench_async(args, config: dict, calls: list) -> dict:
+    import nanda_agent
+
+    async def run():
+        logic = nanda_agent.create_async_llm_agent_logic(config)
+
+        async def call(message, conversation_id):
+            checked(await logic(message, conversation_id))
+
+        return await run_async("async/async_llm_agent_logic", call, calls, args.concurrency)
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark NANDA agent logic against a stub LLM endpoint")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub seconds per upstream call")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra uniform random stub seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of upstream calls failing")
+    parser.add_argument("--port", type=int, default=0, help="stub port (0 = any free port)")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16, help="requests in flight at once")
+    parser.add_argument("--llm-concurrency", type=int, default=8, help="agent's upstream concurrency limit (async)")
+    parser.add_argument("--timeout", type=float, default=30.0, help="agent's per-request deadline (async)")
+    parser.add_argument("--repeat", type=float, default=0.5, help="share of recurring messages")
+    parser.add_argument("--cache-size", type=int, default=512, help="agent response cache entries (0 = off)")
+    parser.add_argument("--modes", default=",".join(MODES), help="comma-separated: sync, async")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json-out", help="also write results to this file")
+    args = parser.parse_args()
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    for mode in modes:
+        if mode not in MODES:
+            parser.error(f"unknown mode {mode}")
+
+    stub = StubAnthropic(port=args.port, latency=args.latency, jitter=args.jitter,
+                         error_rate=args.error_rate, seed=args.seed).start()
+    try:
+        config = agent_config(args, stub.url)
+        calls = make_messages(args.requests, args.repeat, random.Random(args.seed))
+        rows = []
+        for mode in modes:
+            before = stub.requests
+            row = (bench_sync if mode == "sync" else bench_async)(args, config, calls)
+            row["upstream_calls"] = stub.requests - before
+            rows.append(row)
+    finally:
+        stub.stop()
+
+    print_table(rows)
+    for row in rows:
+        print(f"{row['name']}: {row['upstream_calls']} upstream calls for {row['calls']} requests")
+    if args.json_out:
+        write_json(args.json_out, rows, benchmark="agent_logic", latency=args.latency, jitter=args.jitter,
+                   requests=args.requests, concurrency=args.concurrency, repeat=args.repeat,
+                   cache_size=args.cache_size)
+
+
+if __name__ == "__main__":
+    main()
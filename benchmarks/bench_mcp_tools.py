@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+MCP Tool Benchmark - Crisis Response Benchmarks
+
+Times every call_tool branch of the crisis MCP server against synthetic
+cities (see synthetic_city.py) and prints latency percentiles and
+throughput per tool, scale and cache mode:
+
+    warm    repeat calls against unchanged data (served from the result cache)
+    cold    every input of the city is marked changed before each call, so
+            results and derived views are rebuilt (road travel times stay
+            cached, as they do when only gauges or shelters change)
+
+Batch rows call the tool once with every generated city in `cities` /
+`locations`.
+
+Usage:
+    python bench_mcp_tools.py
+    python bench_mcp_tools.py --scales s,m,l --requests 500 --modes cold
+    python bench_mcp_tools.py --json-out before.json
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "mcp-servers"))
+
+import crisis_mcp_server as server  # noqa: E402
+from data_backend import CityCache  # noqa: E402
+from harness import print_table, run_async, write_json  # noqa: E402
+from synthetic_city import SCALES, synthetic_backend  # noqa: E402
+
+MODES = ("warm", "cold")
+
+
+# Single-city arguments per tool, from a city and one of its zones
+SINGLE_CALLS = {
+    "generate_evacuation_route": lambda city, zone: {"city": city, "from_location": zone},
+    "monitor_risk_zones": lambda city, zone: {"city": city},
+    "execute_community_evacuation": lambda city, zone: {"city": city},
+    "get_flood_risk": lambda city, zone: {"location": city},
+    "find_emergency_resources": lambda city, zone: {"city": city, "location": zone},
+}
+
+# Tools that accept a list of cities, and the argument carrying it
+BATCH_ARGUMENT = {
+    "monitor_risk_zones": "cities",
+    "get_flood_risk": "locations",
+    "find_emergency_resources": "cities",
+}
+
+
+def tool_calls(cities: list, zones: dict, requests: int, output: str, rng: random.Random) -> dict:
+    """Benchmark name -> list of (tool, arguments) calls"""
+    calls = {}
+    for tool, make in SINGLE_CALLS.items():
+        calls[tool] = []
+        for _ in range(requests):
+            city = rng.choice(cities)
+            calls[tool].append((tool, {**make(city, rng.choice(zones[city])), "format": output}))
+    for tool, key in BATCH_ARGUMENT.items():
+        calls[f"{tool}[batch]"] = [(tool, {key: cities, "format": output})] * max(requests // len(cities), 1)
+    return calls
+
+
+async def bench_scale(scale: str, args, rng: random.Random) -> list:
+    backend = synthetic_backend(scale, args.cities, args.seed)
+    server.CITY_DATA = CityCache(backend, max(args.cities, server.CITY_CACHE_SIZE))
+    cities = backend.cities()
+    zones = {c: list(server.get_city(c).zone_locations) for c in cities}
+    calls = tool_calls(cities, zones, args.requests, args.format, rng)
+
+    rows = []
+    for mode in args.modes:
+        for name, batch in calls.items():
+            async def call(tool, arguments):
+                if mode == "cold":
+                    for city in cities:
+                        server.get_city(city).touch()
+                await server.call_tool(tool, arguments)
+
+            # Warm up: builds lazy indexes (and in warm mode, the cached results)
+            await call(*batch[0])
+            row = await run_async(f"{scale}/{mode}/{name}", call, batch, args.concurrency)
+            rows.append(row)
+    return rows
+
+
+async def run(args):
+    rng = random.Random(args.seed)
+    rows = []
+    for scale in args.scales:
+        rows.extend(await bench_scale(scale, args, rng))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the crisis MCP server tools")
+    parser.add_argument("--scales", default="xs,s,m", help=f"comma-separated presets from {sorted(SCALES)}")
+    parser.add_argument("--cities", type=int, default=4, help="cities generated per scale")
+    parser.add_argument("--requests", type=int, default=200, help="calls per tool")
+    parser.add_argument("--concurrency", type=int, default=1, help="calls in flight at once")
+    parser.add_argument("--modes", default=",".join(MODES), help="comma-separated: warm, cold")
+    parser.add_argument("--format", choices=["json", "text"], default="json", help="tool output format")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json-out", help="also write results to this file")
+    args = parser.parse_args()
+    args.scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    args.modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    for scale in args.scales:
+        if scale not in SCALES:
+            parser.error(f"unknown scale {scale}")
+    for mode in args.modes:
+        if mode not in MODES:
+            parser.error(f"unknown mode {mode}")
+
+    rows = asyncio.run(run(args))
+    print_table(rows)
+    if args.json_out:
+        write_json(args.json_out, rows, benchmark="mcp_tools", scales=args.scales, cities=args.cities,
+                   requests=args.requests, concurrency=args.concurrency, format=args.format)
+
+
+if __name__ == "__main__":
+    main()
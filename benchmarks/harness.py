@@ -0,0 +1,95 @@
+"""
+Benchmark Harness - Crisis Response Benchmarks
+
+Latency percentiles and throughput for a batch of timed calls, and a plain
+text table to print them.
+"""
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return float("nan")
+    rank = max(int(round(p / 100 * len(sorted_values) + 0.5)) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+def summarize(name: str, latencies: list, elapsed: float, errors: int = 0) -> dict:
+    """Latencies in seconds -> {"name", "calls", "errors", "rps", "mean_ms", "p50_ms", ...}"""
+    ordered = sorted(latencies)
+    row = {
+        "name": name,
+        "calls": len(ordered),
+        "errors": errors,
+        "rps": len(ordered) / elapsed if elapsed > 0 else float("inf"),
+        "mean_ms": sum(ordered) / len(ordered) * 1000 if ordered else float("nan"),
+    }
+    for p in PERCENTILES:
+        row[f"p{p}_ms"] = percentile(ordered, p) * 1000
+    row["max_ms"] = ordered[-1] * 1000 if ordered else float("nan")
+    return row
+
+
+def run_sync(name: str, fn, calls: list, concurrency: int = 1) -> dict:
+    """Time fn(*args) for each args tuple in calls on `concurrency` threads"""
+    def timed(args):
+        start = time.perf_counter()
+        try:
+            fn(*args)
+            ok = True
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    if concurrency <= 1:
+        results = [timed(args) for args in calls]
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(timed, calls))
+    elapsed = time.perf_counter() - start
+    return summarize(name, [t for t, _ in results], elapsed, sum(1 for _, ok in results if not ok))
+
+
+async def run_async(name: str, fn, calls: list, concurrency: int = 1) -> dict:
+    """Time await fn(*args) for each args tuple in calls, at most `concurrency` in flight"""
+    limit = asyncio.Semaphore(max(concurrency, 1))
+
+    async def timed(args):
+        async with limit:
+            start = time.perf_counter()
+            try:
+                await fn(*args)
+                ok = True
+            except Exception:
+                ok = False
+            return time.perf_counter() - start, ok
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(timed(args) for args in calls))
+    elapsed = time.perf_counter() - start
+    return summarize(name, [t for t, _ in results], elapsed, sum(1 for _, ok in results if not ok))
+
+
+def print_table(rows: list):
+    columns = ["calls", "errors", "rps", "mean_ms"] + [f"p{p}_ms" for p in PERCENTILES] + ["max_ms"]
+    width = max([len(r["name"]) for r in rows] + [4])
+    print(f"{'name':<{width}}  " + "  ".join(f"{c:>9}" for c in columns))
+    for row in rows:
+        cells = []
+        for c in columns:
+            value = row[c]
+            cells.append(f"{value:>9}" if isinstance(value, int) else f"{value:>9.2f}")
+        print(f"{row['name']:<{width}}  " + "  ".join(cells))
+
+
+def write_json(path: str, rows: list, **meta):
+    """Save results for comparing runs (e.g. before and after a change)"""
+    with open(path, "w") as f:
+        json.dump({"meta": meta, "results": rows}, f, indent=2)
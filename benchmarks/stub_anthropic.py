@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Stub Anthropic Endpoint - Crisis Response Benchmarks
+
+A local server that answers POST /v1/messages like the Anthropic Messages
+API after a configurable delay, so agent logic can be benchmarked without
+network calls or API cost. Point agents at it with
+ANTHROPIC_BASE_URL=http://127.0.0.1:8090 (any ANTHROPIC_API_KEY works).
+
+Latency per request is latency + uniform(0, jitter) seconds; error_rate is
+the share of requests answered with HTTP 529 (overloaded).
+
+Usage:
+    python stub_anthropic.py --port 8090 --latency 0.4 --jitter 0.2
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 8090
+
+
+class StubAnthropic:
+    """Threaded stub server; start() runs it in the background"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = DEFAULT_PORT, latency: float = 0.2,
+                 jitter: float = 0.0, error_rate: float = 0.0, seed: int = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def start(self) -> "StubAnthropic":
+        """Serve on a background thread"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _delay(self) -> tuple:
+        with self._lock:
+            self.requests += 1
+            return (self.latency + self._rng.uniform(0, self.jitter),
+                    self._rng.random() < self.error_rate)
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._send(400, {"type": "error", "error": {"type": "invalid_request_error",
+                                                                 "message": "Malformed JSON"}})
+                    return
+                if self.path.rstrip("/") != "/v1/messages":
+                    self._send(404, {"type": "error", "error": {"type": "not_found_error",
+                                                                 "message": self.path}})
+                    return
+                delay, fail = stub._delay()
+                time.sleep(delay)
+                if fail:
+                    self._send(529, {"type": "error", "error": {"type": "overloaded_error",
+                                                                 "message": "Overloaded"}})
+                    return
+                self._send(200, stub_response(request))
+
+            def _send(self, status: int, body: dict):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def stub_response(request: dict) -> dict:
+    """Messages API response echoing the size of the last user turn"""
+    messages = request.get("messages") or [{"content": ""}]
+    content = messages[-1].get("content", "")
+    if isinstance(content, list):
+        content = " ".join(block.get("text", "") for block in content if isinstance(block, dict))
+    words = len(str(content).split())
+    text = f"Stub assessment of a {words}-word report: monitor conditions and follow local guidance."
+    return {
+        "id": f"msg_{uuid.uuid4().hex[:24]}",
+        "type": "message",
+        "role": "assistant",
+        "model": request.get("model", "stub"),
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": max(words, 1), "output_tokens": len(text.split())},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stub of the Anthropic Messages API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--latency", type=float, default=0.2, help="base seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra uniform random seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests failing with 529")
+    args = parser.parse_args()
+    stub = StubAnthropic(args.host, args.port, args.latency, args.jitter, args.error_rate)
+    print(f"Stub Anthropic endpoint on {stub.url} (latency {args.latency}s + {args.jitter}s jitter)")
+    try:
+        stub.serve_forever()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
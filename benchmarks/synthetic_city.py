@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Synthetic City Generator - Crisis Response Benchmarks
+
+Builds cities shaped like the built-in Boston fixture, at any size. The
+road graph is a square grid of junctions around a centre point: every row
+is one named street and every column one named avenue, so road status
+updates touch whole roads the way they do in the real data. Zones and
+shelters sit on grid junctions, gauges, hospitals and the weather reading
+are scattered around them. A fraction of roads start out flooded.
+
+Generation is seeded, so the same (name, scale, seed) always yields the same
+city.
+
+Usage:
+    python synthetic_city.py --scale m --cities 4 --export data/
+    (then run the MCP server with CRISIS_DATA_DIR=data/)
+"""
+import argparse
+import math
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "mcp-servers"))
+
+from data_backend import FixtureBackend, SQLiteBackend  # noqa: E402
+
+# Entity counts per scale preset; "xs" matches the Boston fixture
+SCALES = {
+    "xs": {"grid": 6, "zones": 8, "gauges": 2, "shelters": 3, "hospitals": 2},
+    "s": {"grid": 20, "zones": 100, "gauges": 100, "shelters": 30, "hospitals": 20},
+    "m": {"grid": 60, "zones": 1000, "gauges": 1000, "shelters": 300, "hospitals": 200},
+    "l": {"grid": 200, "zones": 10000, "gauges": 10000, "shelters": 3000, "hospitals": 2000},
+}
+
+# Spacing between neighbouring junctions
+BLOCK_KM = 0.5
+
+# Share of roads flooded at generation time
+FLOODED_FRACTION = 0.1
+
+CENTER = (42.36, -71.06)
+KM_PER_DEGREE_LAT = 111.0
+
+CONGESTION = ["Low", "Low", "Moderate", "High"]
+
+
+def generate_city(name: str, grid: int, zones: int, gauges: int, shelters: int, hospitals: int,
+                  seed: int = 0) -> dict:
+    """One city's fixture dicts, keyed like FixtureBackend's arguments"""
+    rng = random.Random(f"{name}/{seed}")
+    lat0, lon0 = CENTER
+    dlat = BLOCK_KM / KM_PER_DEGREE_LAT
+    dlon = BLOCK_KM / (KM_PER_DEGREE_LAT * math.cos(math.radians(lat0)))
+
+    def point(r, c):
+        return [round(lat0 + (r - grid / 2) * dlat, 6), round(lon0 + (c - grid / 2) * dlon, 6)]
+
+    # Zones and shelters take over distinct junctions; the rest keep grid names
+    cells = [(r, c) for r in range(grid) for c in range(grid)]
+    if zones + shelters > len(cells):
+        raise ValueError(f"grid {grid}x{grid} has room for {len(cells)} zones and shelters")
+    rng.shuffle(cells)
+    names = {cell: f"Junction {cell[0]}-{cell[1]}" for cell in cells}
+    zone_names = [f"Zone {i}" for i in range(zones)]
+    shelter_names = [f"Shelter {i}" for i in range(shelters)]
+    for cell, label in zip(cells, zone_names + shelter_names):
+        names[cell] = label
+
+    nodes = {names[(r, c)]: point(r, c) for r in range(grid) for c in range(grid)}
+    segments = []
+    road_status = {}
+    for i in range(grid):
+        for road, kph, cell in ((f"Street {i}", rng.choice([30, 40, 50]), lambda j: (i, j)),
+                                (f"Avenue {i}", rng.choice([40, 60, 80]), lambda j: (j, i))):
+            for j in range(grid - 1):
+                segments.append({"from": names[cell(j)], "to": names[cell(j + 1)], "road": road,
+                                 "km": BLOCK_KM, "kph": kph})
+            flooded = rng.random() < FLOODED_FRACTION
+            road_status[road] = {"status": "Flooded" if flooded else "Clear",
+                                 "congestion": "Blocked" if flooded else rng.choice(CONGESTION)}
+
+    zone_locations = {z: {"lat": nodes[z][0], "lon": nodes[z][1]} for z in zone_names}
+    third = max(zones // 3, 1)
+    risk_zones = {
+        "high_risk": zone_names[:third],
+        "medium_risk": zone_names[third:2 * third],
+        "low_risk": zone_names[2 * third:],
+    }
+
+    def scatter():
+        return (round(lat0 + (rng.random() - 0.5) * grid * dlat, 6),
+                round(lon0 + (rng.random() - 0.5) * grid * dlon, 6))
+
+    water_levels = {}
+    for i in range(gauges):
+        normal = round(rng.uniform(2, 6), 1)
+        flood_stage = round(normal * rng.uniform(1.5, 2.2), 1)
+        water_levels[f"Gauge {i}"] = {
+            "level": round(rng.uniform(normal, flood_stage * 1.05), 1),
+            "normal": normal, "flood_stage": flood_stage,
+            "status": rng.choice(["Rising", "Steady", "Falling"]),
+        }
+
+    shelter_list = []
+    for label in shelter_names:
+        capacity = rng.randrange(100, 1000, 50)
+        shelter_list.append({"name": label, "capacity": capacity, "current": rng.randrange(0, capacity),
+                             "address": f"{rng.randrange(1, 999)} Main St",
+                             "lat": nodes[label][0], "lon": nodes[label][1]})
+
+    hospital_list = []
+    for i in range(hospitals):
+        lat, lon = scatter()
+        beds = rng.randrange(50, 500, 10)
+        hospital_list.append({"name": f"Hospital {i}", "total_beds": beds,
+                              "available_beds": rng.randrange(0, beds // 2),
+                              "emergency_beds": rng.randrange(5, 40), "lat": lat, "lon": lon})
+
+    return {
+        "risk_zones": risk_zones,
+        "zone_locations": zone_locations,
+        "zone_population": {z: rng.randrange(50, 1000) for z in zone_names},
+        "road_status": road_status,
+        "road_network": {"nodes": nodes, "segments": segments},
+        "water_levels": water_levels,
+        "shelters": shelter_list,
+        "hospitals": hospital_list,
+        "weather": {
+            "temperature": rng.randrange(35, 60),
+            "humidity": rng.randrange(60, 100),
+            "pressure": rng.randrange(985, 1020),
+            "conditions": rng.choice(["light rain", "heavy rain", "thunderstorm", "overcast"]),
+            "wind_speed": rng.randrange(0, 40),
+            "rainfall_1h": round(rng.uniform(0, 3), 2),
+            "rainfall_3h": round(rng.uniform(0, 6), 2),
+        },
+    }
+
+
+def synthetic_backend(scale: str = "s", cities: int = 1, seed: int = 0) -> FixtureBackend:
+    """FixtureBackend serving `cities` generated cities named "Synthetic 0".."Synthetic N-1" """
+    fields = {}
+    for i in range(cities):
+        city = generate_city(f"Synthetic {i}", seed=seed, **SCALES[scale])
+        for key, value in city.items():
+            fields.setdefault(key, {})[f"Synthetic {i}"] = value
+    return FixtureBackend(**fields)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic cities as SQLite shards")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="s", help="size preset")
+    parser.add_argument("--cities", type=int, default=1, help="number of cities")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--export", required=True, help="directory to write shards to (CRISIS_DATA_DIR)")
+    args = parser.parse_args()
+
+    fixtures = synthetic_backend(args.scale, args.cities, args.seed)
+    shards = SQLiteBackend(args.export)
+    for city in fixtures.cities():
+        shards.write(fixtures.load(city))
+        print(f"Exported {city} to {args.export}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,29 @@
 #!/bin/bash
 # Deploy all 10 crisis response agents
+# Usage: deploy-crisis-agents.sh <anthropic-api-key> [--single-process | --supervise]
 
 API_KEY="$1"
 CONFIG_FILE="scripts/agent_configs/group-crisis-flood-response.json"
 REGISTRY_URL="http://capregistry.duckdns.org:6900"
 SERVER_IP="45.33.73.99"
 
+# Single-process mode: every agent on one event loop, sharing the LLM client
+if [ "$2" = "--single-process" ]; then
+    ANTHROPIC_API_KEY="$API_KEY" nohup python3 examples/agent_host.py "$CONFIG_FILE" \
+        > logs/agent_host.log 2>&1 &
+    echo "✅ Started all agents in one process (PID $!, log: logs/agent_host.log)"
+    exit 0
+fi
+
+# Supervised mode: parallel start with readiness probes, restart on failure
+if [ "$2" = "--supervise" ]; then
+    ANTHROPIC_API_KEY="$API_KEY" nohup python3 infrastructure/supervise_agents.py "$CONFIG_FILE" \
+        --agent-script examples/nanda_agent.py --registry-url "$REGISTRY_URL" \
+        --public-host "$SERVER_IP" > logs/supervisor.log 2>&1 &
+    echo "✅ Supervisor started (PID $!, log: logs/supervisor.log)"
+    exit 0
+fi
+
 # Read each agent from config and start it
 python3 << PYEOF
 import json
@@ -30,8 +48,20 @@ for agent in agents:
         'SYSTEM_PROMPT': agent['system_prompt'],
         'REGISTRY_URL': '$REGISTRY_URL',
         'PUBLIC_URL': f'http://$SERVER_IP:{port}',
-        'PORT': str(port)
+        'PORT': str(port),
+        # Orchestrators fan out to these tiers using the endpoints in the group config
+        'ORCHESTRATE_TIERS': agent.get('orchestrate_tiers', ''),
+        'AGENT_GROUP_CONFIG': '$CONFIG_FILE'
     }
+    # Per-agent group config keys that nanda_agent.py reads from the environment
+    if 'conversation_token_budget' in agent:
+        env['CONVERSATION_TOKEN_BUDGET'] = str(agent['conversation_token_budget'])
+    if 'dedup_window' in agent:
+        env['REPORT_DEDUP_WINDOW'] = str(agent['dedup_window'])
+    if 'fast_path' in agent:
+        env['FAST_PATH_ROUTER'] = 'true' if agent['fast_path'] else 'false'
+    if 'priority_scheduling' in agent:
+        env['PRIORITY_SCHEDULING'] = 'true' if agent['priority_scheduling'] else 'false'
     
     # Start agent in background
     subprocess.Popen(
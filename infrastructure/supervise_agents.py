@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Agent Group Supervisor
+
+Starts every agent in a group config in parallel, waits until each agent's
+/a2a endpoint answers, reports per-agent startup latency, and then keeps
+watching: an agent whose process exits or whose endpoint stops answering is
+restarted with exponential backoff.
+
+Usage:
+    ANTHROPIC_API_KEY=... python3 supervise_agents.py config/group-crisis-flood-response.json \\
+        --agent-script agents/nanda_agent.py --registry-url http://capregistry.duckdns.org:6900 \\
+        --public-host 45.33.73.99
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# Readiness: poll interval and how long an agent may take to come up
+PROBE_INTERVAL = 0.2
+STARTUP_TIMEOUT = 60.0
+
+# Liveness: seconds between probes and consecutive failures before a restart
+LIVENESS_INTERVAL = 5.0
+LIVENESS_FAILURES = 3
+
+# Restart backoff (seconds), reset once an agent has stayed up for BACKOFF_RESET
+BACKOFF_INITIAL = 1.0
+BACKOFF_MAX = 60.0
+BACKOFF_RESET = 120.0
+
+
+def agent_env(agent: Dict[str, Any], args) -> Dict[str, str]:
+    """Environment for one agent process (same variables as deploy-crisis-agents.sh)"""
+    port = agent["port"]
+    env = {
+        "AGENT_ID": agent["agent_id"],
+        "AGENT_NAME": agent["agent_name"],
+        "AGENT_DOMAIN": agent["domain"],
+        "AGENT_SPECIALIZATION": agent["specialization"],
+        "AGENT_DESCRIPTION": agent["description"],
+        "AGENT_CAPABILITIES": agent["capabilities"],
+        "SYSTEM_PROMPT": agent["system_prompt"],
+        "PORT": str(port),
+        "PUBLIC_URL": f"http://{args.public_host}:{port}",
+        "ORCHESTRATE_TIERS": agent.get("orchestrate_tiers", ""),
+        "AGENT_GROUP_CONFIG": os.path.abspath(args.group_config),
+        "PYTHONUNBUFFERED": "1",
+    }
+    if args.registry_url:
+        env["REGISTRY_URL"] = args.registry_url
+    # Per-agent group config keys that nanda_agent.py reads from the environment
+    if "conversation_token_budget" in agent:
+        env["CONVERSATION_TOKEN_BUDGET"] = str(agent["conversation_token_budget"])
+    if "dedup_window" in agent:
+        env["REPORT_DEDUP_WINDOW"] = str(agent["dedup_window"])
+    if "fast_path" in agent:
+        env["FAST_PATH_ROUTER"] = "true" if agent["fast_path"] else "false"
+    if "priority_scheduling" in agent:
+        env["PRIORITY_SCHEDULING"] = "true" if agent["priority_scheduling"] else "false"
+    return {**os.environ, **env}
+
+
+class SupervisedAgent:
+    """One agent process plus its restart bookkeeping"""
+
+    def __init__(self, agent: Dict[str, Any], args, client: httpx.AsyncClient):
+        self.agent = agent
+        self.args = args
+        self.client = client
+        self.agent_id = agent["agent_id"]
+        self.url = f"http://{args.probe_host}:{agent['port']}/a2a"
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.started_at = 0.0
+        self.startup_seconds: Optional[float] = None
+        self.restarts = 0
+        self.backoff = BACKOFF_INITIAL
+
+    async def spawn(self):
+        os.makedirs(self.args.log_dir, exist_ok=True)
+        log = open(os.path.join(self.args.log_dir, f"agent_{self.agent_id}.log"), "a")
+        self.started_at = time.monotonic()
+        self.process = await asyncio.create_subprocess_exec(
+            sys.executable, self.args.agent_script,
+            env=agent_env(self.agent, self.args), stdout=log, stderr=asyncio.subprocess.STDOUT)
+        log.close()
+
+    async def probe(self, timeout: float = 2.0) -> bool:
+        """True once /a2a answers with anything but a server error"""
+        try:
+            response = await self.client.get(self.url, timeout=timeout)
+            return response.status_code < 500
+        except httpx.HTTPError:
+            return False
+
+    async def wait_ready(self, timeout: float) -> bool:
+        deadline = self.started_at + timeout
+        while time.monotonic() < deadline:
+            if self.process.returncode is not None:
+                return False
+            if await self.probe(timeout=PROBE_INTERVAL * 5):
+                self.startup_seconds = time.monotonic() - self.started_at
+                return True
+            await asyncio.sleep(PROBE_INTERVAL)
+        return False
+
+    async def stop(self):
+        if self.process is not None and self.process.returncode is None:
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(self.process.wait(), 5.0)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+
+    async def start(self, timeout: float) -> bool:
+        await self.spawn()
+        ready = await self.wait_ready(timeout)
+        if ready:
+            print(f"✅ {self.agent_id:<24} ready on :{self.agent['port']} in {self.startup_seconds:.2f}s")
+        else:
+            code = self.process.returncode
+            reason = f"exited with code {code}" if code is not None else f"not ready after {timeout:.0f}s"
+            print(f"❌ {self.agent_id:<24} {reason}")
+        return ready
+
+    async def supervise(self):
+        """Restart the agent with backoff whenever it dies or stops answering"""
+        failures = 0
+        while True:
+            exited = self.process.returncode is not None
+            if not exited:
+                try:
+                    await asyncio.wait_for(asyncio.shield(self.process.wait()), LIVENESS_INTERVAL)
+                    exited = True
+                except asyncio.TimeoutError:
+                    failures = 0 if await self.probe() else failures + 1
+            if not exited and failures < LIVENESS_FAILURES:
+                continue
+
+            reason = (f"exited with code {self.process.returncode}" if exited
+                      else f"failed {failures} liveness probes")
+            if time.monotonic() - self.started_at > BACKOFF_RESET:
+                self.backoff = BACKOFF_INITIAL
+            print(f"🚨 {self.agent_id} {reason}; restarting in {self.backoff:.0f}s")
+            await self.stop()
+            await asyncio.sleep(self.backoff)
+            self.backoff = min(self.backoff * 2, BACKOFF_MAX)
+            self.restarts += 1
+            failures = 0
+            await self.start(self.args.startup_timeout)
+
+
+async def run(args):
+    with open(args.group_config) as f:
+        agents: List[Dict[str, Any]] = json.load(f)
+    if args.only:
+        wanted = {agent_id.strip() for agent_id in args.only.split(",")}
+        agents = [agent for agent in agents if agent["agent_id"] in wanted]
+
+    async with httpx.AsyncClient() as client:
+        supervised = [SupervisedAgent(agent, args, client) for agent in agents]
+        start = time.monotonic()
+        print(f"🚀 Starting {len(supervised)} agents in parallel")
+        results = await asyncio.gather(*(s.start(args.startup_timeout) for s in supervised))
+        ready = sum(results)
+        print(f"\n📊 {ready}/{len(supervised)} agents ready in {time.monotonic() - start:.2f}s")
+        for s in sorted(supervised, key=lambda s: s.startup_seconds or float("inf")):
+            latency = f"{s.startup_seconds:.2f}s" if s.startup_seconds is not None else "not ready"
+            print(f"   {s.agent_id:<24} {latency}")
+        if args.exit_after_start:
+            return 0 if ready == len(supervised) else 1
+
+        print("\n👀 Supervising (Ctrl+C to stop)")
+        try:
+            await asyncio.gather(*(s.supervise() for s in supervised))
+        finally:
+            await asyncio.gather(*(s.stop() for s in supervised))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Start and supervise a group of NANDA agents")
+    parser.add_argument("group_config", help="group config JSON")
+    parser.add_argument("--agent-script", default="agents/nanda_agent.py", help="agent entry point")
+    parser.add_argument("--registry-url", default=os.getenv("REGISTRY_URL"), help="NANDA registry URL")
+    parser.add_argument("--public-host", default="localhost", help="host used in each agent's PUBLIC_URL")
+    parser.add_argument("--probe-host", default="127.0.0.1", help="host the readiness probe connects to")
+    parser.add_argument("--log-dir", default="logs", help="directory for per-agent logs")
+    parser.add_argument("--only", help="comma-separated agent ids to run (default: all)")
+    parser.add_argument("--startup-timeout", type=float, default=STARTUP_TIMEOUT,
+                        help="seconds an agent may take to become ready")
+    parser.add_argument("--exit-after-start", action="store_true",
+                        help="report startup and exit without supervising (agents keep running)")
+    args = parser.parse_args()
+    try:
+        sys.exit(asyncio.run(run(args)))
+    except KeyboardInterrupt:
+        print("\n🛑 Supervisor stopped")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,44 @@ Implements Javi's requirements: evacuation routing + community evacuation workfl
 """
 
 import asyncio
+import heapq
 import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from mcp.server import Server
+from typing import Optional
+from urllib.parse import quote, unquote
+
+import numpy as np
+from mcp.server import NotificationOptions, Server
 from mcp.server.stdio import stdio_server
-from mcp.types import Tool, TextContent
+from mcp.types import Resource, Tool, TextContent
+from pydantic import AnyUrl
+
+from data_backend import (
+    DEFAULT_CITY_CACHE_SIZE, CityCache, CityData, DataBackend, FixtureBackend, SQLiteBackend
+)
+from derived_views import View, ViewGraph
+from gauge_store import CRITICAL, STATUS_LABELS, WATCH
+from reachability import DEFAULT_BANDS, ShelterReachability, band_for, locate_node
+from risk_raster import RISK_LEVELS, RiskRaster
+from sensor_feed import run_feed
+from shelter_allocation import allocate_shelters
+from tool_results import (
+    DEFAULT_RESULT_CACHE_SIZE, CachedResult, ResultCache, batch_json, render_community_evacuation,
+    render_emergency_resources, render_evacuation_route, render_flood_risk, render_risk_zones, served
+)
+
+# Metrics and tracing are shared with the agents
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "agents"))
+from telemetry import TRACE_FIELD, Counter, Gauge, Histogram, MetricsServer, span  # noqa: E402
+
+logger = logging.getLogger(__name__)
 
 app = Server("crisis-response-tools")
 
@@ -22,6 +55,31 @@ RISK_ZONES = {
     }
 }
 
+# Zone centroids for spatial lookups
+ZONE_LOCATIONS = {
+    "Boston": {
+        "Downtown Waterfront": {"lat": 42.3591, "lon": -71.0510},
+        "Seaport District": {"lat": 42.3519, "lon": -71.0446},
+        "Back Bay Lower Areas": {"lat": 42.3503, "lon": -71.0810},
+        "Cambridge Riverside": {"lat": 42.3625, "lon": -71.0900},
+        "Charlestown Lowlands": {"lat": 42.3782, "lon": -71.0602},
+        "Beacon Hill": {"lat": 42.3588, "lon": -71.0707},
+        "Brookline": {"lat": 42.3318, "lon": -71.1212},
+        "Newton": {"lat": 42.3370, "lon": -71.2092}
+    }
+}
+
+# Estimated residents needing shelter per zone
+ZONE_POPULATION = {
+    "Boston": {
+        "Downtown Waterfront": 420,
+        "Seaport District": 310,
+        "Back Bay Lower Areas": 380,
+        "Cambridge Riverside": 260,
+        "Charlestown Lowlands": 190
+    }
+}
+
 ROAD_STATUS = {
     "Boston": {
         "I-93 North": {"status": "Clear", "congestion": "Low"},
@@ -32,6 +90,50 @@ ROAD_STATUS = {
     }
 }
 
+# Road graph: named places/junctions with coordinates, segments tagged by road.
+# Segments on roads listed in ROAD_STATUS follow that road's live status.
+ROAD_NETWORK = {
+    "Boston": {
+        "nodes": {
+            "Downtown Waterfront": [42.3591, -71.0510],
+            "Seaport District": [42.3519, -71.0446],
+            "Back Bay Lower Areas": [42.3503, -71.0810],
+            "Cambridge Riverside": [42.3625, -71.0900],
+            "Charlestown Lowlands": [42.3782, -71.0602],
+            "Beacon Hill": [42.3588, -71.0707],
+            "Brookline": [42.3318, -71.1212],
+            "Newton": [42.3370, -71.2092],
+            "Leverett Circle": [42.3665, -71.0680],
+            "I-93/Mass Pike Interchange": [42.3480, -71.0600],
+            "Allston Junction": [42.3530, -71.1300],
+            "North Boston High School": [42.3900, -71.0650],
+            "West End Community Center": [42.3640, -71.0660],
+            "Brookline Emergency Shelter": [42.3330, -71.1180]
+        },
+        "segments": [
+            {"from": "Seaport District", "to": "Downtown Waterfront", "road": "Congress Street", "km": 1.0, "kph": 30},
+            {"from": "Downtown Waterfront", "to": "I-93/Mass Pike Interchange", "road": "I-93 South", "km": 1.4, "kph": 80},
+            {"from": "Downtown Waterfront", "to": "Leverett Circle", "road": "I-93 North", "km": 1.6, "kph": 80},
+            {"from": "Leverett Circle", "to": "Charlestown Lowlands", "road": "I-93 North", "km": 1.5, "kph": 80},
+            {"from": "Charlestown Lowlands", "to": "North Boston High School", "road": "Route 1 North", "km": 2.0, "kph": 60},
+            {"from": "Leverett Circle", "to": "West End Community Center", "road": "Staniford Street", "km": 0.3, "kph": 30},
+            {"from": "Leverett Circle", "to": "Back Bay Lower Areas", "road": "Storrow Drive", "km": 2.5, "kph": 60},
+            {"from": "Back Bay Lower Areas", "to": "Allston Junction", "road": "Storrow Drive", "km": 4.0, "kph": 60},
+            {"from": "Seaport District", "to": "I-93/Mass Pike Interchange", "road": "Mass Pike West", "km": 1.5, "kph": 80},
+            {"from": "I-93/Mass Pike Interchange", "to": "Back Bay Lower Areas", "road": "Mass Pike West", "km": 2.0, "kph": 80},
+            {"from": "Back Bay Lower Areas", "to": "Allston Junction", "road": "Mass Pike West", "km": 4.2, "kph": 80},
+            {"from": "Allston Junction", "to": "Newton", "road": "Mass Pike West", "km": 7.0, "kph": 90},
+            {"from": "Allston Junction", "to": "Brookline", "road": "Harvard Street", "km": 2.5, "kph": 40},
+            {"from": "Brookline", "to": "Brookline Emergency Shelter", "road": "Beacon Street", "km": 0.5, "kph": 40},
+            {"from": "Back Bay Lower Areas", "to": "Brookline", "road": "Beacon Street", "km": 3.0, "kph": 40},
+            {"from": "Back Bay Lower Areas", "to": "Beacon Hill", "road": "Beacon Street", "km": 1.5, "kph": 40},
+            {"from": "Beacon Hill", "to": "West End Community Center", "road": "Cambridge Street", "km": 0.8, "kph": 30},
+            {"from": "Beacon Hill", "to": "Downtown Waterfront", "road": "State Street", "km": 1.1, "kph": 30},
+            {"from": "Cambridge Riverside", "to": "Leverett Circle", "road": "Memorial Drive", "km": 2.0, "kph": 50}
+        ]
+    }
+}
+
 WATER_LEVELS = {
     "Boston": {
         "Charles River": {"level": 8.5, "normal": 5.0, "flood_stage": 10.0, "status": "Rising"},
@@ -41,16 +143,16 @@ WATER_LEVELS = {
 
 SAFE_SHELTERS = {
     "Boston": [
-        {"name": "North Boston High School", "capacity": 500, "current": 150, "address": "123 Main St"},
-        {"name": "West End Community Center", "capacity": 300, "current": 80, "address": "456 Oak Ave"},
-        {"name": "Brookline Emergency Shelter", "capacity": 400, "current": 50, "address": "789 Elm St"}
+        {"name": "North Boston High School", "capacity": 500, "current": 150, "address": "123 Main St", "lat": 42.3900, "lon": -71.0650},
+        {"name": "West End Community Center", "capacity": 300, "current": 80, "address": "456 Oak Ave", "lat": 42.3640, "lon": -71.0660},
+        {"name": "Brookline Emergency Shelter", "capacity": 400, "current": 50, "address": "789 Elm St", "lat": 42.3330, "lon": -71.1180}
     ]
 }
 
 HOSPITALS = {
     "Boston": [
-        {"name": "Boston General Hospital", "total_beds": 200, "available_beds": 50, "emergency_beds": 20},
-        {"name": "City Medical Center", "total_beds": 150, "available_beds": 30, "emergency_beds": 15}
+        {"name": "Boston General Hospital", "total_beds": 200, "available_beds": 50, "emergency_beds": 20, "lat": 42.3626, "lon": -71.0688},
+        {"name": "City Medical Center", "total_beds": 150, "available_beds": 30, "emergency_beds": 15, "lat": 42.3355, "lon": -71.0730}
     ]
 }
 
@@ -66,6 +168,798 @@ WEATHER_DATA = {
     }
 }
 
+# Default number of facilities returned per category
+DEFAULT_RESOURCE_LIMIT = 5
+
+# Gauges listed individually in monitor_risk_zones, most severe first
+GAUGE_REPORT_LIMIT = 25
+
+# Flood-stage forecasts further out than this are not reported (hours)
+FORECAST_HORIZON_HOURS = 72.0
+
+# Gauges listed in the flood-stage outlook, soonest first
+FORECAST_REPORT_LIMIT = 5
+
+# Travel-time bands (minutes) for shelter reachability; see reachability.py
+REACHABILITY_BANDS = tuple(sorted(float(b) for b in os.getenv(
+    "CRISIS_REACHABILITY_BANDS", ",".join(map(str, DEFAULT_BANDS))).split(",")))
+
+# Live sensor feed (file, FIFO, unix:/path or tcp:host:port); see sensor_feed.py
+SENSOR_FEED = os.getenv("CRISIS_SENSOR_FEED")
+
+# Change events kept per city for the crisis://{city}/changes resource
+CHANGE_LOG_SIZE = 200
+
+# Directory of per-city SQLite shards; unset serves the built-in data above
+DATA_DIR = os.getenv("CRISIS_DATA_DIR")
+
+# Cities kept loaded in memory at once
+CITY_CACHE_SIZE = int(os.getenv("CRISIS_CITY_CACHE_SIZE", str(DEFAULT_CITY_CACHE_SIZE)))
+
+# Directory of per-city weather grids for get_flood_risk grid mode; see risk_raster.py
+WEATHER_GRID_DIR = os.getenv("CRISIS_WEATHER_GRID_DIR")
+
+# Cells within this distance of a zone centroid count toward the zone
+ZONE_RADIUS_KM = 1.0
+
+# Hot cells listed by get_flood_risk grid mode
+HOT_CELL_LIMIT = 10
+
+# Worker threads for batch (multi-city) tool calls
+BATCH_WORKERS = int(os.getenv("CRISIS_BATCH_WORKERS", "8"))
+
+# Batches this small run inline instead of on the worker pool
+BATCH_INLINE_LIMIT = 4
+
+# Serialized tool payloads kept for unchanged inputs
+RESULT_CACHE_SIZE = int(os.getenv("CRISIS_RESULT_CACHE_SIZE", str(DEFAULT_RESULT_CACHE_SIZE)))
+
+# Shared by every tool: JSON payload (default) or the human-readable report
+FORMAT_SCHEMA = {"type": "string", "enum": ["json", "text"],
+                 "description": "json (default): structured payload; text: readable report"}
+
+# Shared by every tool: the calling agent's trace id, so the call joins its trace
+TRACE_SCHEMA = {"type": "string", "description": "Trace id of the request this call serves"}
+
+# Port for GET /metrics and /traces; 0 = disabled
+METRICS_PORT = int(os.getenv("CRISIS_METRICS_PORT", "0"))
+
+TOOL_CALLS = Counter("crisis_tool_calls_total", "Tool calls by mode (single or batch)", ["tool", "mode"])
+TOOL_ERRORS = Counter("crisis_tool_errors_total", "City evaluations that raised", ["tool"])
+TOOL_SECONDS = Histogram("crisis_tool_seconds", "Tool call latency", ["tool"])
+
+
+def _builtin_backend() -> FixtureBackend:
+    return FixtureBackend(
+        risk_zones=RISK_ZONES,
+        zone_locations=ZONE_LOCATIONS,
+        road_status=ROAD_STATUS,
+        road_network=ROAD_NETWORK,
+        water_levels=WATER_LEVELS,
+        shelters=SAFE_SHELTERS,
+        hospitals=HOSPITALS,
+        weather=WEATHER_DATA,
+        zone_population=ZONE_POPULATION,
+    )
+
+
+def _create_backend() -> DataBackend:
+    return SQLiteBackend(DATA_DIR) if DATA_DIR else _builtin_backend()
+
+
+# Cities load lazily on first access and are evicted least-recently-used first
+CITY_DATA = CityCache(_create_backend(), CITY_CACHE_SIZE)
+
+
+def get_city(city: str):
+    """CityData for a city, or None if no backend shard/fixture exists for it"""
+    return CITY_DATA.get(city)
+
+
+# City -> RiskRaster, opened on first grid-mode request
+_RASTERS = {}
+
+
+def get_risk_raster(city: str):
+    """Risk raster for a city's weather grid (re-scored if the grid changed), or None"""
+    if not WEATHER_GRID_DIR:
+        return None
+    raster = _RASTERS.get(city)
+    if raster is None:
+        directory = os.path.join(WEATHER_GRID_DIR, quote(city, safe=""))
+        if not RiskRaster.exists(directory):
+            return None
+        raster = _RASTERS[city] = RiskRaster(directory)
+    else:
+        raster.refresh()
+    return raster
+
+
+def score_flood_risk(data: dict):
+    """Score one weather observation; returns (risk_score, risk_level, warnings)"""
+    risk_score = 0
+    warnings = []
+    
+    if data['humidity'] > 85:
+        risk_score += 3
+        warnings.append("VERY HIGH humidity detected")
+    
+    if data['pressure'] < 1000:
+        risk_score += 3
+        warnings.append("LOW pressure (storm system present)")
+    
+    if data['rainfall_1h'] > 2:
+        risk_score += 4
+        warnings.append("HEAVY rainfall detected")
+    elif data['rainfall_1h'] > 1:
+        risk_score += 3
+        warnings.append("MODERATE rainfall")
+    
+    if risk_score >= 7:
+        risk_level = "EXTREME"
+    elif risk_score >= 5:
+        risk_level = "HIGH"
+    elif risk_score >= 3:
+        risk_level = "MEDIUM"
+    else:
+        risk_level = "LOW"
+    return risk_score, risk_level, warnings
+
+
+def locate(data: CityData, location: str):
+    """Coordinates for a zone, facility, road-graph place or "lat,lon" string"""
+    zone = data.zone_locations.get(location)
+    if zone:
+        return zone["lat"], zone["lon"]
+    for grid in (data.facilities.shelters, data.facilities.hospitals):
+        item = grid.get(location)
+        if item:
+            return item["lat"], item["lon"]
+    network = data.network
+    if network is not None:
+        node = network.resolve(location)
+        if node is not None:
+            return network.coords(node)
+    parts = location.split(",")
+    if len(parts) == 2:
+        try:
+            return float(parts[0]), float(parts[1])
+        except ValueError:
+            pass
+    return None
+
+
+def plan_evacuation_route(data: CityData, from_location: str):
+    """Fastest open route from a location to a shelter with free space.
+
+    Returns (route, shelter) or (None, None) when the location is unknown or
+    every shelter is cut off by flooded roads.
+    """
+    network = data.network
+    if network is None:
+        return None, None
+    start = network.resolve(from_location)
+    if start is None:
+        return None, None
+    open_shelters = {s['name']: s for s in data.shelters if s['capacity'] > s['current']}
+    route = network.route_to_nearest(network.node_name(start), open_shelters)
+    if route is None:
+        return None, None
+    return route, open_shelters[route.destination]
+
+
+def get_reachability(data: CityData):
+    """Shelter reachability index for a city, or None if it has no road graph"""
+    if data.reachability is None and data.network is not None:
+        data.reachability = ShelterReachability(data.network, data.shelters, REACHABILITY_BANDS)
+    return data.reachability
+
+
+def reachability_entry(data: CityData, location: str) -> Optional[dict]:
+    """Closest open shelter by road and open shelters per travel-time band, or None if unlocated"""
+    index = get_reachability(data)
+    node = locate_node(data.network, location, data.zone_locations.get(location)) if index else None
+    if node is None:
+        return None
+    open_shelters = {s["name"] for s in data.shelters if s["capacity"] > s["current"]}
+    found = index.shelters_within(node, open_shelters=open_shelters)
+    return {
+        "minutes": float(found[0][0]) if found else None,
+        "shelter": found[0][1] if found else None,
+        "band": band_for(found[0][0], index.bands) if found else None,
+        "shelters_within": {f"{band:g}": sum(1 for m, _ in found if m <= band) for band in index.bands},
+    }
+
+
+def plan_shelter_allocation(data: CityData, zones: list):
+    """Assign each zone's population (zones in priority order) to shelters with space"""
+    located = {z: data.zone_locations[z] for z in zones
+               if z in data.zone_locations and z in data.zone_population}
+    costs = data.travel_costs.get(data.network, located, data.shelters)
+    return allocate_shelters({z: data.zone_population[z] for z in located}, data.shelters, costs)
+
+
+# =============================================================================
+# STREAMING UPDATES - incremental re-evaluation and resource notifications
+# =============================================================================
+
+# Resource URI -> sessions subscribed to it
+_SUBSCRIBERS = {}
+
+
+def _cut_off_zones(data: CityData) -> set:
+    """Zones on the road graph with no open route to a shelter with space"""
+    network = data.network
+    if network is None:
+        return set()
+    return {
+        zone for zone in data.zone_locations
+        if zone in network and plan_evacuation_route(data, zone)[0] is None
+    }
+
+
+def get_alert_state(data: CityData) -> dict:
+    """Current alert state for a city: gauge statuses, flooded roads, cut-off zones"""
+    if data.alert_state is None:
+        _, codes = data.gauges.classify()
+        data.alert_state = {
+            "gauges": dict(zip(data.gauges.names, codes.tolist())),
+            "flooded_roads": {r for r, info in data.road_status.items() if info["status"] != "Clear"},
+            "cut_off_zones": _cut_off_zones(data),
+            "flood_risk": score_flood_risk(data.weather)[1] if data.weather else None,
+            "updated": time.time(),
+        }
+        data.change_log = deque(maxlen=CHANGE_LOG_SIZE)
+    return data.alert_state
+
+
+def _log_change(data: CityData, changes: list, **event):
+    event["time"] = time.time()
+    data.change_log.append(event)
+    changes.append(event)
+
+
+def _apply_gauge(data: CityData, update: dict, state: dict, changes: list):
+    gauges = data.gauges
+    name = update["name"]
+    if name in gauges:
+        row = gauges.record(name, update["level"], update.get("ts"), update.get("trend"))
+    elif "normal" in update and "flood_stage" in update:
+        row = gauges.add_gauge(name, update["level"], update["normal"], update["flood_stage"],
+                               update.get("trend", "Steady"), update.get("ts"))
+    else:
+        return
+    # Only the updated gauge is re-classified
+    pct, codes = gauges.classify([row])
+    code = int(codes[0])
+    previous = state["gauges"].get(name)
+    if code != previous:
+        state["gauges"][name] = code
+        _log_change(data, changes, kind="gauge", name=name, level=update["level"],
+                    percent=round(float(pct[0]), 1),
+                    previous=str(STATUS_LABELS[previous]) if previous is not None else None,
+                    status=str(STATUS_LABELS[code]))
+
+
+def _apply_road(data: CityData, update: dict, state: dict, changes: list):
+    name = update["name"]
+    info = data.road_status.setdefault(name, {"status": "Clear", "congestion": "Low"})
+    was_open = info["status"] == "Clear"
+    info["status"] = update.get("status", info["status"])
+    info["congestion"] = update.get("congestion", info["congestion"])
+    if data.network is not None:
+        data.network.set_road_status(name, info["status"], info["congestion"])
+    is_open = info["status"] == "Clear"
+    if was_open == is_open:
+        return
+    if is_open:
+        state["flooded_roads"].discard(name)
+    else:
+        state["flooded_roads"].add(name)
+    _log_change(data, changes, kind="road", name=name, status=info["status"])
+    _refresh_zones(data, state, changes)
+
+
+def _apply_weather(data: CityData, update: dict, state: dict, changes: list):
+    if data.weather is None:
+        data.weather = {}
+    data.weather.update({k: v for k, v in update.items() if k not in ("type", "city")})
+    try:
+        level = score_flood_risk(data.weather)[1]
+    except KeyError:
+        return  # partial observation for a city without a full baseline
+    if level != state["flood_risk"]:
+        _log_change(data, changes, kind="flood_risk", previous=state["flood_risk"], status=level)
+        state["flood_risk"] = level
+
+
+def _apply_shelter(data: CityData, update: dict, state: dict, changes: list):
+    shelter = data.shelter(update["name"])
+    if shelter is None:
+        return
+    was_open = shelter["capacity"] > shelter["current"]
+    shelter["current"] = update.get("current", shelter["current"])
+    shelter["capacity"] = update.get("capacity", shelter["capacity"])
+    is_open = shelter["capacity"] > shelter["current"]
+    if was_open != is_open:
+        _log_change(data, changes, kind="shelter", name=shelter["name"],
+                    status="Open" if is_open else "Full")
+        _refresh_zones(data, state, changes)
+
+
+def _refresh_zones(data: CityData, state: dict, changes: list):
+    """Re-check zone reachability after the road graph or open shelters changed"""
+    cut_off = _cut_off_zones(data)
+    for zone in sorted(cut_off - state["cut_off_zones"]):
+        _log_change(data, changes, kind="zone", name=zone, status="Cut off")
+    for zone in sorted(state["cut_off_zones"] - cut_off):
+        _log_change(data, changes, kind="zone", name=zone, status="Reachable")
+    state["cut_off_zones"] = cut_off
+
+
+_UPDATE_HANDLERS = {
+    "gauge": _apply_gauge,
+    "road": _apply_road,
+    "weather": _apply_weather,
+    "shelter": _apply_shelter,
+}
+
+# CityData input each update type modifies
+_UPDATE_INPUTS = {"gauge": "gauges", "road": "roads", "weather": "weather", "shelter": "shelters"}
+
+
+def apply_sensor_update(update: dict) -> list:
+    """Apply one feed update and return the change events it produced"""
+    data = get_city(update["city"])
+    if data is None:
+        logger.warning("Ignoring feed update for unknown city %s", update["city"])
+        return []
+    with data.lock:
+        state = get_alert_state(data)
+        changes = []
+        _UPDATE_HANDLERS[update["type"]](data, update, state, changes)
+        data.touch(_UPDATE_INPUTS[update["type"]])
+        if changes:
+            state["updated"] = time.time()
+    return changes
+
+
+async def handle_sensor_update(update: dict):
+    """Feed callback: apply the update and notify subscribers if anything changed"""
+    if apply_sensor_update(update):
+        city = update["city"]
+        await notify_resource_updated(f"crisis://{city}/alerts")
+        await notify_resource_updated(f"crisis://{city}/changes")
+
+
+async def notify_resource_updated(uri: str):
+    for session in list(_SUBSCRIBERS.get(uri, ())):
+        try:
+            await session.send_resource_updated(AnyUrl(uri))
+        except Exception:
+            # Session went away; stop notifying it
+            _SUBSCRIBERS[uri].discard(session)
+
+
+def _alert_resource(data: CityData) -> dict:
+    state = get_alert_state(data)
+    return {
+        "city": data.city,
+        "updated": state["updated"],
+        "flood_risk": state["flood_risk"],
+        "gauges": {
+            name: str(STATUS_LABELS[code]) for name, code in state["gauges"].items()
+            if code != WATCH
+        },
+        "flooded_roads": sorted(state["flooded_roads"]),
+        "cut_off_zones": sorted(state["cut_off_zones"]),
+    }
+
+
+def grid_risk_payload(location: str, raster: RiskRaster, data: CityData) -> dict:
+    """get_flood_risk grid mode: level counts, per-zone aggregates and hot cells"""
+    rows, cols = raster.shape
+    counts = raster.summary["level_cells"]
+    
+    zones = data.zone_locations if data else {}
+    summaries = []
+    for zone, loc in zones.items():
+        summary = raster.zone_summary(loc["lat"], loc["lon"], ZONE_RADIUS_KM)
+        if summary:
+            summaries.append({"zone": zone, **summary})
+    summaries.sort(key=lambda s: (-s["max_score"], -s["mean_score"]))
+    
+    return {
+        "location": location,
+        "grid": {"rows": rows, "cols": cols, "cell_deg": raster.cell_deg},
+        "level_cells": {str(label): counts[code] for code, label in reversed(list(enumerate(RISK_LEVELS)))},
+        "zone_radius_km": ZONE_RADIUS_KM,
+        "zones": summaries,
+        "hot_cells": raster.hot_cells(HOT_CELL_LIMIT),
+    }
+
+
+def unknown_city_text(city: str) -> str:
+    return f"No crisis data available for {city}."
+
+
+def unknown_city(city: str) -> dict:
+    return {"city": city, "error": unknown_city_text(city)}
+
+
+def _shelter_entry(shelter: dict, distance_km: float = None) -> dict:
+    return {
+        "name": shelter["name"],
+        "address": shelter.get("address", ""),
+        "capacity": shelter["capacity"],
+        "available": shelter["capacity"] - shelter["current"],
+        "distance_km": float(distance_km) if distance_km is not None else None,
+    }
+
+
+def _gauge_entry(gauges, row: int, pct, codes, forecast) -> dict:
+    rate = forecast[0][row]
+    return {
+        "name": gauges.names[row],
+        "level": float(gauges.level[row]),
+        "status": str(STATUS_LABELS[codes[row]]),
+        "percent": float(pct[row]),
+        "trend": gauges.trend[row],
+        "rate_per_hour": None if np.isnan(rate) else float(rate),
+        "flood_stage_forecast": _flood_stage_forecast(gauges, row, forecast),
+    }
+
+
+def _flood_stage_forecast(gauges, row: int, forecast):
+    """Projected hours to flood stage with its band, timed from the latest reading"""
+    _, hours, earliest, latest = (a[row] for a in forecast)
+    if not hours <= FORECAST_HORIZON_HOURS:
+        return None
+    eta = datetime.fromtimestamp(gauges.updated[row] + hours * 3600)
+    return {
+        "hours": float(hours),
+        "earliest_hours": float(earliest),
+        "latest_hours": float(latest) if np.isfinite(latest) else None,
+        "eta": eta.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+# =============================================================================
+# DERIVED VIEWS - memoized per city, recomputed when an input they read changes
+# =============================================================================
+
+def _clear_roads(data: CityData) -> list:
+    return [{"road": r, "congestion": s["congestion"]}
+            for r, s in data.road_status.items() if s["status"] == "Clear"]
+
+
+def _flooded_roads(data: CityData) -> list:
+    return [r for r, s in data.road_status.items() if s["status"] != "Clear"]
+
+
+def _gauge_counts(data: CityData, status) -> dict:
+    counts = np.bincount(status[1], minlength=len(STATUS_LABELS))
+    return {str(label): int(counts[code]) for code, label in reversed(list(enumerate(STATUS_LABELS)))}
+
+
+def _gauge_ranking(data: CityData, status, forecast) -> dict:
+    pct, codes = status
+    order = np.argsort(-pct, kind="stable")
+    return {
+        "gauges": [_gauge_entry(data.gauges, row, pct, codes, forecast) for row in order[:GAUGE_REPORT_LIMIT]],
+        "total": len(order),
+    }
+
+
+def _critical_gauges(data: CityData, status, forecast) -> list:
+    pct, codes = status
+    return [_gauge_entry(data.gauges, row, pct, codes, forecast) for row in np.flatnonzero(codes == CRITICAL)]
+
+
+def _flood_stage_outlook(data: CityData, status, forecast) -> list:
+    """Gauges still below flood stage but forecast to reach it, soonest first"""
+    pct, codes = status
+    hours = forecast[1]
+    rows = np.flatnonzero((hours > 0) & (hours <= FORECAST_HORIZON_HOURS))
+    rows = rows[np.argsort(hours[rows], kind="stable")][:FORECAST_REPORT_LIMIT]
+    return [_gauge_entry(data.gauges, row, pct, codes, forecast) for row in rows]
+
+
+def _zone_reachability(data: CityData, high_risk: list) -> list:
+    entries = []
+    for zone in high_risk:
+        entry = reachability_entry(data, zone)
+        if entry is not None:
+            entries.append({"zone": zone, **entry})
+    return entries
+
+
+def _shelter_coverage(data: CityData) -> dict:
+    """Per shelter, the zones it can be reached from within each travel-time band"""
+    index = get_reachability(data)
+    if index is None:
+        return {}
+    zones = {z: locate_node(data.network, z, loc) for z, loc in data.zone_locations.items()}
+    zones = {z: node for z, node in zones.items() if node is not None}
+    return {s["name"]: {f"{band:g}": places for band, places in index.coverage(s["name"], zones).items()}
+            for s in data.shelters}
+
+
+def _shelter_allocation(data: CityData, high_risk: list) -> dict:
+    allocation = plan_shelter_allocation(data, high_risk)
+    return {
+        "assigned": allocation.assigned,
+        "person_minutes": float(allocation.person_minutes),
+        "assignments": [{**a, "minutes": float(a["minutes"])} for a in allocation.assignments],
+        "unassigned": allocation.unassigned,
+        "unreachable": allocation.unreachable,
+    }
+
+
+VIEWS = {
+    "clear_roads": View(("roads",), _clear_roads),
+    "flooded_roads": View(("roads",), _flooded_roads),
+    "gauge_status": View(("gauges",), lambda data: data.gauges.classify(), compare=False),
+    "gauge_forecast": View(("gauges",), lambda data: data.gauges.forecast(), compare=False),
+    "gauge_counts": View(("gauge_status",), _gauge_counts),
+    "gauge_ranking": View(("gauge_status", "gauge_forecast"), _gauge_ranking),
+    "critical_gauges": View(("gauge_status", "gauge_forecast"), _critical_gauges),
+    "flood_stage_outlook": View(("gauge_status", "gauge_forecast"), _flood_stage_outlook),
+    "high_risk_zones": View(("zones",), lambda data: list(data.risk_zones.get('high_risk', []))),
+    "shelter_availability": View(("shelters",), lambda data: [_shelter_entry(s) for s in data.shelters]),
+    "shelter_allocation": View(("high_risk_zones", "roads", "shelters"), _shelter_allocation),
+    "zone_reachability": View(("high_risk_zones", "roads", "shelters"), _zone_reachability),
+    "shelter_coverage": View(("roads", "shelters", "zones"), _shelter_coverage),
+}
+
+
+def get_views(data: CityData) -> ViewGraph:
+    if data.views is None:
+        data.views = ViewGraph(data, VIEWS)
+    return data.views
+
+
+def evacuation_route_payload(city: str, from_loc: str) -> dict:
+    """generate_evacuation_route: open roads, fastest route, target shelter and reachability bands"""
+    data = get_city(city)
+    if data is None:
+        return unknown_city(city)
+    views = get_views(data)
+    shelters = data.shelters
+    
+    route, shelter = plan_evacuation_route(data, from_loc)
+    origin = locate(data, from_loc)
+    fallback = None
+    if route is None and origin:
+        # No open road path: point to the closest shelter with space
+        nearest = data.facilities.nearest_shelters(*origin, k=1)
+        shelter = nearest[0][2] if nearest else None
+        fallback = "nearest_by_distance"
+    elif route is None and shelters:
+        shelter = min(shelters, key=lambda s: s['current']/s['capacity'])
+        fallback = "least_occupied"
+    
+    others = []
+    if origin:
+        others = [
+            _shelter_entry(s, d) for d, _, s in data.facilities.nearest_shelters(*origin, k=3)
+            if shelter is None or s['name'] != shelter['name']
+        ][:2]
+    
+    return {
+        "city": city,
+        "from": from_loc,
+        "safe_roads": views.get("clear_roads"),
+        "flooded_roads": views.get("flooded_roads"),
+        "route": {
+            "minutes": float(route.minutes),
+            "distance_km": float(route.distance_km),
+            "destination": route.destination,
+            "legs": [{**leg, "km": float(leg["km"]), "minutes": float(leg["minutes"])} for leg in route.legs],
+        } if route else None,
+        "fallback": fallback,
+        "shelter": _shelter_entry(shelter) if shelter else None,
+        "nearby_shelters": others,
+        "reachability": reachability_entry(data, from_loc),
+    }
+
+
+def risk_zone_payload(city: str) -> dict:
+    """monitor_risk_zones: gauge status counts, most severe gauges, flood-stage outlook, risk zones"""
+    data = get_city(city)
+    if data is None:
+        return unknown_city(city)
+    views = get_views(data)
+    ranking = views.get("gauge_ranking")
+    return {
+        "city": city,
+        "gauge_counts": views.get("gauge_counts"),
+        "gauges": ranking["gauges"],
+        "gauges_total": ranking["total"],
+        "flood_stage_outlook": views.get("flood_stage_outlook"),
+        "risk_zones": data.risk_zones,
+    }
+
+
+def community_evacuation_payload(city: str) -> dict:
+    """execute_community_evacuation: gauges, flood-stage outlook, routes, shelters, reachability, assignments"""
+    data = get_city(city)
+    if data is None:
+        return unknown_city(city)
+    views = get_views(data)
+    shelters = views.get("shelter_availability")
+    return {
+        "city": city,
+        "critical_gauges": views.get("critical_gauges"),
+        "flood_stage_outlook": views.get("flood_stage_outlook"),
+        "high_risk_zones": views.get("high_risk_zones"),
+        "safe_roads": views.get("clear_roads"),
+        "shelters": shelters,
+        "total_capacity": sum(s["available"] for s in shelters),
+        "zone_reachability": views.get("zone_reachability"),
+        "shelter_coverage": views.get("shelter_coverage"),
+        "allocation": views.get("shelter_allocation"),
+    }
+
+
+def flood_risk_payload(location: str, grid: bool = False) -> dict:
+    """get_flood_risk: weather-based risk level, or the gridded raster summary"""
+    city_data = get_city(location)
+    if grid:
+        raster = get_risk_raster(location)
+        if raster is None:
+            return {"location": location, "grid": None,
+                    "error": f"No weather grid available for {location}."}
+        return grid_risk_payload(location, raster, city_data)
+    data = city_data.weather if city_data else None
+    if not data:
+        return {"location": location, "error": f"No weather data available for {location}."}
+    
+    risk_score, risk_level, warnings = score_flood_risk(data)
+    return {
+        "location": location,
+        "risk_level": risk_level,
+        "risk_score": risk_score,
+        "conditions": {
+            "humidity": data['humidity'],
+            "pressure": data['pressure'],
+            "rainfall_1h": data['rainfall_1h'],
+            "rainfall_3h": data.get('rainfall_3h'),
+            "weather": data['conditions'],
+        },
+        "warnings": warnings,
+        "recommendation": ('IMMEDIATE ACTION REQUIRED' if risk_level == 'EXTREME'
+                           else 'MONITOR SITUATION CLOSELY' if risk_level in ['HIGH', 'MEDIUM']
+                           else 'CONTINUE MONITORING'),
+    }
+
+
+def emergency_resources_payload(city: str, location: str = None, radius_km: float = None,
+                                limit: int = DEFAULT_RESOURCE_LIMIT) -> dict:
+    """find_emergency_resources: nearest (or emptiest) shelters and hospitals"""
+    data = get_city(city)
+    if data is None:
+        return unknown_city(city)
+    shelters = data.shelters
+    hospitals = data.hospitals
+    
+    origin = locate(data, location) if location else None
+    max_km = radius_km if radius_km is not None else float("inf")
+    if origin:
+        index = data.facilities
+        near_shelters = [(d, s) for d, _, s in index.nearest_shelters(*origin, k=limit, max_km=max_km)]
+        near_hospitals = [(d, h) for d, _, h in index.nearest_hospitals(*origin, k=limit, max_km=max_km)]
+        scope = f"Nearest to {location}" + (f" within {radius_km} km" if radius_km is not None else "")
+    else:
+        # No reference point: most available capacity first
+        near_shelters = [(None, s) for s in heapq.nlargest(
+            limit, shelters, key=lambda s: s['capacity'] - s['current'])]
+        near_hospitals = [(None, h) for h in heapq.nlargest(
+            limit, hospitals, key=lambda h: h['available_beds'])]
+        scope = "Most available capacity"
+        if location:
+            scope += f" (location {location} not found)"
+    
+    return {
+        "city": city,
+        "scope": scope,
+        "shelters": [_shelter_entry(s, d) for d, s in near_shelters],
+        "shelters_total": len(shelters),
+        "hospitals": [{
+            "name": h["name"],
+            "total_beds": h["total_beds"],
+            "available_beds": h["available_beds"],
+            "emergency_beds": h["emergency_beds"],
+            "distance_km": float(d) if d is not None else None,
+        } for d, h in near_hospitals],
+        "hospitals_total": len(hospitals),
+        "total_shelter_capacity": sum(s['capacity'] - s['current'] for _, s in near_shelters),
+        "total_hospital_beds": sum(h['available_beds'] for _, h in near_hospitals),
+    }
+
+
+# Tool name -> (payload builder, text renderer, argument extractor)
+TOOL_RESULTS = {
+    "generate_evacuation_route": (evacuation_route_payload, render_evacuation_route,
+                                  lambda a: (a["from_location"],)),
+    "monitor_risk_zones": (risk_zone_payload, render_risk_zones, lambda a: ()),
+    "execute_community_evacuation": (community_evacuation_payload, render_community_evacuation,
+                                     lambda a: ()),
+    "get_flood_risk": (flood_risk_payload, render_flood_risk,
+                       lambda a: (bool(a.get("grid", False)),)),
+    "find_emergency_resources": (emergency_resources_payload, render_emergency_resources,
+                                 lambda a: (a.get("location"), a.get("radius_km"),
+                                            a.get("limit", DEFAULT_RESOURCE_LIMIT))),
+}
+
+# CityData inputs each tool reads; its cached result outlives changes to the rest
+TOOL_INPUTS = {
+    "generate_evacuation_route": ("roads", "shelters", "zones"),
+    "monitor_risk_zones": ("gauges", "zones"),
+    "execute_community_evacuation": ("gauges", "roads", "shelters", "zones"),
+    "get_flood_risk": ("weather", "zones"),
+    "find_emergency_resources": ("shelters", "zones"),
+}
+
+# Tools whose results carry the time they were served ("generated" / "Time:")
+TIMESTAMPED_TOOLS = {"execute_community_evacuation"}
+
+# Argument naming the city, and the list form used for batches
+CITY_ARGUMENTS = {"get_flood_risk": ("location", "locations")}
+
+RESULT_CACHE = ResultCache(RESULT_CACHE_SIZE)
+
+Gauge("crisis_result_cache_entries", "Serialized payloads cached").labels().set_function(
+    lambda: len(RESULT_CACHE))
+_cache_lookups = Counter("crisis_result_cache_lookups_total", "Result cache lookups", ["result"])
+_cache_lookups.labels(result="hit").set_function(lambda: RESULT_CACHE.hits)
+_cache_lookups.labels(result="miss").set_function(lambda: RESULT_CACHE.misses)
+
+
+def _result_version(name: str, city: str, args: tuple):
+    """Version of a tool's inputs, or None if the result must not be cached"""
+    data = get_city(city)
+    version = tuple(data.input_version(i) for i in TOOL_INPUTS[name]) if data is not None else None
+    if name == "get_flood_risk" and args[0]:
+        raster = get_risk_raster(city)
+        return (raster.version, version) if raster is not None else None
+    return version
+
+
+def tool_result(name: str, city: str, args: tuple) -> CachedResult:
+    """Payload for one city, served from RESULT_CACHE while its inputs are unchanged"""
+    build = TOOL_RESULTS[name][0]
+    data = get_city(city)
+    try:
+        # Batch workers share city state with the feed handlers (apply_sensor_update)
+        with data.lock if data is not None else nullcontext():
+            version = _result_version(name, city, args)
+            return RESULT_CACHE.get((name, city) + args, version, lambda: build(city, *args))
+    except Exception as e:
+        logger.exception("%s for %s failed", name, city)
+        TOOL_ERRORS.labels(tool=name).inc()
+        key = CITY_ARGUMENTS.get(name, ("city",))[0]
+        return CachedResult(None, {key: city, "error": f"Error evaluating {city}: {e}"})
+
+
+_batch_pool = None
+
+
+async def run_batch(name: str, cities: list, args: tuple) -> dict:
+    """tool_result for many cities, fanned out over the worker pool; keyed by city"""
+    global _batch_pool
+    names = list(dict.fromkeys(cities))
+    if len(names) <= BATCH_INLINE_LIMIT:
+        results = [tool_result(name, city, args) for city in names]
+    else:
+        if _batch_pool is None:
+            _batch_pool = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="crisis-batch")
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(_batch_pool, tool_result, name, city, args) for city in names
+        ))
+    return dict(zip(names, results))
+
 
 @app.list_tools()
 async def list_tools() -> list[Tool]:
@@ -78,6 +972,8 @@ async def list_tools() -> list[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
+                    "format": FORMAT_SCHEMA,
+                    "trace_id": TRACE_SCHEMA,
                     "from_location": {"type": "string", "description": "Starting location"},
                     "city": {"type": "string", "description": "City name"}
                 },
@@ -91,9 +987,13 @@ async def list_tools() -> list[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "city": {"type": "string", "description": "City name"}
+                    "format": FORMAT_SCHEMA,
+                    "trace_id": TRACE_SCHEMA,
+                    "city": {"type": "string", "description": "City name"},
+                    "cities": {"type": "array", "items": {"type": "string"},
+                               "description": "Several cities at once; results are keyed by city"}
                 },
-                "required": ["city"]
+                "anyOf": [{"required": ["city"]}, {"required": ["cities"]}]
             }
         ),
         # JAVI'S REQUIREMENT: Step 1 + 2 - Complete Community Evacuation Workflow
@@ -103,6 +1003,8 @@ async def list_tools() -> list[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
+                    "format": FORMAT_SCHEMA,
+                    "trace_id": TRACE_SCHEMA,
                     "city": {"type": "string", "description": "City name"}
                 },
                 "required": ["city"]
@@ -115,21 +1017,33 @@ async def list_tools() -> list[Tool]:
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "location": {"type": "string", "description": "City name"}
+                    "format": FORMAT_SCHEMA,
+                    "trace_id": TRACE_SCHEMA,
+                    "location": {"type": "string", "description": "City name"},
+                    "locations": {"type": "array", "items": {"type": "string"},
+                                  "description": "Several cities at once; results are keyed by city"},
+                    "grid": {"type": "boolean", "description": "Score the city's gridded weather field cell by cell"}
                 },
-                "required": ["location"]
+                "anyOf": [{"required": ["location"]}, {"required": ["locations"]}]
             }
         ),
         # Additional Tools: Resources
         Tool(
             name="find_emergency_resources",
-            description="Find shelters and hospitals with capacity information",
+            description="Find nearby shelters and hospitals with capacity information",
             inputSchema={
                 "type": "object",
                 "properties": {
-                    "city": {"type": "string", "description": "City name"}
+                    "format": FORMAT_SCHEMA,
+                    "trace_id": TRACE_SCHEMA,
+                    "city": {"type": "string", "description": "City name"},
+                    "cities": {"type": "array", "items": {"type": "string"},
+                               "description": "Several cities at once; results are keyed by city"},
+                    "location": {"type": "string", "description": "Place name or 'lat,lon' to search around"},
+                    "radius_km": {"type": "number", "description": "Only include facilities within this distance"},
+                    "limit": {"type": "integer", "description": "Maximum facilities per category (default 5)"}
                 },
-                "required": ["city"]
+                "anyOf": [{"required": ["city"]}, {"required": ["cities"]}]
             }
         )
     ]
@@ -137,207 +1051,102 @@ async def list_tools() -> list[Tool]:
 
 @app.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[TextContent]:
-    """Execute crisis response tool"""
+    """Execute crisis response tool: JSON payload, or the text report with format="text" """
+    if name not in TOOL_RESULTS:
+        return [TextContent(type="text", text=f"Unknown tool: {name}")]
+    render = TOOL_RESULTS[name][1]
+    args = TOOL_RESULTS[name][2](arguments)
+    as_text = arguments.get("format") == "text"
+    city_key, cities_key = CITY_ARGUMENTS.get(name, ("city", "cities"))
+    batch = cities_key in arguments
+    generated = datetime.now().strftime('%Y-%m-%d %H:%M:%S') if name in TIMESTAMPED_TOOLS else None
+    TOOL_CALLS.labels(tool=name, mode="batch" if batch else "single").inc()
     
-    # JAVI'S REQUIREMENT: generate_evacuation_route
-    if name == "generate_evacuation_route":
-        from_loc = arguments["from_location"]
-        city = arguments["city"]
+    with span(f"tool:{name}", agent="crisis-mcp", trace_id=arguments.get(TRACE_FIELD)), \
+            TOOL_SECONDS.labels(tool=name).time():
+        if batch:
+            results = await run_batch(name, arguments[cities_key], args)
+            if as_text:
+                text = json.dumps({city: served(r, render, True, generated) for city, r in results.items()})
+            else:
+                text = batch_json(results, generated)
+            return [TextContent(type="text", text=text)]
         
-        roads = ROAD_STATUS.get(city, {})
-        shelters = SAFE_SHELTERS.get(city, [])
-        
-        clear_routes = [r for r, s in roads.items() if s["status"] == "Clear"]
-        blocked = [r for r, s in roads.items() if s["status"] != "Clear"]
-        
-        result = f"""EVACUATION ROUTE GENERATED
-
-From: {from_loc}
-City: {city}
-
-SAFE ROUTES (Real-time Road Status):
-"""
-        for i, route in enumerate(clear_routes, 1):
-            info = roads[route]
-            result += f"\n{i}. {route} - {info['congestion']} congestion"
-        
-        result += f"\n\nAVOID (Flooded Roads): {', '.join(blocked)}"
-        
-        if shelters:
-            best = min(shelters, key=lambda s: s['current']/s['capacity'])
-            avail = best['capacity'] - best['current']
-            result += f"\n\nNEAREST SHELTER: {best['name']}\nAddress: {best['address']}\nAvailable Spaces: {avail}"
-        
-        return [TextContent(type="text", text=result)]
-    
-    # JAVI'S REQUIREMENT: Step 1 - monitor_risk_zones
-    elif name == "monitor_risk_zones":
-        city = arguments["city"]
-        water = WATER_LEVELS.get(city, {})
-        zones = RISK_ZONES.get(city, {})
-        
-        result = f"""RISK ZONE MONITORING - {city}
-Community Evacuation Support - Step 1
+        result = tool_result(name, arguments[city_key], args)
+        return [TextContent(type="text", text=served(result, render, as_text, generated))]
 
-WATER LEVELS (Real-time Feed):
-"""
-        for w, d in water.items():
-            pct = ((d['level']-d['normal'])/(d['flood_stage']-d['normal']))*100
-            status = "CRITICAL" if pct >= 80 else "WARNING" if pct >= 60 else "WATCH"
-            result += f"\n{w}: {d['level']} ft - {status} ({pct:.0f}% to flood stage, {d['status']})"
-        
-        result += f"\n\nRISK ZONES (Terrain Data):"
-        result += f"\nHIGH RISK: {', '.join(zones.get('high_risk', []))}"
-        result += f"\nMEDIUM RISK: {', '.join(zones.get('medium_risk', []))}"
-        result += f"\nLOW RISK: {', '.join(zones.get('low_risk', []))}"
-        
-        return [TextContent(type="text", text=result)]
-    
-    # JAVI'S REQUIREMENT: Step 1 + 2 - execute_community_evacuation
-    elif name == "execute_community_evacuation":
-        city = arguments["city"]
-        
-        result = f"""COMMUNITY EVACUATION WORKFLOW - {city}
 
-STEP 1: MONITOR RISK ZONES
-"""
-        # Monitor water levels
-        water = WATER_LEVELS.get(city, {})
-        critical_count = 0
-        for w, d in water.items():
-            pct = ((d['level']-d['normal'])/(d['flood_stage']-d['normal']))*100
-            if pct >= 80:
-                critical_count += 1
-                result += f"\nCRITICAL: {w} at {d['level']} ft ({pct:.0f}% to flood, {d['status']})"
-        
-        # Identify risk zones
-        zones = RISK_ZONES.get(city, {})
-        high_risk = zones.get('high_risk', [])
-        result += f"\n\nRisk Assessment: {len(high_risk)} HIGH RISK zones identified"
-        result += f"\nAffected Areas: {', '.join(high_risk)}"
-        
-        result += f"\n\nSTEP 2: AUTOMATICALLY PLAN AND DISPATCH"
-        
-        # Generate evacuation routes
-        roads = ROAD_STATUS.get(city, {})
-        clear = [r for r, s in roads.items() if s["status"] == "Clear"]
-        result += f"\n\nSafe Evacuation Routes (Geospatial Data + Real-time Status):"
-        for route in clear:
-            result += f"\n  - {route} ({roads[route]['congestion']} congestion)"
-        
-        # Find shelters
-        shelters = SAFE_SHELTERS.get(city, [])
-        total_capacity = sum(s['capacity'] - s['current'] for s in shelters)
-        result += f"\n\nDesignated Shelters:"
-        for shelter in shelters:
-            avail = shelter['capacity'] - shelter['current']
-            result += f"\n  - {shelter['name']}: {avail} spaces available"
-        
-        # Dispatch alerts
-        result += f"\n\nEVACUATION ALERT DISPATCHED:"
-        result += f"\n{'='*60}"
-        result += f"\nEMERGENCY EVACUATION ORDER"
-        result += f"\n\nAffected Areas: {', '.join(high_risk)}"
-        result += f"\nRecommended Routes: {', '.join(clear[:2])}"
-        result += f"\nShelter Locations: {', '.join([s['name'] for s in shelters])}"
-        result += f"\nTotal Shelter Capacity: {total_capacity} people"
-        result += f"\n{'='*60}"
-        
-        result += f"\n\nWORKFLOW STATUS: COMPLETE"
-        result += f"\nTime: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        
-        return [TextContent(type="text", text=result)]
-    
-    # Additional Tool: Flood Risk
-    elif name == "get_flood_risk":
-        location = arguments["location"]
-        data = WEATHER_DATA.get(location, WEATHER_DATA["Boston"])
-        
-        humidity = data['humidity']
-        pressure = data['pressure']
-        rain_1h = data['rainfall_1h']
-        
-        risk_score = 0
-        warnings = []
-        
-        if humidity > 85:
-            risk_score += 3
-            warnings.append("VERY HIGH humidity detected")
-        
-        if pressure < 1000:
-            risk_score += 3
-            warnings.append("LOW pressure (storm system present)")
-        
-        if rain_1h > 2:
-            risk_score += 4
-            warnings.append("HEAVY rainfall detected")
-        elif rain_1h > 1:
-            risk_score += 3
-            warnings.append("MODERATE rainfall")
-        
-        if risk_score >= 7:
-            risk_level = "EXTREME"
-        elif risk_score >= 5:
-            risk_level = "HIGH"
-        elif risk_score >= 3:
-            risk_level = "MEDIUM"
-        else:
-            risk_level = "LOW"
-        
-        result = f"""FLOOD RISK ASSESSMENT - {location}
+@app.list_resources()
+async def list_resources() -> list[Resource]:
+    """Live alert state and change log per city"""
+    resources = []
+    for city in CITY_DATA.cities():
+        resources.append(Resource(
+            uri=AnyUrl(f"crisis://{city}/alerts"),
+            name=f"{city} alerts",
+            description="Gauges above WATCH, flooded roads, cut-off zones and flood risk level",
+            mimeType="application/json",
+        ))
+        resources.append(Resource(
+            uri=AnyUrl(f"crisis://{city}/changes"),
+            name=f"{city} changes",
+            description="Recent status transitions from the live sensor feed",
+            mimeType="application/json",
+        ))
+    return resources
 
-RISK LEVEL: {risk_level}
 
-Current Conditions:
-- Humidity: {humidity}%
-- Pressure: {pressure} hPa
-- Rainfall (1h): {rain_1h:.2f} inches
-- Weather: {data['conditions']}
+@app.read_resource()
+async def read_resource(uri: AnyUrl) -> str:
+    """Serve a crisis://{city}/alerts or crisis://{city}/changes resource"""
+    city, _, kind = unquote(str(uri).removeprefix("crisis://")).partition("/")
+    data = get_city(city)
+    if data is None:
+        raise ValueError(f"Unknown city: {city}")
+    if kind == "alerts":
+        return json.dumps(_alert_resource(data))
+    if kind == "changes":
+        get_alert_state(data)
+        return json.dumps(list(data.change_log))
+    raise ValueError(f"Unknown resource: {uri}")
 
-Risk Score: {risk_score}/10
 
-Warnings:
-{chr(10).join(warnings) if warnings else 'All conditions normal'}
+@app.subscribe_resource()
+async def subscribe_resource(uri: AnyUrl):
+    _SUBSCRIBERS.setdefault(str(uri), set()).add(app.request_context.session)
 
-Recommendation: {'IMMEDIATE ACTION REQUIRED' if risk_level == 'EXTREME' else 'MONITOR SITUATION CLOSELY' if risk_level in ['HIGH', 'MEDIUM'] else 'CONTINUE MONITORING'}
-"""
-        return [TextContent(type="text", text=result)]
-    
-    # Additional Tool: Emergency Resources
-    elif name == "find_emergency_resources":
-        city = arguments["city"]
-        shelters = SAFE_SHELTERS.get(city, [])
-        hospitals = HOSPITALS.get(city, [])
-        
-        result = f"""EMERGENCY RESOURCES - {city}
 
-SHELTERS:
-"""
-        for shelter in shelters:
-            available = shelter['capacity'] - shelter['current']
-            result += f"\n- {shelter['name']}: {available}/{shelter['capacity']} available"
-            result += f"\n  Address: {shelter['address']}"
-        
-        result += "\n\nHOSPITALS:"
-        for hospital in hospitals:
-            result += f"\n- {hospital['name']}: {hospital['available_beds']} beds, {hospital['emergency_beds']} emergency"
-        
-        total_shelter_capacity = sum(s['capacity'] - s['current'] for s in shelters)
-        total_hospital_beds = sum(h['available_beds'] for h in hospitals)
-        
-        result += f"\n\nSUMMARY:"
-        result += f"\nTotal Shelter Capacity: {total_shelter_capacity} people"
-        result += f"\nTotal Hospital Beds: {total_hospital_beds} beds"
-        
-        return [TextContent(type="text", text=result)]
-    
-    return [TextContent(type="text", text=f"Unknown tool: {name}")]
+@app.unsubscribe_resource()
+async def unsubscribe_resource(uri: AnyUrl):
+    _SUBSCRIBERS.get(str(uri), set()).discard(app.request_context.session)
 
 
 async def main():
     """Run the unified crisis response MCP server"""
+    options = app.create_initialization_options(NotificationOptions(resources_changed=True))
+    options.capabilities.resources.subscribe = True
+    if METRICS_PORT:
+        MetricsServer(METRICS_PORT).start()
+        logger.info("Metrics on http://localhost:%d/metrics", METRICS_PORT)
     async with stdio_server() as (read_stream, write_stream):
-        await app.run(read_stream, write_stream, app.create_initialization_options())
+        feed = asyncio.create_task(run_feed(SENSOR_FEED, handle_sensor_update)) if SENSOR_FEED else None
+        try:
+            await app.run(read_stream, write_stream, options)
+        finally:
+            if feed:
+                feed.cancel()
+
+def export_builtin_data(directory: str):
+    """Write the built-in city data as SQLite shards for CRISIS_DATA_DIR"""
+    backend = SQLiteBackend(directory)
+    fixtures = _builtin_backend()
+    for city in fixtures.cities():
+        backend.write(fixtures.load(city))
+        print(f"Exported {city} to {directory}")
+
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if len(sys.argv) == 3 and sys.argv[1] == "--export-data":
+        export_builtin_data(sys.argv[2])
+    else:
+        asyncio.run(main())
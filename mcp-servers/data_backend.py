@@ -0,0 +1,389 @@
+"""
+City Data Backend - Crisis Response MCP Server
+
+Pluggable storage for per-city crisis data. A backend loads one city at a time
+into a CityData object; CityCache keeps the most recently used cities in memory
+and evicts the rest, writing live updates back when the backend supports it.
+
+Backends:
+    FixtureBackend  wraps in-process dicts (the built-in demo data)
+    SQLiteBackend   one SQLite shard per city in a directory, e.g.
+                    data/Boston.sqlite, data/New%20York.sqlite
+"""
+
+import itertools
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from urllib.parse import quote, unquote
+
+from gauge_store import GaugeStore
+from road_network import RoadNetwork
+from shelter_allocation import TravelCostCache
+from spatial_index import FacilityIndex
+
+logger = logging.getLogger(__name__)
+
+# Cities kept in memory at once
+DEFAULT_CITY_CACHE_SIZE = 32
+
+SHARD_SUFFIX = ".sqlite"
+
+# Source of CityData versions; global so a reloaded city never reuses a version
+_versions = itertools.count(1)
+
+# Inputs versioned separately, so derived views and cached results depend
+# only on the data they read
+INPUTS = ("gauges", "roads", "shelters", "weather", "zones")
+
+
+class CityData:
+    """All crisis data for one city, with derived indexes built on first use"""
+
+    def __init__(self, city: str, risk_zones: dict = None, zone_locations: dict = None,
+                 road_status: dict = None, road_network: dict = None, water_levels: dict = None,
+                 shelters: list = None, hospitals: list = None, weather: dict = None,
+                 zone_population: dict = None):
+        self.city = city
+        self.risk_zones = risk_zones if risk_zones is not None else {}
+        self.zone_locations = zone_locations if zone_locations is not None else {}
+        self.road_status = road_status if road_status is not None else {}
+        self.road_network = road_network
+        self.water_levels = water_levels if water_levels is not None else {}
+        self.shelters = shelters if shelters is not None else []
+        self.hospitals = hospitals if hospitals is not None else []
+        self.weather = weather
+        self.zone_population = zone_population if zone_population is not None else {}
+        # Set when live updates modify this city; dirty cities are saved on eviction
+        self.dirty = False
+        # Held by tool evaluation (possibly on batch worker threads) and by
+        # feed updates, so a reader never sees a half-applied update
+        self.lock = threading.RLock()
+        # Changes whenever the data does; _input_versions per input in INPUTS
+        self.version = next(_versions)
+        self._input_versions = dict.fromkeys(INPUTS, self.version)
+        # Streaming alert state, derived views and the shelter reachability
+        # index, owned by the server (see get_alert_state, get_views and
+        # get_reachability)
+        self.alert_state = None
+        self.change_log = None
+        self.views = None
+        self.reachability = None
+        self._network = None
+        self._gauges = None
+        self._facilities = None
+        self._shelters_by_name = None
+        self._travel_costs = None
+
+    @property
+    def network(self):
+        """Road graph synced to road_status, or None if the city has no graph"""
+        if self._network is None and self.road_network:
+            self._network = RoadNetwork.from_dict(self.city, self.road_network)
+            self._network.sync_status(self.road_status)
+        return self._network
+
+    @property
+    def gauges(self) -> GaugeStore:
+        if self._gauges is None:
+            self._gauges = GaugeStore.from_dict(self.water_levels)
+        return self._gauges
+
+    @property
+    def facilities(self) -> FacilityIndex:
+        if self._facilities is None:
+            self._facilities = FacilityIndex(self.shelters, self.hospitals, self.zone_locations)
+        return self._facilities
+
+    @property
+    def travel_costs(self) -> TravelCostCache:
+        """Zone-to-shelter travel times for allocation, kept until roads change"""
+        if self._travel_costs is None:
+            self._travel_costs = TravelCostCache()
+        return self._travel_costs
+
+    def touch(self, *inputs: str):
+        """Record that live updates modified some inputs (default: all of them)"""
+        self.dirty = True
+        self.version = next(_versions)
+        for name in inputs or INPUTS:
+            self._input_versions[name] = self.version
+
+    def input_version(self, name: str) -> int:
+        return self._input_versions[name]
+
+    def shelter(self, name: str):
+        if self._shelters_by_name is None:
+            self._shelters_by_name = {s["name"]: s for s in self.shelters}
+        return self._shelters_by_name.get(name)
+
+    def current_water_levels(self) -> dict:
+        """WATER_LEVELS-style dict reflecting the latest gauge readings"""
+        if self._gauges is None:
+            return self.water_levels
+        store = self._gauges
+        return {
+            name: {
+                "level": float(store.level[row]),
+                "normal": float(store.normal[row]),
+                "flood_stage": float(store.flood_stage[row]),
+                "status": store.trend[row],
+            }
+            for row, name in enumerate(store.names)
+        }
+
+
+class DataBackend:
+    """Source of per-city data"""
+
+    def cities(self) -> list:
+        raise NotImplementedError
+
+    def load(self, city: str):
+        """Return CityData for city, or None if the backend has no such city"""
+        raise NotImplementedError
+
+    def save(self, data: CityData):
+        """Persist live state for a city (no-op for read-only backends)"""
+
+
+class FixtureBackend(DataBackend):
+    """Serves in-process dicts keyed by city, like the built-in demo data.
+
+    The CityData objects share the fixture's inner dicts, so live updates
+    survive eviction without an explicit save.
+    """
+
+    def __init__(self, risk_zones: dict, zone_locations: dict, road_status: dict,
+                 road_network: dict, water_levels: dict, shelters: dict,
+                 hospitals: dict, weather: dict, zone_population: dict = None):
+        self._sources = {
+            "risk_zones": risk_zones,
+            "zone_locations": zone_locations,
+            "road_status": road_status,
+            "road_network": road_network,
+            "water_levels": water_levels,
+            "shelters": shelters,
+            "hospitals": hospitals,
+            "weather": weather,
+            "zone_population": zone_population if zone_population is not None else {},
+        }
+
+    def cities(self) -> list:
+        names = set()
+        for source in self._sources.values():
+            names.update(source)
+        return sorted(names)
+
+    def load(self, city: str):
+        if not any(city in source for source in self._sources.values()):
+            return None
+        # setdefault so that in-place updates land in the shared fixture
+        return CityData(
+            city,
+            risk_zones=self._sources["risk_zones"].get(city),
+            zone_locations=self._sources["zone_locations"].get(city),
+            road_status=self._sources["road_status"].setdefault(city, {}),
+            road_network=self._sources["road_network"].get(city),
+            water_levels=self._sources["water_levels"].get(city),
+            shelters=self._sources["shelters"].get(city),
+            hospitals=self._sources["hospitals"].get(city),
+            weather=self._sources["weather"].get(city),
+            zone_population=self._sources["zone_population"].get(city),
+        )
+
+    def save(self, data: CityData):
+        # Gauge readings live in the GaugeStore; fold them back into the fixture
+        levels = data.current_water_levels()
+        if levels:
+            self._sources["water_levels"][data.city] = levels
+        if data.weather is not None:
+            self._sources["weather"][data.city] = data.weather
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS zones (name TEXT PRIMARY KEY, risk TEXT, lat REAL, lon REAL, population INTEGER);
+CREATE TABLE IF NOT EXISTS roads (name TEXT PRIMARY KEY, status TEXT, congestion TEXT);
+CREATE TABLE IF NOT EXISTS nodes (name TEXT PRIMARY KEY, lat REAL, lon REAL);
+CREATE TABLE IF NOT EXISTS segments (src TEXT, dst TEXT, road TEXT, km REAL, kph REAL, two_way INTEGER);
+CREATE TABLE IF NOT EXISTS gauges (name TEXT PRIMARY KEY, level REAL, normal REAL, flood_stage REAL, status TEXT);
+CREATE TABLE IF NOT EXISTS shelters (name TEXT PRIMARY KEY, capacity INTEGER, current INTEGER,
+                                     address TEXT, lat REAL, lon REAL);
+CREATE TABLE IF NOT EXISTS hospitals (name TEXT PRIMARY KEY, total_beds INTEGER, available_beds INTEGER,
+                                      emergency_beds INTEGER, lat REAL, lon REAL);
+CREATE TABLE IF NOT EXISTS weather (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+RISK_LEVELS = ("high_risk", "medium_risk", "low_risk")
+
+
+class SQLiteBackend(DataBackend):
+    """One SQLite database file per city under a data directory"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, city: str) -> str:
+        return os.path.join(self.directory, quote(city, safe="") + SHARD_SUFFIX)
+
+    def cities(self) -> list:
+        return sorted(
+            unquote(f[:-len(SHARD_SUFFIX)])
+            for f in os.listdir(self.directory) if f.endswith(SHARD_SUFFIX)
+        )
+
+    def load(self, city: str):
+        path = self._path(city)
+        if not os.path.exists(path):
+            return None
+        with sqlite3.connect(path) as db:
+            risk_zones = {level: [] for level in RISK_LEVELS}
+            zone_locations = {}
+            zone_population = {}
+            for name, risk, lat, lon, population in db.execute(
+                    "SELECT name, risk, lat, lon, population FROM zones ORDER BY rowid"):
+                risk_zones.setdefault(risk, []).append(name)
+                if lat is not None and lon is not None:
+                    zone_locations[name] = {"lat": lat, "lon": lon}
+                if population is not None:
+                    zone_population[name] = population
+            road_status = {
+                name: {"status": status, "congestion": congestion}
+                for name, status, congestion in db.execute("SELECT name, status, congestion FROM roads")
+            }
+            nodes = {name: [lat, lon] for name, lat, lon in db.execute("SELECT name, lat, lon FROM nodes")}
+            segments = [
+                {"from": src, "to": dst, "road": road, "km": km, "kph": kph, "two_way": bool(two_way)}
+                for src, dst, road, km, kph, two_way in db.execute(
+                    "SELECT src, dst, road, km, kph, two_way FROM segments")
+            ]
+            water_levels = {
+                name: {"level": level, "normal": normal, "flood_stage": flood_stage, "status": status}
+                for name, level, normal, flood_stage, status in db.execute(
+                    "SELECT name, level, normal, flood_stage, status FROM gauges")
+            }
+            shelters = [
+                {"name": n, "capacity": cap, "current": cur, "address": addr, "lat": lat, "lon": lon}
+                for n, cap, cur, addr, lat, lon in db.execute(
+                    "SELECT name, capacity, current, address, lat, lon FROM shelters")
+            ]
+            hospitals = [
+                {"name": n, "total_beds": t, "available_beds": a, "emergency_beds": e, "lat": lat, "lon": lon}
+                for n, t, a, e, lat, lon in db.execute(
+                    "SELECT name, total_beds, available_beds, emergency_beds, lat, lon FROM hospitals")
+            ]
+            weather = {k: json.loads(v) for k, v in db.execute("SELECT key, value FROM weather")} or None
+        return CityData(
+            city, risk_zones, zone_locations, road_status,
+            {"nodes": nodes, "segments": segments} if nodes else None,
+            water_levels, shelters, hospitals, weather, zone_population,
+        )
+
+    def write(self, data: CityData):
+        """Create or replace a city's shard from a CityData object"""
+        path = self._path(data.city)
+        if os.path.exists(path):
+            os.unlink(path)
+        with sqlite3.connect(path) as db:
+            db.executescript(_SCHEMA)
+            db.executemany(
+                "INSERT INTO zones VALUES (?, ?, ?, ?, ?)",
+                [
+                    (name, risk, data.zone_locations.get(name, {}).get("lat"),
+                     data.zone_locations.get(name, {}).get("lon"), data.zone_population.get(name))
+                    for risk, names in data.risk_zones.items() for name in names
+                ],
+            )
+            network = data.road_network or {"nodes": {}, "segments": []}
+            db.executemany("INSERT INTO nodes VALUES (?, ?, ?)",
+                           [(n, lat, lon) for n, (lat, lon) in network["nodes"].items()])
+            db.executemany(
+                "INSERT INTO segments VALUES (?, ?, ?, ?, ?, ?)",
+                [(s["from"], s["to"], s["road"], s["km"], s["kph"], int(s.get("two_way", True)))
+                 for s in network["segments"]],
+            )
+            self._write_live_state(db, data)
+
+    def save(self, data: CityData):
+        path = self._path(data.city)
+        with sqlite3.connect(path) as db:
+            db.executescript(_SCHEMA)
+            self._write_live_state(db, data)
+
+    def _write_live_state(self, db, data: CityData):
+        """Tables that live updates modify: roads, gauges, shelters, hospitals, weather"""
+        db.execute("DELETE FROM roads")
+        db.executemany("INSERT INTO roads VALUES (?, ?, ?)",
+                       [(n, i["status"], i.get("congestion", "Low")) for n, i in data.road_status.items()])
+        db.execute("DELETE FROM gauges")
+        db.executemany(
+            "INSERT INTO gauges VALUES (?, ?, ?, ?, ?)",
+            [(n, d["level"], d["normal"], d["flood_stage"], d.get("status", "Steady"))
+             for n, d in data.current_water_levels().items()],
+        )
+        db.execute("DELETE FROM shelters")
+        db.executemany(
+            "INSERT INTO shelters VALUES (?, ?, ?, ?, ?, ?)",
+            [(s["name"], s["capacity"], s["current"], s.get("address", ""), s.get("lat"), s.get("lon"))
+             for s in data.shelters],
+        )
+        db.execute("DELETE FROM hospitals")
+        db.executemany(
+            "INSERT INTO hospitals VALUES (?, ?, ?, ?, ?, ?)",
+            [(h["name"], h["total_beds"], h["available_beds"], h["emergency_beds"], h.get("lat"), h.get("lon"))
+             for h in data.hospitals],
+        )
+        db.execute("DELETE FROM weather")
+        db.executemany("INSERT INTO weather VALUES (?, ?)",
+                       [(k, json.dumps(v)) for k, v in (data.weather or {}).items()])
+
+
+class CityCache:
+    """LRU cache of loaded cities in front of a DataBackend"""
+
+    def __init__(self, backend: DataBackend, max_cities: int = DEFAULT_CITY_CACHE_SIZE):
+        self.backend = backend
+        self.max_cities = max_cities
+        self._cities = OrderedDict()
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def __contains__(self, city: str) -> bool:
+        return city in self._cities
+
+    def get(self, city: str):
+        """CityData for city (loading it if needed), or None if unknown"""
+        with self._lock:
+            data = self._cities.get(city)
+            if data is not None:
+                self._cities.move_to_end(city)
+                return data
+        data = self.backend.load(city)
+        if data is None:
+            return None
+        with self._lock:
+            # Another caller may have loaded it concurrently; keep the first copy
+            existing = self._cities.get(city)
+            if existing is not None:
+                return existing
+            self._cities[city] = data
+            self.loads += 1
+            evicted = []
+            while len(self._cities) > self.max_cities:
+                evicted.append(self._cities.popitem(last=False)[1])
+                self.evictions += 1
+        for old in evicted:
+            if old.dirty:
+                self.backend.save(old)
+        return data
+
+    def cities(self) -> list:
+        return self.backend.cities()
+
+    def loaded(self) -> list:
+        return list(self._cities)
@@ -0,0 +1,73 @@
+"""
+Derived Views - Crisis Response MCP Server
+
+Memoized views over one city's data, arranged as a small dependency graph.
+Leaves are CityData inputs ("gauges", "roads", "shelters", ...) whose
+versions are bumped by live updates; each view names the inputs and other
+views it is computed from:
+
+    VIEWS = {
+        "flooded_roads": View(("roads",), lambda data: [...]),
+        "allocation": View(("high_risk_zones", "roads", "shelters"), plan),
+    }
+
+A view is recomputed only when the version of something it depends on
+changed since its last evaluation; otherwise the memoized value is served.
+When a recomputed value equals the previous one the view keeps its version,
+so views further down the graph stay valid too (e.g. a congestion change
+that doesn't flip any road to flooded leaves "flooded_roads" untouched).
+"""
+
+import itertools
+import threading
+from typing import Callable, NamedTuple
+
+
+class View(NamedTuple):
+    """A derived value: fn(data, *values of the view dependencies)"""
+    deps: tuple
+    fn: Callable
+    # Compare new values with the old one; disable for values without
+    # meaningful == (e.g. NumPy arrays)
+    compare: bool = True
+
+
+class ViewGraph:
+    """Memoized views for one CityData"""
+
+    def __init__(self, data, views: dict):
+        self.data = data
+        self.views = views
+        self._memo = {}  # name -> (dependency versions, own version, value)
+        self._versions = itertools.count(1)
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str):
+        """Current value of a view, recomputed only if an input changed"""
+        with self._lock:
+            return self._resolve(name)[2]
+
+    def version(self, name: str):
+        """Version of a view or CityData input"""
+        if name not in self.views:
+            return self.data.input_version(name)
+        with self._lock:
+            return self._resolve(name)[1]
+
+    def _resolve(self, name: str) -> tuple:
+        view = self.views[name]
+        stamp = tuple(self.version(dep) for dep in view.deps)
+        memo = self._memo.get(name)
+        if memo is not None and memo[0] == stamp:
+            self.hits += 1
+            return memo
+        self.misses += 1
+        value = view.fn(self.data, *(self._memo[dep][2] for dep in view.deps if dep in self.views))
+        if memo is not None and view.compare and value == memo[2]:
+            memo = (stamp, memo[1], memo[2])
+        else:
+            memo = (stamp, next(self._versions), value)
+        self._memo[name] = memo
+        return memo
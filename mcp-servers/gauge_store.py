@@ -0,0 +1,225 @@
+"""
+Gauge Time-Series Store - Crisis Response MCP Server
+
+Column store for river/tide gauges backed by NumPy arrays. Each gauge is a row
+with level, normal and flood_stage columns plus a fixed-size ring buffer of its
+most recent readings. Flood-stage classification runs as one vectorized pass
+over every gauge in the city.
+
+Each gauge also keeps running least-squares sums (n, t, y, t^2, ty, y^2) over
+the readings in its ring buffer. A new reading adds its terms and subtracts
+those of the reading it overwrites, so the level-vs-time regression behind
+forecast() is updated in O(1) per reading, without refitting from history.
+Times are stored relative to a per-gauge anchor, and the sums are rebuilt
+from the buffer (and re-anchored) once every `history` readings, which keeps
+rounding drift bounded at amortized O(1) cost.
+"""
+
+import time
+
+import numpy as np
+
+# Percent of the way from normal level to flood stage
+CRITICAL_PCT = 80.0
+WARNING_PCT = 60.0
+
+STATUS_LABELS = np.array(["WATCH", "WARNING", "CRITICAL"])
+WATCH, WARNING, CRITICAL = 0, 1, 2
+
+# Readings kept per gauge; also the forecast's regression window
+DEFAULT_HISTORY = 32
+
+# Readings needed before a gauge's rate of rise is trusted
+MIN_FORECAST_READINGS = 3
+
+# Normal quantile for the forecast band (1.645: 90% two-sided)
+FORECAST_Z = 1.645
+
+
+class GaugeStore:
+    """Array-backed store of gauges for a single city"""
+
+    def __init__(self, history: int = DEFAULT_HISTORY, capacity: int = 16):
+        self.history = history
+        self.names = []
+        self._rows = {}
+        self.trend = []
+        self._size = 0
+        self._alloc(capacity)
+
+    def _alloc(self, capacity: int):
+        """Grow every column to hold `capacity` gauges"""
+        def grow(old, shape, fill):
+            new = np.full(shape, fill, dtype=np.float64)
+            if old is not None:
+                new[:len(old)] = old
+            return new
+
+        self.level = grow(getattr(self, "level", None), capacity, np.nan)
+        self.normal = grow(getattr(self, "normal", None), capacity, np.nan)
+        self.flood_stage = grow(getattr(self, "flood_stage", None), capacity, np.nan)
+        self.updated = grow(getattr(self, "updated", None), capacity, np.nan)
+        self.readings = grow(getattr(self, "readings", None), (capacity, self.history), np.nan)
+        self.reading_times = grow(getattr(self, "reading_times", None), (capacity, self.history), np.nan)
+        # Regression sums over the buffered readings, times relative to anchor
+        self.anchor = grow(getattr(self, "anchor", None), capacity, np.nan)
+        self.sums = grow(getattr(self, "sums", None), (capacity, 5), 0.0)
+        head = np.zeros(capacity, dtype=np.int64)
+        count = np.zeros(capacity, dtype=np.int64)
+        since_rebuild = np.zeros(capacity, dtype=np.int64)
+        if hasattr(self, "head"):
+            head[:len(self.head)] = self.head
+            count[:len(self.count)] = self.count
+            since_rebuild[:len(self.since_rebuild)] = self.since_rebuild
+        self.head = head
+        self.count = count
+        self.since_rebuild = since_rebuild
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._rows
+
+    @classmethod
+    def from_dict(cls, water_levels: dict, history: int = DEFAULT_HISTORY) -> "GaugeStore":
+        """Build from a WATER_LEVELS-style {gauge: {level, normal, flood_stage, status}} dict"""
+        store = cls(history=history, capacity=max(len(water_levels), 1))
+        now = time.time()
+        for name, d in water_levels.items():
+            store.add_gauge(name, d["level"], d["normal"], d["flood_stage"],
+                            d.get("status", "Steady"), timestamp=now)
+        return store
+
+    def add_gauge(self, name: str, level: float, normal: float, flood_stage: float,
+                  trend: str = "Steady", timestamp: float = None) -> int:
+        """Register a gauge (or update its static columns) and record its level"""
+        row = self._rows.get(name)
+        if row is None:
+            if self._size == len(self.level):
+                self._alloc(max(16, self._size * 2))
+            row = self._size
+            self._size += 1
+            self._rows[name] = row
+            self.names.append(name)
+            self.trend.append(trend)
+        self.normal[row] = normal
+        self.flood_stage[row] = flood_stage
+        self.trend[row] = trend
+        self.record(name, level, timestamp)
+        return row
+
+    def row(self, name: str) -> int:
+        return self._rows[name]
+
+    def record(self, name: str, level: float, timestamp: float = None, trend: str = None) -> int:
+        """Append a reading to a gauge's ring buffer and make it the current level"""
+        row = self._rows[name]
+        ts = time.time() if timestamp is None else timestamp
+        slot = self.head[row]
+        if self.count[row] == 0:
+            self.anchor[row] = ts
+        elif self.count[row] == self.history:
+            self.sums[row] -= _terms(self.reading_times[row, slot] - self.anchor[row], self.readings[row, slot])
+        self.sums[row] += _terms(ts - self.anchor[row], level)
+        self.readings[row, slot] = level
+        self.reading_times[row, slot] = ts
+        self.head[row] = (slot + 1) % self.history
+        self.count[row] = min(self.count[row] + 1, self.history)
+        self.level[row] = level
+        self.updated[row] = ts
+        if trend is not None:
+            self.trend[row] = trend
+        self.since_rebuild[row] += 1
+        if self.since_rebuild[row] >= self.history:
+            self._rebuild_sums(np.array([row]))
+        return row
+
+    def record_many(self, rows, levels, timestamps=None):
+        """Vectorized append of one reading for each of several distinct rows"""
+        rows = np.asarray(rows, dtype=np.int64)
+        levels = np.asarray(levels, dtype=np.float64)
+        ts = np.full(len(rows), time.time()) if timestamps is None else np.asarray(timestamps, dtype=np.float64)
+        slots = self.head[rows]
+        first = self.count[rows] == 0
+        self.anchor[rows[first]] = ts[first]
+        full = self.count[rows] == self.history
+        old = rows[full], slots[full]
+        self.sums[rows[full]] -= _terms(self.reading_times[old] - self.anchor[rows[full]], self.readings[old])
+        self.sums[rows] += _terms(ts - self.anchor[rows], levels)
+        self.readings[rows, slots] = levels
+        self.reading_times[rows, slots] = ts
+        self.head[rows] = (slots + 1) % self.history
+        self.count[rows] = np.minimum(self.count[rows] + 1, self.history)
+        self.level[rows] = levels
+        self.updated[rows] = ts
+        self.since_rebuild[rows] += 1
+        stale = rows[self.since_rebuild[rows] >= self.history]
+        if len(stale):
+            self._rebuild_sums(stale)
+
+    def _rebuild_sums(self, rows: np.ndarray):
+        """Recompute rows' regression sums from their buffers, anchored at the oldest reading"""
+        times = self.reading_times[rows]
+        self.anchor[rows] = np.nanmin(times, axis=1)
+        terms = _terms(times - self.anchor[rows][:, None], self.readings[rows])
+        self.sums[rows] = np.nansum(terms, axis=1)
+        self.since_rebuild[rows] = 0
+
+    def recent(self, name: str) -> list:
+        """(timestamp, level) readings for a gauge, oldest first"""
+        row = self._rows[name]
+        n = self.count[row]
+        order = (np.arange(self.head[row] - n, self.head[row])) % self.history
+        return list(zip(self.reading_times[row, order].tolist(), self.readings[row, order].tolist()))
+
+    def percent_to_flood(self, rows=None) -> np.ndarray:
+        """Percent of the way from normal level to flood stage"""
+        sl = slice(0, self._size) if rows is None else rows
+        span = self.flood_stage[sl] - self.normal[sl]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (self.level[sl] - self.normal[sl]) / span * 100.0
+
+    def classify(self, rows=None):
+        """Vectorized (percent, status_code) for all gauges or the given rows"""
+        pct = self.percent_to_flood(rows)
+        codes = np.where(pct >= CRITICAL_PCT, CRITICAL, np.where(pct >= WARNING_PCT, WARNING, WATCH))
+        return pct, codes
+
+    def forecast(self, rows=None, z: float = FORECAST_Z):
+        """Vectorized time to flood stage from each gauge's windowed rate of rise.
+
+        Returns (rate, hours, earliest, latest): rate in ft/hour; hours from the
+        latest reading until the current level reaches flood stage at that rate;
+        earliest/latest bound it using the rate's standard error times z. Gauges
+        at or above flood stage get 0; gauges that are not rising, or have
+        fewer than MIN_FORECAST_READINGS readings, get NaN. latest is inf when
+        the band includes a flat or falling level.
+        """
+        sl = slice(0, self._size) if rows is None else rows
+        n, st, sy, stt, sty, syy = (self.count[sl].astype(np.float64), *self.sums[sl].T)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sxx = stt - st * st / n
+            sxy = sty - st * sy / n
+            syy = syy - sy * sy / n
+            slope = sxy / sxx
+            residual = np.maximum(syy - slope * sxy, 0.0) / (n - 2)
+            margin = z * np.sqrt(residual / sxx)
+            remaining = self.flood_stage[sl] - self.level[sl]
+            usable = (n >= MIN_FORECAST_READINGS) & (sxx > 0)
+            rising = usable & (slope > 0)
+            hours = np.where(rising, remaining / slope, np.nan) / 3600.0
+            earliest = np.where(rising, remaining / (slope + margin), np.nan) / 3600.0
+            latest = np.where(rising, np.where(slope > margin, remaining / (slope - margin), np.inf),
+                              np.nan) / 3600.0
+        at_stage = remaining <= 0
+        for a in (hours, earliest, latest):
+            a[at_stage] = 0.0
+        return np.where(usable, slope * 3600.0, np.nan), hours, earliest, latest
+
+
+def _terms(t, y):
+    """Regression terms (t, y, t^2, ty, y^2) on the last axis; n is the gauge's count"""
+    t = np.asarray(t, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    return np.stack([t, y, t * t, t * y, y * y], axis=-1)
@@ -0,0 +1,190 @@
+"""
+Shelter Reachability - Crisis Response MCP Server
+
+Precomputed answer to "which shelters can this zone reach within N minutes".
+For every shelter, one bounded Dijkstra over reverse road edges records the
+travel time from each node within the largest band (60 minutes by default),
+and a node -> {shelter: minutes} map turns a zone or location query into a
+dictionary lookup.
+
+Each shelter also remembers the roads with an edge into its region. When a
+road changes status, only shelters whose region it touches can change, and a
+closure (or worse congestion) only matters where the road is on the
+shelter's shortest-path tree. Changes are read from the road network's
+status log in batches on the next query, so a burst of closures during a
+fast-rising flood costs one search per affected shelter, not one per closure.
+"""
+
+import threading
+
+# Travel-time bands (minutes) reported per zone and shelter
+DEFAULT_BANDS = (10, 20, 30, 60)
+
+
+def band_for(minutes, bands) -> int:
+    """Smallest band holding a travel time, or None beyond the last band"""
+    if minutes is None:
+        return None
+    return next((band for band in bands if minutes <= band), None)
+
+
+class _ShelterTree:
+    """One shelter's bounded search: travel time and first edge per node, roads touched"""
+
+    __slots__ = ("node", "dist", "next_edge", "roads")
+
+    def __init__(self, node: int):
+        self.node = node
+        self.dist = {}
+        self.next_edge = {}
+        self.roads = set()
+
+
+class ShelterReachability:
+    """Travel-time bands from every road-graph node to every shelter, kept current incrementally"""
+
+    def __init__(self, network, shelters: list, bands=DEFAULT_BANDS):
+        self.network = network
+        self.bands = tuple(sorted(bands))
+        self.horizon = self.bands[-1]
+        self._shelters = shelters
+        self._trees = {}
+        self._by_node = {}
+        self._by_road = {}
+        self._factors = {}
+        self._shelter_key = None
+        self._structure = None
+        self._cursor = None
+        # Tool calls for one city may run on several worker threads
+        self._lock = threading.RLock()
+        self.rebuilds = 0
+        self.recomputed = 0
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def refresh(self):
+        """Apply road status changes logged since the last refresh"""
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self):
+        network = self.network
+        key = tuple((s["name"], s.get("lat"), s.get("lon")) for s in self._shelters)
+        if network.structure_version != self._structure or key != self._shelter_key:
+            self._rebuild(key)
+            return
+        changed = network.status_changes(self._cursor)
+        if changed is None:
+            self._rebuild(key)
+            return
+        if not changed:
+            return
+        affected = set()
+        for road in set(changed):
+            old = self._factors.get(road, 1.0)
+            new = self._factors[road] = network.road_factor(road)
+            if old == new:
+                continue
+            edges = network.road_edges(road)
+            for name in self._by_road.get(road, ()):
+                tree = self._trees[name]
+                # Slower travel only matters on the tree; faster travel anywhere it leads in
+                if new > old and not any(tree.next_edge.get(u) == e for u, _, e in edges):
+                    continue
+                affected.add(name)
+        for name in affected:
+            self._compute(name, self._trees[name].node)
+        self.recomputed += len(affected)
+        self._cursor = network.status_cursor
+
+    def _rebuild(self, shelter_key):
+        network = self.network
+        self._trees.clear()
+        self._by_node.clear()
+        self._by_road.clear()
+        self._factors = {road: network.road_factor(road) for road in network.roads()}
+        for shelter in self._shelters:
+            node = _node_for(network, shelter)
+            if node is not None:
+                self._compute(shelter["name"], node)
+        self._shelter_key = shelter_key
+        self._structure = network.structure_version
+        self._cursor = network.status_cursor
+        self.rebuilds += 1
+
+    def _compute(self, name: str, node: int):
+        old = self._trees.get(name)
+        if old is not None:
+            for n in old.dist:
+                self._by_node[n].pop(name, None)
+            for road in old.roads:
+                self._by_road[road].discard(name)
+        tree = _ShelterTree(node)
+        tree.dist, tree.next_edge, tree.roads = self.network.search_to(node, self.horizon)
+        for n, minutes in tree.dist.items():
+            self._by_node.setdefault(n, {})[name] = minutes
+        for road in tree.roads:
+            self._by_road.setdefault(road, set()).add(name)
+        self._trees[name] = tree
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def shelters_within(self, node: int, minutes: float = None, open_shelters=None) -> list:
+        """[(minutes, shelter)] reachable from a node within minutes (default: horizon), closest first"""
+        limit = self.horizon if minutes is None else minutes
+        with self._lock:
+            self._refresh()
+            found = self._by_node.get(node, {})
+            return sorted((m, name) for name, m in found.items()
+                          if m <= limit and (open_shelters is None or name in open_shelters))
+
+    def nearest(self, node: int, open_shelters=None):
+        """(minutes, shelter) for the closest shelter within the horizon, or None"""
+        found = self.shelters_within(node, open_shelters=open_shelters)
+        return found[0] if found else None
+
+    def coverage(self, shelter: str, places: dict) -> dict:
+        """{band: [place]} for the named places (name -> node) a shelter serves within each band"""
+        result = {band: [] for band in self.bands}
+        with self._lock:
+            self._refresh()
+            tree = self._trees.get(shelter)
+            if tree is None:
+                return result
+            for place, node in places.items():
+                band = band_for(tree.dist.get(node), self.bands)
+                if band is not None:
+                    result[band].append(place)
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "shelters": len(self._trees),
+            "nodes_covered": sum(1 for found in self._by_node.values() if found),
+            "rebuilds": self.rebuilds,
+            "recomputed": self.recomputed,
+        }
+
+
+def _node_for(network, place: dict, name: str = None):
+    """Graph node for a named place, else the node nearest its coordinates"""
+    node = network.node_id(name or place["name"])
+    if node is not None:
+        return node
+    if place.get("lat") is None or place.get("lon") is None:
+        return None
+    return network.nearest_node(place["lat"], place["lon"])
+
+
+def locate_node(network, name: str, place: dict = None):
+    """Graph node for a zone or location name, using its centroid when it is not a node"""
+    node = network.node_id(name)
+    if node is None and place is not None:
+        node = _node_for(network, place, name)
+    if node is None:
+        node = network.resolve(name)
+    return node
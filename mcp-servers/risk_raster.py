@@ -0,0 +1,224 @@
+"""
+Flood-Risk Raster - Crisis Response MCP Server
+
+Scores a gridded weather field cell by cell with the same thresholds as
+score_flood_risk. Each city's grid lives in its own directory:
+
+    {CRISIS_WEATHER_GRID_DIR}/Boston/grid.json        {"lat0", "lon0", "cell_deg"}
+    {CRISIS_WEATHER_GRID_DIR}/Boston/humidity.npy     (rows, cols) per field:
+                                     pressure.npy     humidity, pressure,
+                                     rainfall_1h.npy  rainfall_1h, rainfall_3h
+                                     rainfall_3h.npy
+
+Row 0 is the southernmost band of cells, column 0 the westernmost; (lat0,
+lon0) is the south-west corner of cell (0, 0). Missing readings are NaN and
+score 0.
+
+Inputs are memory-mapped and scored in bands of TILE_ROWS rows, so a grid
+with millions of cells never has to fit in memory. Scores go to risk.npy
+(int8) next to the inputs and are rebuilt only when an input changes.
+"""
+
+import json
+import math
+import os
+
+import numpy as np
+
+from spatial_index import KM_PER_DEGREE_LAT
+
+FIELDS = ("humidity", "pressure", "rainfall_1h", "rainfall_3h")
+
+RISK_LEVELS = np.array(["LOW", "MEDIUM", "HIGH", "EXTREME"])
+# Minimum score for MEDIUM, HIGH and EXTREME
+LEVEL_SCORES = np.array([3, 5, 7])
+
+# Rows scored per tile
+TILE_ROWS = 512
+
+META_FILE = "grid.json"
+RISK_FILE = "risk.npy"
+SUMMARY_FILE = "risk.json"
+
+
+def score_cells(humidity, pressure, rainfall_1h) -> np.ndarray:
+    """Vectorized score_flood_risk: int8 score per cell"""
+    score = np.where(humidity > 85, 3, 0).astype(np.int8)
+    score += np.where(pressure < 1000, 3, 0).astype(np.int8)
+    score += np.where(rainfall_1h > 2, 4, np.where(rainfall_1h > 1, 3, 0)).astype(np.int8)
+    return score
+
+
+def risk_level_codes(scores) -> np.ndarray:
+    """Index into RISK_LEVELS for each score"""
+    return np.searchsorted(LEVEL_SCORES, scores, side="right")
+
+
+def write_grid(directory: str, lat0: float, lon0: float, cell_deg: float, **fields):
+    """Write a weather grid; fields are equally shaped 2-D arrays named as in FIELDS"""
+    os.makedirs(directory, exist_ok=True)
+    shape = None
+    for name in FIELDS:
+        array = np.asarray(fields[name], dtype=np.float32)
+        if shape is not None and array.shape != shape:
+            raise ValueError(f"{name} has shape {array.shape}, expected {shape}")
+        shape = array.shape
+        np.save(os.path.join(directory, name + ".npy"), array)
+    with open(os.path.join(directory, META_FILE), "w") as f:
+        json.dump({"lat0": lat0, "lon0": lon0, "cell_deg": cell_deg}, f)
+
+
+class RiskRaster:
+    """Memory-mapped risk scores for one city's weather grid"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(self._path(META_FILE)) as f:
+            meta = json.load(f)
+        self.lat0 = meta["lat0"]
+        self.lon0 = meta["lon0"]
+        self.cell_deg = meta["cell_deg"]
+        self.fields = {}
+        self.risk = None
+        self.summary = None
+        self._built_from = None
+        self.refresh()
+
+    @classmethod
+    def exists(cls, directory: str) -> bool:
+        return os.path.exists(os.path.join(directory, META_FILE))
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _input_stamp(self) -> tuple:
+        return tuple(os.stat(self._path(n + ".npy")).st_mtime_ns for n in FIELDS)
+
+    @property
+    def shape(self) -> tuple:
+        return self.risk.shape
+
+    @property
+    def version(self) -> tuple:
+        """Input modification times the current scores were built from"""
+        return self._built_from
+
+    def refresh(self) -> bool:
+        """Re-score the grid if any input changed since the last build"""
+        stamp = self._input_stamp()
+        if stamp == self._built_from:
+            return False
+        self.fields = {n: np.load(self._path(n + ".npy"), mmap_mode="r") for n in FIELDS}
+        summary = None
+        if os.path.exists(self._path(SUMMARY_FILE)):
+            with open(self._path(SUMMARY_FILE)) as f:
+                summary = json.load(f)
+        if (summary is None or tuple(summary["inputs"]) != stamp
+                or not os.path.exists(self._path(RISK_FILE))):
+            summary = self._build(stamp)
+        self.risk = np.load(self._path(RISK_FILE), mmap_mode="r")
+        self.summary = summary
+        self._built_from = stamp
+        return True
+
+    def _build(self, stamp: tuple) -> dict:
+        shape = self.fields["humidity"].shape
+        tmp = self._path(RISK_FILE + ".tmp")
+        out = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.int8, shape=shape)
+        counts = np.zeros(len(RISK_LEVELS), dtype=np.int64)
+        for r0 in range(0, shape[0], TILE_ROWS):
+            band = slice(r0, r0 + TILE_ROWS)
+            scores = score_cells(self.fields["humidity"][band], self.fields["pressure"][band],
+                                 self.fields["rainfall_1h"][band])
+            out[band] = scores
+            counts += np.bincount(risk_level_codes(scores).ravel(), minlength=len(RISK_LEVELS))
+        out.flush()
+        del out
+        os.replace(tmp, self._path(RISK_FILE))
+        summary = {"inputs": list(stamp), "level_cells": counts.tolist()}
+        with open(self._path(SUMMARY_FILE), "w") as f:
+            json.dump(summary, f)
+        return summary
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def cell_center(self, row: int, col: int) -> tuple:
+        return (self.lat0 + (row + 0.5) * self.cell_deg,
+                self.lon0 + (col + 0.5) * self.cell_deg)
+
+    def _window(self, lat: float, lon: float, radius_km: float):
+        """Row/column slices and in-circle mask for cells around a point"""
+        rows, cols = self.shape
+        dlat = radius_km / KM_PER_DEGREE_LAT
+        km_per_deg_lon = KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 1e-6)
+        dlon = radius_km / km_per_deg_lon
+        r0 = max(int(math.floor((lat - dlat - self.lat0) / self.cell_deg)), 0)
+        r1 = min(int(math.floor((lat + dlat - self.lat0) / self.cell_deg)) + 1, rows)
+        c0 = max(int(math.floor((lon - dlon - self.lon0) / self.cell_deg)), 0)
+        c1 = min(int(math.floor((lon + dlon - self.lon0) / self.cell_deg)) + 1, cols)
+        if r0 >= r1 or c0 >= c1:
+            return None
+        dy = (self.lat0 + (np.arange(r0, r1) + 0.5) * self.cell_deg - lat) * KM_PER_DEGREE_LAT
+        dx = (self.lon0 + (np.arange(c0, c1) + 0.5) * self.cell_deg - lon) * km_per_deg_lon
+        mask = dy[:, None] ** 2 + dx[None, :] ** 2 <= radius_km ** 2
+        return slice(r0, r1), slice(c0, c1), mask
+
+    def zone_summary(self, lat: float, lon: float, radius_km: float):
+        """Aggregate scores of the cells within radius_km of a point, or None if none"""
+        window = self._window(lat, lon, radius_km)
+        if window is None:
+            return None
+        rows, cols, mask = window
+        scores = np.asarray(self.risk[rows, cols])[mask]
+        if not scores.size:
+            return None
+        rain = np.asarray(self.fields["rainfall_1h"][rows, cols])[mask]
+        rain_3h = np.asarray(self.fields["rainfall_3h"][rows, cols])[mask]
+        counts = np.bincount(risk_level_codes(scores), minlength=len(RISK_LEVELS))
+        return {
+            "cells": int(scores.size),
+            "mean_score": float(scores.mean()),
+            "max_score": int(scores.max()),
+            "level": str(RISK_LEVELS[risk_level_codes(scores.max())]),
+            "level_cells": dict(zip(RISK_LEVELS.tolist(), counts.tolist())),
+            "max_rainfall_1h": float(np.nanmax(rain)) if np.isfinite(rain).any() else None,
+            "max_rainfall_3h": float(np.nanmax(rain_3h)) if np.isfinite(rain_3h).any() else None,
+        }
+
+    def hot_cells(self, limit: int, min_score: int = LEVEL_SCORES[1]) -> list:
+        """Highest-scoring cells (ties broken by 1h rainfall), scanned tile by tile.
+
+        Returns [{"row", "col", "lat", "lon", "score", "rainfall_1h"}]; rainfall_1h is None
+        where the cell has no reading.
+        """
+        best_keys = np.empty(0)
+        best_cells = np.empty(0, dtype=np.int64)
+        cols = self.shape[1]
+        for r0 in range(0, self.shape[0], TILE_ROWS):
+            band = slice(r0, r0 + TILE_ROWS)
+            scores = np.asarray(self.risk[band]).ravel()
+            hits = np.flatnonzero(scores >= min_score)
+            if not hits.size:
+                continue
+            rain = np.nan_to_num(np.asarray(self.fields["rainfall_1h"][band]).ravel()[hits], nan=0.0)
+            keys = np.concatenate([best_keys, scores[hits] * 1e6 + np.clip(rain, 0, 1e5)])
+            cells = np.concatenate([best_cells, hits + r0 * cols])
+            if len(keys) > limit:
+                keep = np.argpartition(-keys, limit)[:limit]
+                keys, cells = keys[keep], cells[keep]
+            best_keys, best_cells = keys, cells
+        order = np.argsort(-best_keys, kind="stable")
+        result = []
+        for cell in best_cells[order].tolist():
+            row, col = divmod(cell, cols)
+            lat, lon = self.cell_center(row, col)
+            rain = float(self.fields["rainfall_1h"][row, col])
+            result.append({
+                "row": row, "col": col, "lat": lat, "lon": lon,
+                "score": int(self.risk[row, col]),
+                # Unset cells hold NaN, which is not valid JSON
+                "rainfall_1h": rain if math.isfinite(rain) else None,
+            })
+        return result
@@ -0,0 +1,420 @@
+"""
+Road Network Graph - Crisis Response MCP Server
+
+Per-city road graph used by generate_evacuation_route. Nodes are intersections
+and named places, edges are directed road segments with a base travel time that
+is scaled by the road's live congestion. Flooded roads are treated as removed.
+
+Queries run against cached search trees: one multi-source Dijkstra from the set
+of candidate shelters answers "fastest way to any shelter" for every node in the
+city, so individual route requests only walk parent pointers.
+
+Road status changes patch the affected edge weights in place and are logged,
+so indexes built on the graph (see reachability.py) can recompute only what a
+closure or reopening touches.
+"""
+
+import heapq
+import math
+from collections import deque
+from dataclasses import dataclass, field
+
+from spatial_index import GridIndex, haversine_km
+
+# Travel time multiplier per congestion label reported in ROAD_STATUS
+CONGESTION_FACTORS = {
+    "Low": 1.0,
+    "Moderate": 1.5,
+    "High": 2.5,
+    "Severe": 4.0,
+}
+
+# Number of cached shelter search trees kept per network
+TREE_CACHE_SIZE = 8
+
+# Road status changes kept for incremental consumers; older cursors rebuild
+STATUS_LOG_SIZE = 4096
+
+
+@dataclass
+class Route:
+    """A path through the road network"""
+    nodes: list
+    roads: list
+    minutes: float
+    distance_km: float
+    destination: str = ""
+    legs: list = field(default_factory=list)
+
+
+class RoadNetwork:
+    """Directed, congestion-aware road graph for a single city"""
+
+    def __init__(self, city: str):
+        self.city = city
+        self.version = 0
+        self._names = []
+        self._ids = {}
+        self._lookup = {}
+        self._lat = []
+        self._lon = []
+        # Adjacency lists of (neighbor, edge_id), forward and reverse
+        self._out = []
+        self._in = []
+        self._edge_from = []
+        self._edge_to = []
+        self._edge_road = []
+        self._edge_km = []
+        self._edge_minutes = []
+        self._road_edges = {}
+        self._road_state = {}
+        self._max_speed_kph = 1.0
+        self._weights = None
+        self._trees = {}
+        self._node_index = GridIndex()
+        # Bumped when nodes or edges are added; status changes are logged instead
+        self.structure_version = 0
+        self._status_log = deque(maxlen=STATUS_LOG_SIZE)
+        self._status_seq = 0
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    def add_node(self, name: str, lat: float, lon: float) -> int:
+        """Add a named node (intersection, district or facility)"""
+        if name in self._ids:
+            return self._ids[name]
+        node = len(self._names)
+        self._names.append(name)
+        self._ids[name] = node
+        self._lookup[name.lower()] = node
+        self._lat.append(lat)
+        self._lon.append(lon)
+        self._node_index.insert(node, lat, lon)
+        self._out.append([])
+        self._in.append([])
+        self.structure_version += 1
+        return node
+
+    def add_segment(self, a: str, b: str, road: str, length_km: float,
+                    speed_kph: float, two_way: bool = True):
+        """Add a road segment between two existing nodes"""
+        u, v = self._ids[a], self._ids[b]
+        self._add_edge(u, v, road, length_km, speed_kph)
+        if two_way:
+            self._add_edge(v, u, road, length_km, speed_kph)
+
+    def _add_edge(self, u: int, v: int, road: str, length_km: float, speed_kph: float):
+        edge = len(self._edge_from)
+        self._edge_from.append(u)
+        self._edge_to.append(v)
+        self._edge_road.append(road)
+        self._edge_km.append(length_km)
+        self._edge_minutes.append(length_km / speed_kph * 60)
+        self._out[u].append((v, edge))
+        self._in[v].append((u, edge))
+        self._road_edges.setdefault(road, []).append(edge)
+        self._road_state.setdefault(road, ("Clear", "Low"))
+        self._max_speed_kph = max(self._max_speed_kph, speed_kph)
+        self.structure_version += 1
+        self._invalidate()
+
+    @classmethod
+    def from_dict(cls, city: str, data: dict) -> "RoadNetwork":
+        """Build a network from {"nodes": {name: [lat, lon]}, "segments": [...]}"""
+        network = cls(city)
+        for name, (lat, lon) in data.get("nodes", {}).items():
+            network.add_node(name, lat, lon)
+        for seg in data.get("segments", []):
+            network.add_segment(
+                seg["from"], seg["to"], seg["road"], seg["km"], seg["kph"],
+                seg.get("two_way", True)
+            )
+        return network
+
+    # ------------------------------------------------------------------
+    # Live road status
+    # ------------------------------------------------------------------
+
+    def set_road_status(self, road: str, status: str, congestion: str = "Low") -> bool:
+        """Update a road's status; returns True if travel times changed"""
+        state = (status, congestion)
+        if road not in self._road_edges or self._road_state.get(road) == state:
+            return False
+        self._road_state[road] = state
+        if self._weights is not None:
+            factor = self.road_factor(road)
+            for edge in self._road_edges[road]:
+                self._weights[edge] = self._edge_minutes[edge] * factor
+        self.version += 1
+        self._trees.clear()
+        self._status_seq += 1
+        self._status_log.append((self._status_seq, road))
+        return True
+
+    def sync_status(self, road_status: dict) -> bool:
+        """Apply a {road: {"status", "congestion"}} mapping such as ROAD_STATUS"""
+        changed = False
+        for road, info in road_status.items():
+            changed |= self.set_road_status(road, info["status"], info.get("congestion", "Low"))
+        return changed
+
+    def road_is_open(self, road: str) -> bool:
+        return self._road_state.get(road, ("Clear",))[0] == "Clear"
+
+    def roads(self) -> list:
+        return list(self._road_state)
+
+    def road_factor(self, road: str) -> float:
+        """Travel time multiplier for a road (inf when flooded)"""
+        status, congestion = self._road_state.get(road, ("Clear", "Low"))
+        return math.inf if status != "Clear" else CONGESTION_FACTORS.get(congestion, 1.0)
+
+    @property
+    def status_cursor(self) -> int:
+        return self._status_seq
+
+    def status_changes(self, since: int):
+        """Roads whose status changed after cursor `since`, or None if the log no longer reaches back"""
+        if since == self._status_seq:
+            return []
+        if not self._status_log or self._status_log[0][0] > since + 1:
+            return None
+        return [road for seq, road in self._status_log if seq > since]
+
+    def road_edges(self, road: str) -> list:
+        """(from_node, to_node, edge_id) for each directed edge of a road"""
+        return [(self._edge_from[e], self._edge_to[e], e) for e in self._road_edges.get(road, ())]
+
+    def _invalidate(self):
+        self.version += 1
+        self._weights = None
+        self._trees.clear()
+
+    def _edge_weights(self) -> list:
+        """Current travel time per edge in minutes (inf for flooded roads)"""
+        if self._weights is None:
+            factors = {road: self.road_factor(road) for road in self._road_state}
+            self._weights = [
+                minutes * factors[road]
+                for minutes, road in zip(self._edge_minutes, self._edge_road)
+            ]
+        return self._weights
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._edge_from)
+
+    def node_id(self, name: str):
+        return self._ids.get(name)
+
+    def node_name(self, node: int) -> str:
+        return self._names[node]
+
+    def coords(self, node: int) -> tuple:
+        return self._lat[node], self._lon[node]
+
+    def nearest_node(self, lat: float, lon: float):
+        """Closest node by straight-line distance"""
+        found = self._node_index.nearest(lat, lon, k=1)
+        return found[0][1] if found else None
+
+    def resolve(self, location: str):
+        """Resolve a place name or "lat,lon" string to a node id"""
+        key = location.strip().lower()
+        if key in self._lookup:
+            return self._lookup[key]
+        parts = key.split(",")
+        if len(parts) == 2:
+            try:
+                return self.nearest_node(float(parts[0]), float(parts[1]))
+            except ValueError:
+                pass
+        # Fall back to a unique partial match ("seaport" -> "Seaport District")
+        matches = [node for name, node in self._lookup.items() if key and key in name]
+        return matches[0] if len(matches) == 1 else None
+
+    # ------------------------------------------------------------------
+    # Shortest paths
+    # ------------------------------------------------------------------
+
+    def _heuristic(self, node: int, target: int) -> float:
+        km = haversine_km(self._lat[node], self._lon[node], self._lat[target], self._lon[target])
+        return km / self._max_speed_kph * 60
+
+    def shortest_path(self, source: str, target: str):
+        """A* search between two named nodes; None if unreachable"""
+        src, dst = self._ids[source], self._ids[target]
+        weights = self._edge_weights()
+        out = self._out
+        best = {src: 0.0}
+        parent = {src: None}
+        frontier = [(self._heuristic(src, dst), 0.0, src)]
+        while frontier:
+            _, cost, node = heapq.heappop(frontier)
+            if node == dst:
+                return self._build_route(parent, dst, cost)
+            if cost > best[node]:
+                continue
+            for nxt, edge in out[node]:
+                new_cost = cost + weights[edge]
+                if new_cost < best.get(nxt, math.inf):
+                    best[nxt] = new_cost
+                    parent[nxt] = edge
+                    heapq.heappush(frontier, (new_cost + self._heuristic(nxt, dst), new_cost, nxt))
+        return None
+
+    def _target_tree(self, targets: frozenset):
+        """Multi-source Dijkstra over reverse edges from a set of target nodes.
+
+        Returns (minutes_to_nearest_target, next_edge) keyed by node id. The
+        result is cached until the road status or graph changes.
+        """
+        tree = self._trees.pop(targets, None)
+        if tree is None:
+            weights = self._edge_weights()
+            incoming = self._in
+            dist = {t: 0.0 for t in targets}
+            next_edge = {t: None for t in targets}
+            frontier = [(0.0, t) for t in targets]
+            heapq.heapify(frontier)
+            while frontier:
+                cost, node = heapq.heappop(frontier)
+                if cost > dist[node]:
+                    continue
+                for prev, edge in incoming[node]:
+                    new_cost = cost + weights[edge]
+                    if new_cost < dist.get(prev, math.inf):
+                        dist[prev] = new_cost
+                        next_edge[prev] = edge
+                        heapq.heappush(frontier, (new_cost, prev))
+            tree = (dist, next_edge)
+            if len(self._trees) >= TREE_CACHE_SIZE:
+                self._trees.pop(next(iter(self._trees)))
+        # Re-insert to keep most recently used trees at the end
+        self._trees[targets] = tree
+        return tree
+
+    def search_to(self, target: int, max_minutes: float):
+        """Dijkstra over reverse edges from one node, stopping at max_minutes.
+
+        Returns (minutes_to_target, next_edge, roads): per node within the
+        limit, its travel time and first edge toward the target, plus every
+        road with an edge into that region (the roads whose status can change
+        the result).
+        """
+        weights = self._edge_weights()
+        incoming = self._in
+        road_of = self._edge_road
+        dist = {target: 0.0}
+        next_edge = {target: None}
+        roads = set()
+        frontier = [(0.0, target)]
+        while frontier:
+            cost, node = heapq.heappop(frontier)
+            if cost > dist[node]:
+                continue
+            for prev, edge in incoming[node]:
+                roads.add(road_of[edge])
+                new_cost = cost + weights[edge]
+                if new_cost <= max_minutes and new_cost < dist.get(prev, math.inf):
+                    dist[prev] = new_cost
+                    next_edge[prev] = edge
+                    heapq.heappush(frontier, (new_cost, prev))
+        return dist, next_edge, roads
+
+    def route_to_nearest(self, source: str, targets):
+        """Fastest route from source to whichever target is closest in time"""
+        src = self._ids[source]
+        target_ids = frozenset(self._ids[t] for t in targets if t in self._ids)
+        if not target_ids:
+            return None
+        dist, next_edge = self._target_tree(target_ids)
+        if src not in dist:
+            return None
+        edges = []
+        node = src
+        while next_edge[node] is not None:
+            edge = next_edge[node]
+            edges.append(edge)
+            node = self._edge_to[edge]
+        return self._route_from_edges(src, edges, dist[src])
+
+    def travel_minutes(self, source: str, targets, k: int = None,
+                       max_minutes: float = math.inf) -> dict:
+        """Travel time from source to each reachable target (single search).
+
+        With k, the search stops at the k closest targets; targets further
+        than max_minutes are left out.
+        """
+        src = self._ids[source]
+        wanted = {self._ids[t]: t for t in targets if t in self._ids}
+        limit = len(wanted) if k is None else min(k, len(wanted))
+        weights = self._edge_weights()
+        out = self._out
+        dist = {src: 0.0}
+        found = {}
+        frontier = [(0.0, src)]
+        while frontier and len(found) < limit:
+            cost, node = heapq.heappop(frontier)
+            if cost > max_minutes:
+                break
+            if cost > dist[node]:
+                continue
+            if node in wanted:
+                found[wanted[node]] = cost
+            for nxt, edge in out[node]:
+                new_cost = cost + weights[edge]
+                if new_cost < dist.get(nxt, math.inf):
+                    dist[nxt] = new_cost
+                    heapq.heappush(frontier, (new_cost, nxt))
+        return found
+
+    def _build_route(self, parent: dict, dst: int, cost: float) -> Route:
+        edges = []
+        node = dst
+        while parent[node] is not None:
+            edge = parent[node]
+            edges.append(edge)
+            node = self._edge_from[edge]
+        edges.reverse()
+        return self._route_from_edges(node, edges, cost)
+
+    def _route_from_edges(self, src: int, edges: list, cost: float) -> Route:
+        nodes = [self._names[src]] + [self._names[self._edge_to[e]] for e in edges]
+        weights = self._edge_weights()
+        # Collapse consecutive segments of the same road into one leg
+        legs = []
+        for edge in edges:
+            road = self._edge_road[edge]
+            if legs and legs[-1]["road"] == road:
+                legs[-1]["to"] = self._names[self._edge_to[edge]]
+                legs[-1]["km"] += self._edge_km[edge]
+                legs[-1]["minutes"] += weights[edge]
+            else:
+                legs.append({
+                    "road": road,
+                    "from": self._names[self._edge_from[edge]],
+                    "to": self._names[self._edge_to[edge]],
+                    "km": self._edge_km[edge],
+                    "minutes": weights[edge],
+                })
+        return Route(
+            nodes=nodes,
+            roads=[leg["road"] for leg in legs],
+            minutes=cost,
+            distance_km=sum(self._edge_km[e] for e in edges),
+            destination=nodes[-1],
+            legs=legs,
+        )
@@ -0,0 +1,123 @@
+"""
+Sensor Feed Ingestion - Crisis Response MCP Server
+
+Reads newline-delimited JSON sensor updates from a file, named pipe or local
+socket and hands each parsed update to a callback as it arrives.
+
+Source formats:
+    /path/to/feed.ndjson      file or FIFO (followed like `tail -f`)
+    unix:/tmp/crisis.sock     Unix domain socket server, one or more writers
+    tcp:127.0.0.1:7100        TCP socket server on a local address
+
+Update records (one JSON object per line):
+    {"type": "gauge", "city": "Boston", "name": "Charles River", "level": 9.1, "ts": 1730000000}
+    {"type": "road", "city": "Boston", "name": "Storrow Drive", "status": "Clear", "congestion": "High"}
+    {"type": "weather", "city": "Boston", "humidity": 92, "rainfall_1h": 2.4}
+    {"type": "shelter", "city": "Boston", "name": "West End Community Center", "current": 290}
+"""
+
+import asyncio
+import json
+import logging
+import os
+import stat
+
+logger = logging.getLogger(__name__)
+
+UPDATE_TYPES = {"gauge", "road", "weather", "shelter"}
+
+# Seconds between checks for new lines once a regular file hits EOF
+POLL_INTERVAL = 0.5
+
+
+def parse_update(line: str):
+    """Parse one feed line; returns the update dict or None if malformed"""
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        update = json.loads(line)
+    except json.JSONDecodeError:
+        logger.warning("Skipping malformed feed line: %.80s", line)
+        return None
+    if not isinstance(update, dict) or update.get("type") not in UPDATE_TYPES or "city" not in update:
+        logger.warning("Skipping unrecognized feed update: %.80s", line)
+        return None
+    return update
+
+
+async def _dispatch(handle, update: dict):
+    """Apply one update; a bad record must not stop the feed"""
+    try:
+        await handle(update)
+    except Exception:
+        logger.exception("Failed to apply feed update: %s", update)
+
+
+async def follow_file(path: str, handle, poll_interval: float = POLL_INTERVAL):
+    """Follow a file or FIFO, calling `await handle(update)` for every line"""
+    loop = asyncio.get_running_loop()
+    is_fifo = os.path.exists(path) and stat.S_ISFIFO(os.stat(path).st_mode)
+    while True:
+        # Opening and reading a FIFO blocks until a writer shows up, so both
+        # happen off the event loop
+        f = await loop.run_in_executor(None, open, path, "r")
+        partial = ""
+        try:
+            while True:
+                line = await loop.run_in_executor(None, f.readline)
+                if not line:
+                    if is_fifo:
+                        break  # writer closed; reopen and wait for the next one
+                    await asyncio.sleep(poll_interval)
+                    continue
+                if not line.endswith("\n"):
+                    # Caught the writer mid-line; wait for the rest
+                    partial += line
+                    await asyncio.sleep(poll_interval)
+                    continue
+                line, partial = partial + line, ""
+                update = parse_update(line)
+                if update is not None:
+                    await _dispatch(handle, update)
+        finally:
+            f.close()
+
+
+async def serve_socket(address: str, handle):
+    """Accept feed connections on a Unix or TCP socket"""
+    async def on_connect(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                update = parse_update(line.decode("utf-8", errors="replace"))
+                if update is not None:
+                    await _dispatch(handle, update)
+        finally:
+            writer.close()
+
+    if address.startswith("unix:"):
+        path = address[len("unix:"):]
+        if os.path.exists(path):
+            os.unlink(path)
+        server = await asyncio.start_unix_server(on_connect, path=path)
+    else:
+        host, _, port = address[len("tcp:"):].rpartition(":")
+        server = await asyncio.start_server(on_connect, host=host or "127.0.0.1", port=int(port))
+    async with server:
+        await server.serve_forever()
+
+
+async def run_feed(source: str, handle):
+    """Ingest updates from `source` until cancelled"""
+    logger.info("Starting sensor feed from %s", source)
+    while True:
+        try:
+            if source.startswith(("unix:", "tcp:")):
+                await serve_socket(source, handle)
+            else:
+                await follow_file(source, handle)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Sensor feed %s failed; retrying", source)
+            await asyncio.sleep(POLL_INTERVAL)
@@ -0,0 +1,280 @@
+"""
+Shelter Allocation - Crisis Response MCP Server
+
+Decides which shelter each evacuating zone's population goes to. No shelter
+receives more people than it has free spaces, and total travel time
+(person-minutes) is kept as low as possible.
+
+This is a transportation problem solved as min-cost flow with successive
+shortest paths. Zones are processed in priority order. Each zone's people
+are pushed along the cheapest residual path to a shelter with space; a path
+may move people already assigned elsewhere to make room. Node potentials keep
+reduced costs non-negative, so every search is a plain Dijkstra. Each search
+stops at the first shelter with space, so most pushes touch only a few arcs.
+When demand exceeds capacity, the zones processed last are left partly
+unassigned; zones with no shelter in reach at all are reported separately as
+unreachable.
+
+Arcs are sparse: each zone connects only to its ALLOCATION_CANDIDATES
+closest shelters by road travel time. Travel times change only with road
+status, so they are cached per road network version and reused when just
+the shelter capacities change.
+"""
+
+import heapq
+import math
+from dataclasses import dataclass, field
+
+from spatial_index import GridIndex
+
+# Shelters each zone may be assigned to (closest by travel time)
+ALLOCATION_CANDIDATES = 8
+
+# Shelters further than this are not considered for a zone
+MAX_TRAVEL_MINUTES = 180.0
+
+# Straight-line travel speed used when a city has no road graph
+FALLBACK_SPEED_KPH = 30.0
+
+# closed[] mark for sinks that can no longer reach a sink with space
+_DEAD = math.inf
+
+
+@dataclass
+class Allocation:
+    """Zone-to-shelter assignment"""
+    assignments: list = field(default_factory=list)   # {"zone", "shelter", "people", "minutes"}
+    unassigned: dict = field(default_factory=dict)    # zone -> people without a shelter
+    unreachable: dict = field(default_factory=dict)   # zone -> those with no shelter in reach
+    shelter_load: dict = field(default_factory=dict)  # shelter -> people assigned
+    person_minutes: float = 0.0
+
+    @property
+    def assigned(self) -> int:
+        return sum(self.shelter_load.values())
+
+
+def candidate_costs(network, zones: dict, shelters: list, k: int = ALLOCATION_CANDIDATES,
+                    max_minutes: float = MAX_TRAVEL_MINUTES) -> list:
+    """Per zone, [(shelter_index, minutes)] to its k closest reachable shelters.
+
+    zones maps zone name -> {"lat", "lon"}; with a road network, zones and
+    shelters that aren't graph nodes snap to the nearest node.
+    """
+    if network is None or len(network) == 0:
+        return _straight_line_costs(zones, shelters, k, max_minutes)
+    by_node = {}
+    for index, shelter in enumerate(shelters):
+        node = _node_for(network, shelter["name"], shelter)
+        if node is not None:
+            by_node.setdefault(node, []).append(index)
+    costs = []
+    for name, zone in zones.items():
+        source = _node_for(network, name, zone)
+        arcs = []
+        if source is not None:
+            times = network.travel_minutes(source, by_node, k=k, max_minutes=max_minutes)
+            for node, minutes in times.items():
+                arcs.extend((index, minutes) for index in by_node[node])
+        costs.append(arcs)
+    return costs
+
+
+def _node_for(network, name: str, place: dict):
+    if name in network:
+        return name
+    if place.get("lat") is None or place.get("lon") is None:
+        return None
+    node = network.nearest_node(place["lat"], place["lon"])
+    return network.node_name(node) if node is not None else None
+
+
+def _straight_line_costs(zones: dict, shelters: list, k: int, max_minutes: float) -> list:
+    index = GridIndex()
+    for i, shelter in enumerate(shelters):
+        if shelter.get("lat") is not None and shelter.get("lon") is not None:
+            index.insert(i, shelter["lat"], shelter["lon"], shelter)
+    max_km = max_minutes / 60 * FALLBACK_SPEED_KPH
+    costs = []
+    for zone in zones.values():
+        if zone.get("lat") is None or zone.get("lon") is None:
+            costs.append([])
+            continue
+        nearest = index.nearest(zone["lat"], zone["lon"], k=k, max_km=max_km)
+        costs.append([(i, km / FALLBACK_SPEED_KPH * 60) for km, i, _ in nearest])
+    return costs
+
+
+class TravelCostCache:
+    """Candidate arcs for the latest (road network version, zones, shelters)"""
+
+    def __init__(self):
+        self._key = None
+        self._costs = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, network, zones: dict, shelters: list) -> list:
+        key = (
+            network.version if network is not None else None,
+            tuple((name, z.get("lat"), z.get("lon")) for name, z in zones.items()),
+            tuple(s["name"] for s in shelters),
+        )
+        if key != self._key:
+            self.misses += 1
+            self._costs = candidate_costs(network, zones, shelters)
+            self._key = key
+        else:
+            self.hits += 1
+        return self._costs
+
+
+def solve_min_cost_flow(supplies: list, arcs: list, capacities: list):
+    """Assign integer supplies to sinks along arcs without exceeding capacities.
+
+    supplies[i] is zone i's population, arcs[i] its [(sink, cost)] list and
+    capacities[j] sink j's free space. Returns ({(i, j): people}, [unassigned
+    per zone]). Zones are served in list order when capacity runs short.
+
+    Searches run on a graph of sinks only: moving people of zone v from sink
+    j to sink j2 costs cost(v, j2) - cost(v, j), and moves[j] keeps the
+    cheapest such move to every other sink (with the zone that makes it).
+    Costs are static, so a row only changes when a zone starts or stops
+    using that sink.
+    """
+    sinks = len(capacities)
+    cost = [dict(zone_arcs) for zone_arcs in arcs]
+    flow = {}
+    # Zones with people assigned to each sink, and the cheapest moves out of it
+    users = [set() for _ in range(sinks)]
+    moves = [[] for _ in range(sinks)]
+    free = list(capacities)
+    potential = [0.0] * sinks
+    unassigned = [0] * len(supplies)
+
+    def refresh(j):
+        row = {}
+        for v in users[j]:
+            base = cost[v][j]
+            for j2, c in cost[v].items():
+                if j2 != j:
+                    delta = c - base
+                    best = row.get(j2)
+                    if best is None or delta < best[0]:
+                        row[j2] = (delta, v)
+        moves[j] = [(j2, delta, v) for j2, (delta, v) in row.items()]
+
+    def shift(v, j, people):
+        """Change zone v's people at sink j; returns True if v started or stopped using j"""
+        amount = flow.get((v, j), 0) + people
+        if amount:
+            flow[(v, j)] = amount
+        else:
+            del flow[(v, j)]
+        if amount and v not in users[j]:
+            users[j].add(v)
+            return True
+        if not amount:
+            users[j].discard(v)
+            return True
+        return False
+
+    inf = math.inf
+    heappush, heappop = heapq.heappush, heapq.heappop
+    # closed[j] == stamp marks sinks settled by the current search; _DEAD marks
+    # sinks from which no sink with space can be reached. Later pushes never
+    # reopen such a region, so searches skip it.
+    closed = [0] * sinks
+    stamp = 0
+
+    def search(source_cost):
+        """Dijkstra on reduced costs to the first sink with space; updates potentials"""
+        nonlocal stamp
+        stamp += 1
+        dist = [inf] * sinks
+        parent = {}
+        frontier = []
+        for j, c in source_cost.items():
+            d = c - potential[j]
+            if closed[j] != _DEAD and d < dist[j]:
+                dist[j] = d
+                parent[j] = None
+                frontier.append((d, j))
+        heapq.heapify(frontier)
+        settled = {}
+        while frontier:
+            d, u = heappop(frontier)
+            if closed[u] == stamp:
+                continue
+            closed[u] = stamp
+            settled[u] = d
+            if free[u] > 0:
+                # Potentials move by min(dist, D) - D, so only settled sinks change
+                for j, dj in settled.items():
+                    potential[j] += dj - d
+                return u, parent
+            base = d + potential[u]
+            for j2, delta, v in moves[u]:
+                # Settled sinks are final; rounding error must not re-open them
+                if closed[j2] >= stamp:
+                    continue
+                nd = base + delta - potential[j2]
+                if nd < dist[j2]:
+                    dist[j2] = nd
+                    parent[j2] = (u, v)
+                    heappush(frontier, (nd, j2))
+        for j in settled:
+            closed[j] = _DEAD
+        return None, None
+
+    for source, excess in enumerate(supplies):
+        source_cost = cost[source]
+        while excess > 0:
+            target, parent = search(source_cost)
+            if target is None:
+                unassigned[source] = excess
+                break
+
+            path = []
+            delta = min(excess, free[target])
+            node = target
+            while parent[node] is not None:
+                prev, v = parent[node]
+                path.append((prev, node, v))
+                delta = min(delta, flow[(v, prev)])
+                node = prev
+            changed = set()
+            if shift(source, node, delta):
+                changed.add(node)
+            for prev, nxt, v in path:
+                if shift(v, prev, -delta):
+                    changed.add(prev)
+                if shift(v, nxt, delta):
+                    changed.add(nxt)
+            for j in changed:
+                refresh(j)
+            free[target] -= delta
+            excess -= delta
+
+    return flow, unassigned
+
+
+def allocate_shelters(populations: dict, shelters: list, costs: list) -> Allocation:
+    """Allocation for {zone: people} (in priority order) given candidate_costs output"""
+    names = list(populations)
+    supplies = [max(int(populations[name]), 0) for name in names]
+    capacities = [max(s["capacity"] - s["current"], 0) for s in shelters]
+    flows, unassigned = solve_min_cost_flow(supplies, costs, capacities)
+
+    cost_of = {(i, j): minutes for i, arcs in enumerate(costs) for j, minutes in arcs}
+    allocation = Allocation()
+    for (i, j), people in sorted(flows.items()):
+        minutes = cost_of[(i, j)]
+        shelter = shelters[j]["name"]
+        allocation.assignments.append(
+            {"zone": names[i], "shelter": shelter, "people": people, "minutes": minutes})
+        allocation.shelter_load[shelter] = allocation.shelter_load.get(shelter, 0) + people
+        allocation.person_minutes += people * minutes
+    allocation.unassigned = {names[i]: n for i, n in enumerate(unassigned) if n > 0}
+    allocation.unreachable = {names[i]: n for i, n in enumerate(unassigned) if n > 0 and not costs[i]}
+    return allocation
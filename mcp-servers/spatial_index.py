@@ -0,0 +1,194 @@
+"""
+Spatial Index - Crisis Response MCP Server
+
+Uniform lat/lon grid for facility and zone lookups. Points are bucketed into
+fixed-size cells; k-nearest and radius queries scan cells in rings outward from
+the query point and stop as soon as no unvisited cell can hold a closer match.
+"""
+
+import heapq
+import math
+
+KM_PER_DEGREE_LAT = 111.32
+EARTH_RADIUS_KM = 6371.0088
+
+# Kilometers per degree of great-circle arc on the sphere haversine_km uses;
+# search bounds use this, as the larger KM_PER_DEGREE_LAT would overestimate
+# distances and prune cells that hold a match
+KM_PER_DEGREE = EARTH_RADIUS_KM * math.radians(1.0)
+
+# Default cell edge in degrees (~1 km north-south)
+DEFAULT_CELL_DEG = 0.01
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance between two points in kilometers"""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class GridIndex:
+    """Uniform grid of points keyed by id, each carrying an arbitrary item"""
+
+    def __init__(self, cell_deg: float = DEFAULT_CELL_DEG):
+        self.cell_deg = cell_deg
+        self._cells = {}
+        self._points = {}
+        # Bounding box of occupied cells; only grows, which keeps scans correct
+        self._bounds = None
+
+    def __len__(self) -> int:
+        return len(self._points)
+
+    def _cell(self, lat: float, lon: float) -> tuple:
+        return (math.floor(lat / self.cell_deg), math.floor(lon / self.cell_deg))
+
+    def insert(self, key, lat: float, lon: float, item=None):
+        """Add or move a point"""
+        if key in self._points:
+            self.remove(key)
+        cell = self._cell(lat, lon)
+        self._points[key] = (lat, lon, item, cell)
+        self._cells.setdefault(cell, []).append(key)
+        if self._bounds is None:
+            self._bounds = (cell, cell)
+        else:
+            (i0, j0), (i1, j1) = self._bounds
+            self._bounds = ((min(i0, cell[0]), min(j0, cell[1])),
+                            (max(i1, cell[0]), max(j1, cell[1])))
+
+    def remove(self, key):
+        lat, lon, item, cell = self._points.pop(key)
+        bucket = self._cells[cell]
+        bucket.remove(key)
+        if not bucket:
+            del self._cells[cell]
+
+    def get(self, key):
+        point = self._points.get(key)
+        return point[2] if point else None
+
+    def _ring(self, center: tuple, r: int):
+        """Cells at Chebyshev distance exactly r from center"""
+        ci, cj = center
+        if r == 0:
+            yield center
+            return
+        for dj in range(-r, r + 1):
+            yield (ci - r, cj + dj)
+            yield (ci + r, cj + dj)
+        for di in range(-r + 1, r):
+            yield (ci + di, cj - r)
+            yield (ci + di, cj + r)
+
+    def _ring_min_km(self, lat: float, r: int) -> float:
+        """Lower bound on distance from a point in the center cell to ring r"""
+        if r <= 1:
+            return 0.0
+        lon_scale = math.cos(math.radians(min(abs(lat) + r * self.cell_deg, 89.0)))
+        return (r - 1) * self.cell_deg * KM_PER_DEGREE * lon_scale
+
+    def _rings_to_cover(self, center: tuple) -> int:
+        """Ring radius that reaches every occupied cell"""
+        (i0, j0), (i1, j1) = self._bounds
+        ci, cj = center
+        return max(abs(ci - i0), abs(ci - i1), abs(cj - j0), abs(cj - j1))
+
+    def nearest(self, lat: float, lon: float, k: int = 1, predicate=None,
+                max_km: float = math.inf) -> list:
+        """k closest points as [(distance_km, key, item)], nearest first.
+
+        predicate(item) filters candidates (e.g. shelters with free capacity).
+        """
+        if not self._points or k <= 0:
+            return []
+        center = self._cell(lat, lon)
+        # Max-heap of the best k seen so far, stored as (-distance, key)
+        best = []
+        for r in range(self._rings_to_cover(center) + 1):
+            bound = self._ring_min_km(lat, r)
+            if bound > max_km or (len(best) == k and bound > -best[0][0]):
+                break
+            for cell in self._ring(center, r):
+                for key in self._cells.get(cell, ()):
+                    plat, plon, item, _ = self._points[key]
+                    if predicate is not None and not predicate(item):
+                        continue
+                    dist = haversine_km(lat, lon, plat, plon)
+                    if dist > max_km:
+                        continue
+                    if len(best) < k:
+                        heapq.heappush(best, (-dist, key))
+                    elif dist < -best[0][0]:
+                        heapq.heapreplace(best, (-dist, key))
+        return [(-d, key, self._points[key][2]) for d, key in sorted(best, reverse=True)]
+
+    def within(self, lat: float, lon: float, radius_km: float, predicate=None) -> list:
+        """All points within radius_km as [(distance_km, key, item)], nearest first"""
+        if self._bounds is None:
+            return []
+        dlat = radius_km / KM_PER_DEGREE
+        dlon = radius_km / (KM_PER_DEGREE * math.cos(math.radians(min(abs(lat) + dlat, 89.0))))
+        (b0, c0), (b1, c1) = self._bounds
+        i0, j0 = self._cell(lat - dlat, lon - dlon)
+        i1, j1 = self._cell(lat + dlat, lon + dlon)
+        i0, j0, i1, j1 = max(i0, b0), max(j0, c0), min(i1, b1), min(j1, c1)
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > len(self._cells):
+            # Sparse grid: cheaper to walk occupied cells than the whole box
+            cells = [c for c in self._cells if i0 <= c[0] <= i1 and j0 <= c[1] <= j1]
+        else:
+            cells = [(i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)]
+        found = []
+        for cell in cells:
+            for key in self._cells.get(cell, ()):
+                plat, plon, item, _ = self._points[key]
+                if predicate is not None and not predicate(item):
+                    continue
+                dist = haversine_km(lat, lon, plat, plon)
+                if dist <= radius_km:
+                    found.append((dist, key, item))
+        found.sort(key=lambda f: f[0])
+        return found
+
+
+class FacilityIndex:
+    """Grid indexes over one city's shelters, hospitals and risk zones"""
+
+    def __init__(self, shelters: list, hospitals: list, zones: dict,
+                 cell_deg: float = DEFAULT_CELL_DEG):
+        self.shelters = GridIndex(cell_deg)
+        self.hospitals = GridIndex(cell_deg)
+        self.zones = GridIndex(cell_deg)
+        # Facilities without coordinates can't be placed and are left out
+        for shelter in shelters:
+            if shelter.get("lat") is not None and shelter.get("lon") is not None:
+                self.shelters.insert(shelter["name"], shelter["lat"], shelter["lon"], shelter)
+        for hospital in hospitals:
+            if hospital.get("lat") is not None and hospital.get("lon") is not None:
+                self.hospitals.insert(hospital["name"], hospital["lat"], hospital["lon"], hospital)
+        for name, zone in zones.items():
+            self.zones.insert(name, zone["lat"], zone["lon"], zone)
+
+    def nearest_shelters(self, lat: float, lon: float, k: int = 3, min_available: int = 1,
+                         max_km: float = math.inf) -> list:
+        """Closest shelters with at least min_available free spaces"""
+        return self.shelters.nearest(
+            lat, lon, k,
+            predicate=lambda s: s["capacity"] - s["current"] >= min_available,
+            max_km=max_km,
+        )
+
+    def nearest_hospitals(self, lat: float, lon: float, k: int = 3, min_beds: int = 1,
+                          max_km: float = math.inf) -> list:
+        """Closest hospitals with at least min_beds available beds"""
+        return self.hospitals.nearest(
+            lat, lon, k,
+            predicate=lambda h: h["available_beds"] >= min_beds,
+            max_km=max_km,
+        )
+
+    def zones_within(self, lat: float, lon: float, radius_km: float) -> list:
+        return self.zones.within(lat, lon, radius_km)
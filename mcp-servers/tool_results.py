@@ -0,0 +1,337 @@
+"""
+Tool Results - Crisis Response MCP Server
+
+Tools build a structured payload (plain dicts of counts, levels, capacities
+and routes) and return it as JSON. The human-readable report is rendered from
+the payload only when a caller asks for format="text".
+
+ResultCache keeps each payload serialized, keyed by tool and arguments and
+tagged with the version of the inputs it was built from. Repeat calls against
+unchanged city data return the stored JSON string without rebuilding.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+
+# Payloads kept across all tools and cities
+DEFAULT_RESULT_CACHE_SIZE = 1024
+
+
+class CachedResult:
+    """A payload with its JSON and (once requested) text forms"""
+
+    __slots__ = ("version", "payload", "json", "_text")
+
+    def __init__(self, version, payload: dict):
+        self.version = version
+        self.payload = payload
+        self.json = json.dumps(payload)
+        self._text = None
+
+    def text(self, render) -> str:
+        if self._text is None:
+            self._text = render(self.payload)
+        return self._text
+
+
+class ResultCache:
+    """LRU of CachedResult keyed by (tool, city, *arguments)"""
+
+    def __init__(self, max_entries: int = DEFAULT_RESULT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple, version, build) -> CachedResult:
+        """Cached result for key if built from `version`, else build() and store it.
+
+        A version of None means the inputs can't be versioned; nothing is cached.
+        """
+        if version is None:
+            return CachedResult(None, build())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.version == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+        entry = CachedResult(version, build())
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def served(result: CachedResult, render, as_text: bool, generated: str = None) -> str:
+    """JSON or text form of a cached result, stamped with the time it is served.
+
+    The stamp stays out of the cached payload, so repeat calls against
+    unchanged data don't report the time the result was first built.
+    """
+    stamp = generated is not None and "error" not in result.payload
+    if as_text:
+        text = result.text(render)
+        return f"{text}\nTime: {generated}" if stamp else text
+    if not stamp:
+        return result.json
+    return f'{result.json[:-1]}, "generated": {json.dumps(generated)}}}'
+
+
+def batch_json(results: dict, generated: str = None) -> str:
+    """{city: payload} JSON assembled from already-serialized payloads"""
+    return "{" + ", ".join(f"{json.dumps(city)}: {served(r, None, False, generated)}"
+                           for city, r in results.items()) + "}"
+
+
+# =============================================================================
+# TEXT RENDERING
+# =============================================================================
+
+def render_evacuation_route(p: dict) -> str:
+    if "error" in p:
+        return p["error"]
+    result = f"""EVACUATION ROUTE GENERATED
+
+From: {p['from']}
+City: {p['city']}
+
+SAFE ROUTES (Real-time Road Status):
+"""
+    for i, road in enumerate(p["safe_roads"], 1):
+        result += f"\n{i}. {road['road']} - {road['congestion']} congestion"
+
+    result += f"\n\nAVOID (Flooded Roads): {', '.join(p['flooded_roads'])}"
+
+    route = p["route"]
+    if route:
+        result += f"\n\nRECOMMENDED ROUTE ({route['minutes']:.0f} min, {route['distance_km']:.1f} km):"
+        for i, leg in enumerate(route["legs"], 1):
+            result += f"\n{i}. {leg['road']}: {leg['from']} -> {leg['to']} ({leg['minutes']:.0f} min)"
+    elif p["fallback"] == "nearest_by_distance":
+        result += f"\n\nNo open road route from {p['from']} - nearest shelter by distance shown"
+    elif p["fallback"] == "least_occupied":
+        result += f"\n\nUnknown location {p['from']} - showing least-occupied shelter"
+
+    shelter = p["shelter"]
+    if shelter:
+        result += (f"\n\nNEAREST SHELTER: {shelter['name']}\nAddress: {shelter['address']}"
+                   f"\nAvailable Spaces: {shelter['available']}")
+
+    reach = p["reachability"]
+    if reach:
+        result += "\n\nSHELTER REACHABILITY: " + _reach_summary(reach)
+
+    if p["nearby_shelters"]:
+        result += "\n\nOTHER NEARBY SHELTERS:"
+        for s in p["nearby_shelters"]:
+            result += f"\n- {s['name']}: {s['available']} spaces, {s['distance_km']:.1f} km"
+    return result
+
+
+def _flood_eta(g: dict) -> str:
+    """Projected time to flood stage with its band, or "" without a forecast"""
+    f = g.get("flood_stage_forecast")
+    if not f:
+        return ""
+    if f["hours"] == 0:
+        return "at flood stage"
+    latest = f"{f['latest_hours']:.1f}" if f["latest_hours"] is not None else "?"
+    return (f"flood stage in {f['hours']:.1f} h ({f['earliest_hours']:.1f}-{latest} h, "
+            f"~{f['eta']}, rising {g['rate_per_hour']:.2f} ft/h)")
+
+
+def _render_outlook(outlook: list) -> str:
+    if not outlook:
+        return ""
+    result = f"\n\nFLOOD STAGE OUTLOOK (soonest first):"
+    for g in outlook:
+        result += f"\n  - {g['name']}: {g['level']} ft, {_flood_eta(g)}"
+    return result
+
+
+def _reach_summary(r: dict) -> str:
+    """Closest open shelter by road and open shelters per travel-time band"""
+    bands = ", ".join(f"{n} within {band} min" for band, n in r["shelters_within"].items())
+    if r["shelter"] is None:
+        return f"no open shelter within {list(r['shelters_within'])[-1]} min"
+    return f"{r['shelter']} in {r['minutes']:.0f} min ({bands})"
+
+
+def render_risk_zones(p: dict) -> str:
+    if "error" in p:
+        return p["error"]
+    result = f"""RISK ZONE MONITORING - {p['city']}
+Community Evacuation Support - Step 1
+
+WATER LEVELS (Real-time Feed):
+"""
+    result += "\n" + " | ".join(f"{label}: {n}" for label, n in p["gauge_counts"].items())
+    for g in p["gauges"]:
+        result += (f"\n{g['name']}: {g['level']} ft - {g['status']} "
+                   f"({g['percent']:.0f}% to flood stage, {g['trend']})")
+        eta = _flood_eta(g)
+        if eta:
+            result += f"\n  Forecast: {eta}"
+    hidden = p["gauges_total"] - len(p["gauges"])
+    if hidden > 0:
+        result += f"\n... and {hidden} more gauges"
+    result += _render_outlook(p["flood_stage_outlook"])
+
+    zones = p["risk_zones"]
+    result += f"\n\nRISK ZONES (Terrain Data):"
+    result += f"\nHIGH RISK: {', '.join(zones.get('high_risk', []))}"
+    result += f"\nMEDIUM RISK: {', '.join(zones.get('medium_risk', []))}"
+    result += f"\nLOW RISK: {', '.join(zones.get('low_risk', []))}"
+    return result
+
+
+def render_community_evacuation(p: dict) -> str:
+    if "error" in p:
+        return p["error"]
+    result = f"""COMMUNITY EVACUATION WORKFLOW - {p['city']}
+
+STEP 1: MONITOR RISK ZONES
+"""
+    for g in p["critical_gauges"]:
+        result += f"\nCRITICAL: {g['name']} at {g['level']} ft ({g['percent']:.0f}% to flood, {g['trend']})"
+        eta = _flood_eta(g)
+        if eta:
+            result += f"\n  Forecast: {eta}"
+    result += _render_outlook(p["flood_stage_outlook"])
+
+    high_risk = p["high_risk_zones"]
+    result += f"\n\nRisk Assessment: {len(high_risk)} HIGH RISK zones identified"
+    result += f"\nAffected Areas: {', '.join(high_risk)}"
+
+    result += f"\n\nSTEP 2: AUTOMATICALLY PLAN AND DISPATCH"
+
+    result += f"\n\nSafe Evacuation Routes (Geospatial Data + Real-time Status):"
+    for road in p["safe_roads"]:
+        result += f"\n  - {road['road']} ({road['congestion']} congestion)"
+
+    if p["zone_reachability"]:
+        result += f"\n\nZone Reachability (open shelters by road):"
+        for r in p["zone_reachability"]:
+            result += f"\n  - {r['zone']}: {_reach_summary(r)}"
+
+    result += f"\n\nDesignated Shelters:"
+    for shelter in p["shelters"]:
+        result += f"\n  - {shelter['name']}: {shelter['available']} spaces available"
+
+    allocation = p["allocation"]
+    if allocation["assignments"]:
+        result += f"\n\nShelter Assignments ({allocation['assigned']} people, "
+        result += f"avg {allocation['person_minutes'] / allocation['assigned']:.0f} min travel):"
+        for a in allocation["assignments"]:
+            result += f"\n  - {a['zone']} -> {a['shelter']}: {a['people']} people ({a['minutes']:.0f} min)"
+    for zone, people in allocation["unassigned"].items():
+        unreachable = allocation["unreachable"].get(zone, 0)
+        if unreachable:
+            result += f"\n  WARNING: {unreachable} people in {zone} have no shelter reachable by road"
+        if people > unreachable:
+            result += f"\n  WARNING: {people - unreachable} people in {zone} not placed: reachable shelters are full"
+
+    result += f"\n\nEVACUATION ALERT DISPATCHED:"
+    result += f"\n{'='*60}"
+    result += f"\nEMERGENCY EVACUATION ORDER"
+    result += f"\n\nAffected Areas: {', '.join(high_risk)}"
+    result += f"\nRecommended Routes: {', '.join(r['road'] for r in p['safe_roads'][:2])}"
+    result += f"\nShelter Locations: {', '.join(s['name'] for s in p['shelters'])}"
+    result += f"\nTotal Shelter Capacity: {p['total_capacity']} people"
+    result += f"\n{'='*60}"
+
+    result += f"\n\nWORKFLOW STATUS: COMPLETE"
+    return result
+
+
+def render_flood_risk(p: dict) -> str:
+    if "grid" in p:
+        return render_risk_raster(p)
+    if "error" in p:
+        return f"FLOOD RISK ASSESSMENT - {p['location']}\n\n{p['error']}"
+    c = p["conditions"]
+    warnings = p["warnings"]
+    return f"""FLOOD RISK ASSESSMENT - {p['location']}
+
+RISK LEVEL: {p['risk_level']}
+
+Current Conditions:
+- Humidity: {c['humidity']}%
+- Pressure: {c['pressure']} hPa
+- Rainfall (1h): {c['rainfall_1h']:.2f} inches
+- Weather: {c['weather']}
+
+Risk Score: {p['risk_score']}/10
+
+Warnings:
+{chr(10).join(warnings) if warnings else 'All conditions normal'}
+
+Recommendation: {p['recommendation']}
+"""
+
+
+def render_risk_raster(p: dict) -> str:
+    grid = p["grid"]
+    if grid is None:
+        return f"FLOOD RISK RASTER - {p['location']}\n\n{p['error']}"
+    result = f"""FLOOD RISK RASTER - {p['location']}
+
+Grid: {grid['rows']} x {grid['cols']} cells ({grid['cell_deg']} deg)
+"""
+    result += "\n" + " | ".join(f"{label}: {n}" for label, n in p["level_cells"].items())
+
+    if p["zones"]:
+        result += f"\n\nZONES (cells within {p['zone_radius_km']} km):"
+        for z in p["zones"]:
+            high = z["level_cells"]["HIGH"] + z["level_cells"]["EXTREME"]
+            result += (f"\n{z['zone']}: {z['level']} - max {z['max_score']}/10, mean {z['mean_score']:.1f}, "
+                       f"{high}/{z['cells']} cells HIGH or above")
+            if z["max_rainfall_1h"] is not None:
+                result += f", peak rain {z['max_rainfall_1h']:.2f} in/h"
+
+    hot = p["hot_cells"]
+    result += f"\n\nHOT CELLS ({len(hot)}):"
+    for cell in hot:
+        result += f"\n- {cell['lat']:.4f},{cell['lon']:.4f}: score {cell['score']}/10"
+        if cell["rainfall_1h"] is not None:
+            result += f", rain {cell['rainfall_1h']:.2f} in/h"
+    if not hot:
+        result += "\nNo cells at MEDIUM risk or above"
+    return result
+
+
+def render_emergency_resources(p: dict) -> str:
+    if "error" in p:
+        return p["error"]
+    shelters = p["shelters"]
+    hospitals = p["hospitals"]
+    result = f"""EMERGENCY RESOURCES - {p['city']}
+{p['scope']}
+
+SHELTERS ({len(shelters)} of {p['shelters_total']}):
+"""
+    for shelter in shelters:
+        result += f"\n- {shelter['name']}: {shelter['available']}/{shelter['capacity']} available"
+        if shelter["distance_km"] is not None:
+            result += f" ({shelter['distance_km']:.1f} km)"
+        result += f"\n  Address: {shelter['address']}"
+
+    result += f"\n\nHOSPITALS ({len(hospitals)} of {p['hospitals_total']}):"
+    for hospital in hospitals:
+        result += f"\n- {hospital['name']}: {hospital['available_beds']} beds, {hospital['emergency_beds']} emergency"
+        if hospital["distance_km"] is not None:
+            result += f" ({hospital['distance_km']:.1f} km)"
+
+    result += f"\n\nSUMMARY:"
+    result += f"\nTotal Shelter Capacity: {p['total_shelter_capacity']} people"
+    result += f"\nTotal Hospital Beds: {p['total_hospital_beds']} beds"
+    return result